@@ -2,36 +2,21 @@ import streamlit as st
 from datetime import datetime
 from database import create_user, verify_user, get_user_data, auto_verify_email, add_match_history, update_user_details, purchase_skin, purchase_bundle
 import database as db
-import pandas as pd
 import os
-from urllib.parse import parse_qs
-import sqlite3
-from scrape_valorant_skins import scrape_valorant_skins
+import csv
+import itertools
+import exports
+import jobs
 from database import calculate_account_skin_value
 
-# Initialize database
-db.init_database()
-db.create_demo_user()
-
-# Temporary: Drop and recreate bundle_skins table with image_url column
-import sqlite3
-conn = sqlite3.connect('valorant_game.db')
-cursor = conn.cursor()
-cursor.execute('DROP TABLE IF EXISTS bundle_skins')
-cursor.execute('''
-    CREATE TABLE IF NOT EXISTS bundle_skins (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        bundle_id INTEGER,
-        skin_name TEXT NOT NULL,
-        skin_type TEXT,
-        value_vp INTEGER,
-        image_url TEXT,
-        FOREIGN KEY (bundle_id) REFERENCES bundles (id)
-    )
-''')
-conn.commit()
-conn.close()
-print("bundle_skins table recreated with image_url column.")
+# Schema, demo user, checkpointer - process me ek hi baar (reruns par no-op).
+# pandas / requests / bs4 yahan import nahi hote, sirf un pages par jo unhe use karte hain.
+db.bootstrap()
+
+# Public profile links (?user_id=) profile_api.py service par jate hain, Streamlit par nahi.
+# Default profile_api ka uvicorn host/port; deploy par public URL set karo.
+PROFILE_BASE_URL = os.environ.get('VALORANT_PROFILE_BASE_URL', 'http://localhost:8502')
+
 
 # --- Custom CSS for Valorant Theme with Dracula Sidebar ---
 VALORANT_CSS = """
@@ -177,7 +162,7 @@ def login_page():
 
 # --- Dashboard Page ---
 def dashboard_page():
-    user_data = get_user_data(st.session_state.user_id)
+    user_data = get_user_data(st.session_state.user_id, sections=('details',))
     d = user_data['details']
 
     st.title("📊 Dashboard")
@@ -224,9 +209,10 @@ def dashboard_page():
     else:
         st.success("Ready for Competitive")
     # --- Scrape Skins Button ---
+    # Scraping background job me chalta hai; page chhod kar wapas aao to status yahin milta hai
     if st.button("Scrape Valorant Bundles & Skins"):
-        scrape_valorant_skins()
-        st.success("Scraping complete! Data updated.")
+        jobs.submit('scrape', user_id=st.session_state.user_id)
+    job_panel('scrape', show_scrape_result)
     # --- Account Value Button ---
     if st.button("Show My Account Skin Value"):
         result = calculate_account_skin_value(st.session_state.user_id)
@@ -234,13 +220,13 @@ def dashboard_page():
         st.write(result['details'])
 
     # User data link
-    user_link = f"{st.get_option('server.address') or 'http://localhost:8501'}?user_id={st.session_state.user_id}"
+    user_link = f"{PROFILE_BASE_URL}?user_id={st.session_state.user_id}"
     st.markdown(f"[🔗 View as Link]({user_link})  ")
     st.code(user_link, language='text')
 
 # --- Store Page ---
 def store_page():
-    user_data = get_user_data(st.session_state.user_id)
+    user_data = get_user_data(st.session_state.user_id, sections=('store',))
     s = user_data['store']
     st.title("🛒 Store")
     col1, col2, col3 = st.columns(3)
@@ -251,12 +237,8 @@ def store_page():
     with col3:
         st.metric("Kingdom Points", s['kingdom_points'])
     st.subheader("Available Skins")
-    import sqlite3
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT skin_name, value_vp FROM bundle_skins')
-    skins = cursor.fetchall()
-    for skin_name, value_vp in skins:
+    catalog = db.get_store_catalog(st.session_state.user_id)
+    for skin_name, value_vp in catalog['skins']:
         col1, col2 = st.columns([3,1])
         with col1:
             st.write(f"{skin_name} - {value_vp if value_vp else 'N/A'} VP")
@@ -268,69 +250,66 @@ def store_page():
                 else:
                     st.error(msg)
     st.subheader("Available Bundles")
-    cursor.execute('SELECT id, bundle_name FROM bundles')
-    bundles = cursor.fetchall()
-    for bundle_id, bundle_name in bundles:
-        cursor.execute('SELECT value_vp FROM bundle_skins WHERE bundle_id = ?', (bundle_id,))
-        prices = [row[0] for row in cursor.fetchall() if row[0]]
-        total_price = sum(prices)
-        skin_count = len(prices)
+    for bundle in catalog['bundles']:
         col1, col2 = st.columns([3,1])
         with col1:
-            st.write(f"{bundle_name} - {skin_count} skins - {total_price} VP")
+            owned = f" ({bundle['owned_count']} owned)" if bundle['owned_count'] else ""
+            st.write(f"{bundle['bundle_name']} - {bundle['skin_count']} skins - {bundle['total_vp']} VP{owned}")
         with col2:
-            if st.button(f"Buy Bundle {bundle_id}"):
-                success, msg = purchase_bundle(st.session_state.user_id, bundle_id)
+            if st.button(f"Buy Bundle {bundle['bundle_id']}"):
+                success, msg = purchase_bundle(st.session_state.user_id, bundle['bundle_id'])
                 if success:
                     st.success(msg)
                 else:
                     st.error(msg)
-    conn.close()
 
 # --- Inventory Page ---
+def show_scrape_result(job):
+    result = job['result']
+    if result.get('rows_written'):
+        st.success(f"Scraping complete! Bundles +{result['bundles_added']} / -{result['bundles_removed']}, "
+                   f"skins +{result['skins_added']} / ~{result['skins_updated']} / -{result['skins_removed']} "
+                   f"({job['finished_at']}).")
+    else:
+        st.info(f"Catalog unchanged since the last scrape ({job['finished_at']}).")
+
 def inventory_page():
-    user_data = get_user_data(st.session_state.user_id)
+    # Match history sirf export ke liye chahiye - wo click par alag se load hoti hai
+    user_data = get_user_data(st.session_state.user_id, sections=('details', 'store', 'inventory'))
     inv = user_data['inventory']
     
     st.title("🎒 Inventory")
     
     # Item prices (only skins and battlepass count for total value)
-    skin_value = 875  # Dummy value, can be updated later
+    skins_value = db.get_account_value(st.session_state.user_id)
     battlepass_value = 1000
-    total_value = len(inv['skins']) * skin_value + len(inv['battlepass']) * battlepass_value
+    total_value = skins_value + len(inv['battlepass']) * battlepass_value
     st.markdown(f"<h4 style='color:#ff4655;'>Total Value: {total_value} VP</h4>", unsafe_allow_html=True)
     
     # Breakdown
     st.markdown("<b>Breakdown:</b>", unsafe_allow_html=True)
-    st.write(f"Skins ({len(inv['skins'])}): {len(inv['skins']) * skin_value} VP")
+    st.write(f"Skins ({len(inv['skins'])}): {skins_value} VP")
     st.write(f"Battlepass ({len(inv['battlepass'])}): {len(inv['battlepass']) * battlepass_value} VP")
     st.write(f"Buddies ({len(inv['buddies'])}): -")
     st.write(f"Agents ({len(inv['agents'])}): -")
     st.write(f"Cards ({len(inv['cards'])}): -")
     st.write(f"Titles ({len(inv['titles'])}): -")
     
-    # Export Data Button
-    if st.button("⬇️ Export All Data (CSV)"):
-        # Profile
-        profile_df = pd.DataFrame([user_data['details']])
-        # Inventory
-        inventory_df = pd.DataFrame({
-            'skins': [', '.join(inv['skins'])],
-            'battlepass': [', '.join(inv['battlepass'])],
-            'buddies': [', '.join(inv['buddies'])],
-            'agents': [', '.join(inv['agents'])],
-            'cards': [', '.join(inv['cards'])],
-            'titles': [', '.join(inv['titles'])],
-        })
-        # Match History
-        match_df = pd.DataFrame(user_data['match_history'])
-        # Combine all
-        with pd.ExcelWriter('user_export.xlsx') as writer:
-            profile_df.to_excel(writer, sheet_name='Profile', index=False)
-            inventory_df.to_excel(writer, sheet_name='Inventory', index=False)
-            match_df.to_excel(writer, sheet_name='MatchHistory', index=False)
-        with open('user_export.xlsx', 'rb') as f:
-            st.download_button('Download Exported Data', f, file_name='user_export.xlsx')
+    # Export Data - file memory me banti hai, disk par kuch nahi likha jata
+    export_col1, export_col2 = st.columns([1, 2])
+    with export_col1:
+        export_format = st.selectbox("Export format", list(exports.EXPORT_FORMATS), key="export_format")
+    with export_col2:
+        if st.button("⬇️ Export All Data"):
+            user_data.update(get_user_data(st.session_state.user_id, sections=('match_history',)))
+            try:
+                data = exports.export_bytes(exports.user_records(st.session_state.user_id, user_data), export_format)
+            except RuntimeError as e:
+                st.error(str(e))
+            else:
+                st.download_button('Download Exported Data', data,
+                                   file_name=exports.export_filename('user_export', export_format),
+                                   mime=exports.EXPORT_FORMATS[export_format][1])
     
     # Tabs ke naam ke sath count
     tab_names = [
@@ -393,8 +372,9 @@ def inventory_page():
 
 # --- Match History Page ---
 def match_history_page():
-    user_data = get_user_data(st.session_state.user_id)
-    matches = user_data['match_history']
+    # pandas bhaari hai (~0.4s) - sirf is page par load
+    import pandas as pd
+    user_id = st.session_state.user_id
     
     st.title("📈 Match History")
     
@@ -403,31 +383,68 @@ def match_history_page():
         with st.form("add_match"):
             result = st.selectbox("🏆 Result", ["Win", "Loss", "Draw"])
             score = st.text_input("📊 Score (e.g., 13-7)")
+            mode = st.selectbox("🎮 Mode", db.MATCH_MODES)
+            agent = st.text_input("👤 Agent (optional)")
             submitted = st.form_submit_button("➕ Add Match")
             
             if submitted and score:
-                add_match_history(st.session_state.user_id, result, score)
-                st.success("Match added!")
-                st.rerun()
+                if db.parse_score(score)[0] is None:
+                    st.error("Score must look like 13-7")
+                else:
+                    add_match_history(user_id, result, score, mode=mode, agent=agent.strip())
+                    st.session_state.match_cursors = [None]
+                    st.success("Match added!")
+                    st.rerun()
     
-    # Display matches
-    if matches:
-        for match in matches:
-            color = "green" if match['result'] == 'Win' else "red" if match['result'] == 'Loss' else "orange"
-            st.markdown(f"""
-            <div style=\"background: #1a232e; padding: 10px; border-radius: 5px; margin: 5px 0;\">
-                <span style=\"color: {color}; font-weight: bold;\">{match['result']}</span> | 
-                <span>{match['date']}</span> | 
-                <span>{match['score']}</span> | 
-                <a href=\"{match['link']}\" target=\"_blank\" style=\"color: #2196f3; font-weight: bold; text-decoration: underline;\">Link</a>
-            </div>
-            """, unsafe_allow_html=True)
+    # Summary - match_stats se, saare matches load kiye bina
+    stats = db.get_match_stats(user_id)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Wins", stats['wins'])
+    col2.metric("Losses", stats['losses'])
+    col3.metric("Draws", stats['draws'])
+    col4.metric("Win Rate", f"{stats['win_rate']}%")
+    
+    if stats['total']:
+        with st.expander("📉 Trends"):
+            summary = db.get_match_summary(user_id)
+            streak = summary['current_streak']
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Current Streak", f"{streak['length']} {streak['result']}")
+            col2.metric("Longest Win Streak", summary['longest_win_streak'])
+            col3.metric(f"Last {db.MATCH_STATS_WINDOW} Win Rate", f"{summary['recent_win_rate']}%")
+            col4.metric("Round Diff", f"{summary['round_diff']:+d}", f"{summary['avg_round_diff']:+.2f} / match")
+            timeline = pd.DataFrame(db.get_match_timeline(user_id))
+            st.line_chart(timeline, y=['rolling_win_rate', 'cumulative_round_diff'])
+    
+    # Display matches - ek page, ek dataframe
+    # match_cursors: har khule page ka starting cursor (pehla page = None)
+    if 'match_cursors' not in st.session_state:
+        st.session_state.match_cursors = [None]
+    cursors = st.session_state.match_cursors
+    page = db.get_match_page(user_id, cursors[-1])
+    if page['matches']:
+        st.dataframe(
+            pd.DataFrame(page['matches'], columns=['date', 'mode', 'agent', 'result', 'score', 'round_diff', 'link']),
+            column_config={'link': st.column_config.LinkColumn('Link', display_text='Link')},
+            hide_index=True,
+        )
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if st.button("⬅️ Newer", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            st.caption(f"Page {len(cursors)} of {max(1, -(-stats['total'] // db.MATCH_PAGE_SIZE))}")
+        with col3:
+            if st.button("Older ➡️", disabled=page['next_cursor'] is None):
+                cursors.append(page['next_cursor'])
+                st.rerun()
     else:
         st.write("No matches found")
 
 # --- Profile Edit Page ---
 def profile_edit_page():
-    user_data = get_user_data(st.session_state.user_id)
+    user_data = get_user_data(st.session_state.user_id, sections=('details',))
     d = user_data['details']
     
     st.title("✏️ Edit Profile")
@@ -452,102 +469,101 @@ def bulk_import_page():
     st.title("📥 Bulk Account Check")
     st.write("Upload a CSV file containing username and password columns.")
     uploaded_file = st.file_uploader("Upload CSV file", type=["csv"])
-    if uploaded_file:
-        import pandas as pd
-        df = pd.read_csv(uploaded_file)
-        if 'username' not in df.columns or 'password' not in df.columns:
-            st.error("The CSV must have 'username' and 'password' columns!")
-        else:
-            st.write("### Results:")
-            results = []
-            for idx, row in df.iterrows():
-                username = str(row['username']).strip()
-                password = str(row['password']).strip()
-                # Check if user exists
-                from database import hash_password
-                import sqlite3
-                conn = sqlite3.connect('valorant_game.db')
-                cursor = conn.cursor()
-                cursor.execute('SELECT id, password_hash FROM users WHERE username = ?', (username,))
-                user_row = cursor.fetchone()
-                conn.close()
-                status = ""
-                user_link = ""
-                if not user_row:
-                    status = "User Not Found"
-                else:
-                    user_id, stored_hash = user_row
-                    if stored_hash != hash_password(password):
-                        status = "Password Incorrect"
-                    else:
-                        user_data = verify_user(username, None, password)
-                        if user_data['status'] == 'locked':
-                            status = "Account Locked"
-                        elif user_data['status'] == 'banned':
-                            if user_data['ban_type'] == 'permanent':
-                                status = "Permanently Banned"
-                            else:
-                                status = f"Suspended until {user_data['suspension_end']}"
-                        elif not user_data['email_verified']:
-                            status = "Email Verification Required"
-                        else:
-                            details = get_user_data(user_data['user_id'])['details']
-                            inv = get_user_data(user_data['user_id'])['inventory']
-                            if not details['rank'] or details['rank'].lower() == 'unranked':
-                                status = "Unranked Account"
-                            elif details['rank']:
-                                status = f"Rank Ready: {details['rank']}"
-                            if inv['skins']:
-                                status += f" | Skins: {', '.join(inv['skins'])}"
-                            user_link = f"{st.get_option('server.address') or 'http://localhost:8501'}?user_id={user_data['user_id']}"
-                results.append({
-                    "username": username,
-                    "status": status,
-                    "user_link": user_link
-                })
-            st.dataframe(pd.DataFrame(results))
-            for r in results:
-                if r['user_link']:
-                    st.markdown(f"[{r['username']} Data Link]({r['user_link']})")
+    if uploaded_file and st.button("Start Account Check"):
+        jobs.submit_upload('bulk_check', uploaded_file, user_id=st.session_state.user_id, base_link=PROFILE_BASE_URL)
+    st.write("### Results:")
+    job_panel('bulk_check', show_bulk_results, show_partial_results)
 
 # --- Bulk Registration Page ---
 def bulk_registration_page():
     st.title("📝 Bulk Registration")
     st.write("Upload a CSV file with columns: username, email, password, name, region, country. Each row will be registered as a new user. Password must be plain text.")
     uploaded_file = st.file_uploader("Upload CSV file", type=["csv"], key="bulk_reg")
-    if uploaded_file:
-        import pandas as pd
-        df = pd.read_csv(uploaded_file)
-        required_cols = ["username", "email", "password", "name", "region", "country"]
-        if not all(col in df.columns for col in required_cols):
-            st.error("CSV must have these columns: username, email, password, name, region, country")
-        else:
-            st.write("### Registration Results:")
-            results = []
-            for idx, row in df.iterrows():
-                try:
-                    success = create_user(
-                        str(row['username']).strip(),
-                        str(row['email']).strip(),
-                        str(row['password']).strip(),
-                        str(row['name']).strip(),
-                        str(row['region']).strip(),
-                        str(row['country']).strip()
-                    )
-                    if success:
-                        results.append({"username": row['username'], "status": "Registered"})
-                    else:
-                        results.append({"username": row['username'], "status": "Already Exists/Fail"})
-                except Exception as e:
-                    results.append({"username": row.get('username', ''), "status": f"Error: {e}"})
-            st.dataframe(results)
-            st.success("Bulk registration process completed. Now you can login with these accounts.")
+    if uploaded_file and st.button("Start Registration"):
+        jobs.submit_upload('bulk_register', uploaded_file, user_id=st.session_state.user_id)
+    st.write("### Registration Results:")
+
+    def registered(job):
+        show_bulk_results(job)
+        st.success("Bulk registration process completed. Now you can login with these accounts.")
+
+    job_panel('bulk_register', registered, show_partial_results)
+
+# Results table me sirf itni shuru ki rows dikhti hain; poori file download se milti hai
+RESULTS_PREVIEW_ROWS = 1000
+# Chalte job ki latest itni rows har poll par dikhti hain
+PARTIAL_RESULT_ROWS = 50
+
+def show_partial_results(job):
+    rows = jobs.tail_results(job['id'], PARTIAL_RESULT_ROWS)
+    if rows:
+        st.caption(f"Latest {len(rows)} results so far")
+        st.dataframe(rows)
+
+def show_bulk_results(job):
+    result = job['result']
+    st.write(jobs.status_summary(result['rows'], result['counts']))
+    if not os.path.exists(result['file']):
+        st.warning("Result file is no longer available.")
+        return
+    with open(result['file'], newline='', encoding='utf-8') as f:
+        st.dataframe(list(itertools.islice(csv.DictReader(f), RESULTS_PREVIEW_ROWS)))
+    job_file_download('Download Results CSV', result['file'], f"{job['kind']}_results.csv", 'text/csv',
+                      key=f"job_results_{job['id']}")
+
+# --- Background Jobs ---
+JOB_POLL_SECONDS = 1.0
+
+def job_file_download(label, path, file_name, mime, key):
+    """
+    Job ki result file (export / results CSV) ka download. File sirf "Prepare" click wale
+    rerun me memory me padhi jati hai - har rerun par nahi, kyunki ye files badi ho sakti hain.
+    """
+    if st.button(f"Prepare {label}", key=f"{key}_prepare"):
+        with open(path, 'rb') as f:
+            st.download_button(label, f.read(), file_name=file_name, mime=mime, key=key)
+
+def job_panel(kind, show_result, show_partial=None):
+    """
+    User ke latest `kind` job ka status (DB se, isliye refresh ke baad bhi).
+    Chalte job ke liye sirf ye fragment har JOB_POLL_SECONDS rerun hota hai;
+    show_partial(job) ho to har poll par abhi tak ke results bhi dikhata hai.
+    """
+    job = db.latest_job(st.session_state.user_id, kind)
+    if job is None:
+        return
+    active = job['status'] in ('queued', 'running')
+    st.fragment(_job_status, run_every=JOB_POLL_SECONDS if active else None)(
+        job['id'], active, show_result, show_partial)
+
+def _job_status(job_id, was_active, show_result, show_partial=None):
+    job = db.get_job(job_id)
+    active = job['status'] in ('queued', 'running')
+    if was_active and not active:
+        # Job khatam - poora page rerun taaki polling band ho aur result dikhe
+        st.rerun()
+    if active:
+        fraction = min(job['done'] / job['total'], 1.0) if job['total'] else 0.0
+        st.progress(fraction, text=f"{job['status'].title()}: {job['message'] or 'waiting...'}")
+        if job['cancel_requested']:
+            st.info("Cancelling...")
+        elif st.button("Cancel", key=f"cancel_job_{job_id}"):
+            db.cancel_job(job_id, st.session_state.user_id)
+            st.info("Cancelling...")
+        if show_partial:
+            show_partial(job)
+    elif job['status'] == 'done':
+        show_result(job)
+    elif job['status'] == 'cancelled':
+        st.warning(f"Cancelled. {job['message'] or ''}")
+    else:
+        st.error(f"Job failed: {job['message']}")
 
 # Skins se related imports, function calls, aur UI hata diye gaye hain
 
 def user_data_view_page():
     query_params = st.query_params
-    user_id = query_params.get('user_id', [None])[0]
+    user_id = query_params.get('user_id')
     if not user_id:
         st.error('No user_id provided in link.')
         return
@@ -556,8 +572,7 @@ def user_data_view_page():
     except ValueError:
         st.error('Invalid user_id.')
         return
-    from database import get_user_data
-    user_data = get_user_data(user_id)
+    user_data = get_user_data(user_id, sections=('details', 'inventory'))
     if not user_data or not user_data['details']['name']:
         st.error('User not found.')
         return
@@ -581,13 +596,36 @@ def user_data_view_page():
     st.write(f"Titles: {', '.join(inv['titles']) if inv['titles'] else 'None'}")
     st.markdown('---')
     st.header('Match History')
-    matches = user_data['match_history']
+    # Latest page keyset API se, poori history nahi; ek hi table element
+    matches = db.get_match_page(user_id)['matches']
     if matches:
-        for match in matches:
-            st.write(f"{match['date']} | {match['result']} | {match['score']} | {match['link']}")
+        stats = db.get_match_stats(user_id)
+        st.caption(f"Latest {len(matches)} of {stats['total']} matches")
+        st.dataframe([{key: match[key] for key in ('date', 'result', 'score', 'mode', 'link')} for match in matches],
+                     hide_index=True)
     else:
         st.write('No matches found.')
 
+# --- Admin Export Page ---
+def admin_export_page():
+    st.title("🗄️ Admin Export")
+    if not db.is_admin(st.session_state.user_id):
+        st.error("Admin access required.")
+        return
+    st.write("Export every user's profile, inventory and match history. Rows are streamed from the database in batches.")
+    export_format = st.selectbox("Export format", list(exports.EXPORT_FORMATS), key="admin_export_format")
+    if st.button("Build Export"):
+        jobs.submit('export', user_id=st.session_state.user_id, format=export_format)
+    job_panel('export', show_export_download)
+
+def show_export_download(job):
+    result = job['result']
+    if not os.path.exists(result['file']):
+        st.warning("Export file is no longer available, build it again.")
+        return
+    job_file_download('Download All Users', result['file'], result['filename'], result['mime'],
+                      key=f"job_export_{job['id']}")
+
 # --- Main App ---
 def main():
     # Skins se related koi bhi initialization ya function call nahi hai
@@ -611,8 +649,11 @@ def main():
         
         menu = [
             "📊 Dashboard", "🛒 Store", "🎒 Inventory", "📈 Match History",
-            "✏️ Edit Profile", "📝 Bulk Registration", "📥 Bulk Account Check", "🚪 Logout"
+            "✏️ Edit Profile", "📝 Bulk Registration", "📥 Bulk Account Check",
         ]
+        if db.is_admin(st.session_state.user_id):
+            menu.append("🗄️ Admin Export")
+        menu.append("🚪 Logout")
         choice = st.sidebar.selectbox("🧭 Navigation", menu)
         
         if choice == "📊 Dashboard":
@@ -629,10 +670,13 @@ def main():
             bulk_registration_page()
         elif choice == "📥 Bulk Account Check":
             bulk_import_page()
+        elif choice == "🗄️ Admin Export":
+            admin_export_page()
         elif choice == "🚪 Logout":
             st.session_state.logged_in = False
             st.session_state.user_id = None
             st.session_state.current_page = 'login'
+            st.session_state.match_cursors = [None]
             st.rerun()
 
 if __name__ == "__main__":
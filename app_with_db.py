@@ -1,12 +1,10 @@
 import streamlit as st
 from datetime import datetime
 import database as db
-from scrape_valorant_skins import scrape_valorant_skins
 from database import calculate_account_skin_value
 
-# Initialize database
-db.init_database()
-db.create_demo_user()
+# Schema, demo user, checkpointer - process me ek hi baar (reruns par no-op)
+db.bootstrap()
 
 # --- Custom CSS for Valorant Theme ---
 VALORANT_CSS = """
@@ -201,6 +199,7 @@ def dashboard_page():
         st.success("Ready for Competitive")
     # --- Scrape Skins Button ---
     if st.button("Scrape Valorant Bundles & Skins"):
+        from scrape_valorant_skins import scrape_valorant_skins
         scrape_valorant_skins()
         st.success("Scraping complete! Data updated.")
     # --- Account Value Button ---
@@ -0,0 +1,210 @@
+"""
+Asyncio data layer: database.py ke functions coroutines ki tarah, Streamlit ke bahar
+chalne wale async API frontends ke liye. Saare DB calls ek dedicated DB thread ki queue
+me jate hain, isliye event loop kabhi sqlite par block nahi hota.
+
+- Batching: DB thread queue me pade calls ek sath uthata hai. Batch ke saare writes ek
+  BEGIN IMMEDIATE transaction me chalte hain, har call apne SAVEPOINT me. Ek call fail ho
+  to sirf uska kaam rollback hota hai, aur commit poore batch ka ek hi hota hai (group
+  commit). Uske baad batch ki saari reads ek read transaction me chalti hain.
+- Coalescing: same read (function + args) pehle se in-flight ho to naya caller usi
+  result ka wait karta hai, dobara query nahi hoti.
+- KDF wale calls (verify_user, create_user, check_accounts) DB thread par nahi chalte,
+  taaki password hashing queue ko na roke. Wo asyncio.to_thread me chalte hain.
+
+Schema pehle se ready hona chahiye (db.bootstrap() / db.init_database()).
+
+    import async_db
+    profile = await async_db.get_user_data(user_id)
+    ok, message = await async_db.purchase_skin(user_id, 'Prime Vandal')
+"""
+import asyncio
+import copy
+import os
+import queue
+import threading
+import traceback
+
+import database as db
+
+# Ek batch me zyada se zyada itne calls (ek transaction)
+MAX_BATCH = int(os.environ.get('VALORANT_ASYNC_DB_BATCH', '64'))
+
+class _Call:
+    __slots__ = ('fn', 'args', 'kwargs', 'write', 'loop', 'future')
+
+    def __init__(self, fn, args, kwargs, write, loop, future):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.write = write
+        self.loop = loop
+        self.future = future
+
+def _resolve(outcomes):
+    for future, result, error in outcomes:
+        if future.cancelled():
+            continue
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+class DatabaseThread(threading.Thread):
+    """Queue se calls lekar batches me chalata hai; results caller ke event loop par jate hain."""
+
+    def __init__(self, max_batch=MAX_BATCH):
+        super().__init__(name='db-async', daemon=True)
+        self.max_batch = max_batch
+        self.queue = queue.SimpleQueue()
+        self.stats = {'calls': 0, 'batches': 0, 'transactions': 0, 'coalesced': 0}
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            batch = [call for call in batch if call is not None]
+            self.stats['calls'] += len(batch)
+            self.stats['batches'] += 1
+            # Ek batch ke calls ek sath (concurrently) aaye hain, unka aapas me order tay nahi.
+            # Writes pehle, taaki reads batch ke writes dekhein
+            for write in (True, False):
+                group = [call for call in batch if call.write == write]
+                if group:
+                    self._run_group(group)
+            if stop:
+                return
+
+    def _run_group(self, calls):
+        write = calls[0].write
+        outcomes = []
+        self.stats['transactions'] += 1
+        try:
+            with db.get_connection(immediate=write):
+                for call in calls:
+                    try:
+                        outcomes.append((call, call.fn(*call.args, **call.kwargs), None))
+                    except Exception as e:
+                        outcomes.append((call, None, e))
+        except Exception as e:
+            # Commit hi fail hua - batch ka koi bhi write durable nahi
+            traceback.print_exc()
+            outcomes = [(call, None, e) for call in calls]
+        # Write functions ka cache invalidation get_pool().after_commit() se batch commit ke
+        # baad hi chal chuka hai. Har event loop ko poore group ke results ek hi wakeup me
+        by_loop = {}
+        for call, result, error in outcomes:
+            by_loop.setdefault(call.loop, []).append((call.future, result, error))
+        for loop, results in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_resolve, results)
+            except RuntimeError:
+                # Caller ka event loop band ho chuka - result lene wala koi nahi
+                pass
+
+_thread = None
+_thread_lock = threading.Lock()
+# (loop, write generation, read key) -> [future, followers], sirf us loop ke thread se chhua jata hai
+_inflight = {}
+# Har write submit par badhta hai: write ke baad aayi read pehle se chal rahi read se
+# coalesce nahi hoti (apna write dekhna zaroori hai)
+_generation = 0
+
+def get_thread():
+    global _thread
+    if _thread is None:
+        with _thread_lock:
+            if _thread is None:
+                _thread = DatabaseThread()
+                _thread.start()
+    return _thread
+
+def shutdown(wait=True):
+    """Queue me pade calls poore karke DB thread band karta hai; agla call naya thread banata hai."""
+    global _thread
+    with _thread_lock:
+        thread, _thread = _thread, None
+    if thread is not None:
+        thread.queue.put(None)
+        if wait:
+            thread.join()
+
+def stats():
+    """DB thread ke counters: calls, batches, transactions, coalesced."""
+    thread = _thread
+    return dict(thread.stats) if thread else {}
+
+def _submit(fn, args, kwargs, write):
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    get_thread().queue.put(_Call(fn, args, kwargs, write, loop, future))
+    return future
+
+async def _read_call(fn, args, kwargs):
+    try:
+        key = (asyncio.get_running_loop(), _generation, fn, args, tuple(sorted(kwargs.items())))
+        hash(key)
+    except TypeError:
+        # Unhashable args (jaise sections list) - coalescing ke bina
+        return await _submit(fn, args, kwargs, write=False)
+    entry = _inflight.get(key)
+    if entry is None:
+        future = _submit(fn, args, kwargs, write=False)
+        # [future, kitne followers is result ka wait kar rahe hain]
+        entry = _inflight[key] = [future, 0]
+        future.add_done_callback(lambda done: _inflight.pop(key, None))
+        result = await asyncio.shield(future)
+        # Followers bhi yahi object copy karte hain - leader ki mutations unhe na dikhein
+        return copy.deepcopy(result) if entry[1] else result
+    entry[1] += 1
+    get_thread().stats['coalesced'] += 1
+    # Result object share na ho - caller use mutate kar sakta hai
+    return copy.deepcopy(await asyncio.shield(entry[0]))
+
+def _read(fn):
+    async def call(*args, **kwargs):
+        return await _read_call(fn, args, kwargs)
+    call.__name__, call.__doc__ = fn.__name__, fn.__doc__
+    return call
+
+def _write(fn):
+    async def call(*args, **kwargs):
+        global _generation
+        _generation += 1
+        return await _submit(fn, args, kwargs, write=True)
+    call.__name__, call.__doc__ = fn.__name__, fn.__doc__
+    return call
+
+def _offload(fn):
+    async def call(*args, **kwargs):
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    call.__name__, call.__doc__ = fn.__name__, fn.__doc__
+    return call
+
+# Reads
+get_user_data = _read(db.get_user_data)
+get_match_page = _read(db.get_match_page)
+get_match_stats = _read(db.get_match_stats)
+get_match_timeline = _read(db.get_match_timeline)
+get_match_summary = _read(db.get_match_summary)
+get_store_catalog = _read(db.get_store_catalog)
+calculate_account_skin_value = _read(db.calculate_account_skin_value)
+get_account_value = _read(db.get_account_value)
+latest_job = _read(db.latest_job)
+
+# Writes (group commit)
+add_match_history = _write(db.add_match_history)
+purchase_skin = _write(db.purchase_skin)
+purchase_bundle = _write(db.purchase_bundle)
+update_user_details = _write(db.update_user_details)
+auto_verify_email = _write(db.auto_verify_email)
+
+# KDF / bulk - apne thread me
+verify_user = _offload(db.verify_user)
+create_user = _offload(db.create_user)
+check_accounts = _offload(db.check_accounts)
@@ -0,0 +1,809 @@
+"""
+Performance benchmarks. Har benchmark apni temp DB par chalta hai,
+valorant_game.db ko kabhi nahi chhoota.
+
+Usage:
+    python benchmarks.py purchase --threads 16 --users 20
+    python benchmarks.py valuation --users 5000
+    python benchmarks.py login --threads 16 --users 50 [--no-cache] [--legacy]
+    python benchmarks.py imports --module app --budget-ms 700
+    python benchmarks.py parse --pages 2000 --workers 4
+    python benchmarks.py fetch --rounds 20
+    python benchmarks.py catalog --bundles 500
+    python benchmarks.py async --clients 200 --ops 20
+    python benchmarks.py profile --requests 300
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import async_db
+import database as db
+import fetch
+import passwords
+import scrape_valorant_skins as scrape
+
+def use_temp_database(cheap_kdf=True):
+    """
+    Pool ko ek khali temp DB par point karta hai aur schema bana deta hai.
+    cheap_kdf: jo benchmarks login nahi naapte unke liye scrypt ko sasta kar deta hai,
+    warna hazaron users seed karne me hi minute lag jate.
+    """
+    if cheap_kdf:
+        passwords.SCHEMES['scrypt'][1]['ln'] = 4
+    path = os.path.join(tempfile.mkdtemp(prefix='valorant-bench-'), 'bench.db')
+    db.configure_pool(path)
+    db.migrate()
+    return path
+
+def _seed_catalog(bundle_count, skins_per_bundle):
+    prices = {}
+    for b in range(bundle_count):
+        skins = []
+        for s in range(skins_per_bundle):
+            name = f'Bench Skin {b}-{s}'
+            prices[name] = random.choice([875, 1275, 1775, 2175])
+            skins.append({'skin_name': name, 'skin_type': 'gun', 'value_vp': prices[name]})
+        db.insert_bundle_and_skins(f'Bench Bundle {b}', skins)
+    return prices
+
+def bench_purchase(threads=16, users=20, attempts=200, budget=20000):
+    """
+    Concurrent purchase benchmark. Kai threads same users ke liye skins/bundles
+    kharidte hain; end me check hota hai ke koi double-spend ya duplicate nahi hua.
+    """
+    use_temp_database()
+    prices = _seed_catalog(bundle_count=10, skins_per_bundle=5)
+    skin_names = list(prices)
+    with db.get_connection() as conn:
+        bundle_ids = [row[0] for row in conn.execute('SELECT id FROM bundles')]
+    user_ids = []
+    for i in range(users):
+        db.create_user(f'bench{i}', f'bench{i}@valorant.com', 'pw', 'Bench', 'EU', 'France')
+    with db.get_connection(immediate=True) as conn:
+        conn.execute('UPDATE store SET valorant_points = ?', (budget,))
+        user_ids = [row[0] for row in conn.execute('SELECT id FROM users')]
+
+    successes = [0] * threads
+
+    def worker(index):
+        rng = random.Random(index)
+        for _ in range(attempts):
+            user_id = rng.choice(user_ids)
+            if rng.random() < 0.8:
+                ok, _ = db.purchase_skin(user_id, rng.choice(skin_names))
+            else:
+                ok, _ = db.purchase_bundle(user_id, rng.choice(bundle_ids))
+            successes[index] += ok
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    problems = []
+    with db.get_connection() as conn:
+        for user_id in user_ids:
+            points = conn.execute('SELECT valorant_points FROM store WHERE user_id = ?', (user_id,)).fetchone()[0]
+            owned = [row[0] for row in conn.execute(
+                "SELECT i.name FROM inventory inv JOIN items i ON i.id = inv.item_id "
+                "WHERE inv.user_id = ? AND inv.item_type = 'skins'", (user_id,))]
+            spent = sum(prices.get(name, 0) for name in owned)
+            if points < 0:
+                problems.append(f'user {user_id}: negative balance {points}')
+            if len(owned) != len(set(owned)):
+                problems.append(f'user {user_id}: duplicate inventory rows')
+            if budget - points != spent:
+                problems.append(f'user {user_id}: charged {budget - points} VP but owns {spent} VP')
+
+    total = threads * attempts
+    print(f'purchase: {total} attempts, {sum(successes)} succeeded, '
+          f'{elapsed:.2f}s ({total / elapsed:.0f} ops/s), {len(problems)} invariant violations')
+    for problem in problems:
+        print('  ' + problem)
+    return not problems
+
+def bench_valuation(users=5000, bundles=40, skins_per_bundle=5, owned=20, rounds=3):
+    """
+    Catalog/inventory benchmark: DB size, full account valuation aur cold profile loads.
+    Read cache band rehta hai taaki har call DB tak jaye.
+    """
+    use_temp_database()
+    db.read_cache.ttl = 0
+    _seed_catalog(bundle_count=bundles, skins_per_bundle=skins_per_bundle)
+    db.create_users_bulk({'username': f'val{i}', 'email': f'val{i}@valorant.com', 'password': 'pw',
+                          'name': 'Bench', 'region': 'EU', 'country': 'France'} for i in range(users))
+    rng = random.Random(0)
+    with db.get_connection(immediate=True) as conn:
+        user_ids = [row[0] for row in conn.execute('SELECT id FROM users')]
+        bundle_ids = [row[0] for row in conn.execute('SELECT id FROM bundles')]
+        conn.execute('UPDATE store SET valorant_points = 10000000')
+    for user_id in user_ids:
+        for bundle_id in rng.sample(bundle_ids, max(1, owned // skins_per_bundle)):
+            db.purchase_bundle(user_id, bundle_id)
+    with db.get_connection() as conn:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        size = conn.execute('PRAGMA page_count').fetchone()[0] * conn.execute('PRAGMA page_size').fetchone()[0]
+
+    timings = {}
+    start = time.perf_counter()
+    for _ in range(rounds):
+        values = db.calculate_account_skin_values()
+    timings['valuation (all users)'] = (time.perf_counter() - start) / rounds
+    sample = rng.sample(user_ids, min(1000, len(user_ids)))
+    start = time.perf_counter()
+    for user_id in sample:
+        db.get_user_data(user_id)
+    timings[f'profile load x{len(sample)}'] = time.perf_counter() - start
+    start = time.perf_counter()
+    for user_id in sample:
+        db.get_store_catalog(user_id)
+    timings[f'store catalog x{len(sample)}'] = time.perf_counter() - start
+
+    print(f'valuation: {users} users, {sum(len(v["details"]) for v in values.values())} owned skins, '
+          f'DB size {size / 1048576:.1f} MiB')
+    for label, seconds in timings.items():
+        print(f'  {label}: {seconds * 1000:.1f} ms')
+    return True
+
+def bench_login(threads=16, users=50, logins=10, wrong=0.1, no_cache=False, legacy=False):
+    """
+    Concurrent login benchmark: har thread `logins` baar verify_user chalata hai
+    (`wrong` fraction galat password ke sath). Per-login latency ka p50/p95/p99.
+    no_cache: login_cache band, har login par poora KDF. legacy: users purane
+    SHA-256 hashes se shuru hote hain, pehle login par rehash hota hai.
+    """
+    use_temp_database(cheap_kdf=False)
+    if no_cache:
+        passwords.login_cache.ttl = 0
+    db.create_users_bulk({'username': f'login{i}', 'email': f'login{i}@valorant.com', 'password': f'pw{i}',
+                          'name': 'Bench', 'region': 'EU', 'country': 'France'} for i in range(users))
+    if legacy:
+        with db.get_connection(immediate=True) as conn:
+            conn.executemany('UPDATE users SET password_hash = ? WHERE username = ?',
+                             [(passwords._legacy_sha256(f'pw{i}'), f'login{i}') for i in range(users)])
+
+    latencies = [[] for _ in range(threads)]
+    errors = [0] * threads
+
+    def worker(index):
+        rng = random.Random(index)
+        for _ in range(logins):
+            i = rng.randrange(users)
+            bad = rng.random() < wrong
+            start = time.perf_counter()
+            user = db.verify_user(f'login{i}', None, f'pw{i}' + ('x' if bad else ''))
+            latencies[index].append(time.perf_counter() - start)
+            errors[index] += (user is None) != bad
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    # Background rehash khatam hone do
+    passwords.shutdown()
+
+    samples = sorted(latency for per_thread in latencies for latency in per_thread)
+    cuts = statistics.quantiles(samples, n=100)
+    with db.get_connection() as conn:
+        upgraded = sum(not passwords.needs_rehash(row[0]) for row in conn.execute('SELECT password_hash FROM users'))
+    cache = passwords.login_cache.stats()
+    print(f'login: {len(samples)} logins on {threads} threads, {passwords.KDF_WORKERS} KDF workers, '
+          f'{elapsed:.2f}s ({len(samples) / elapsed:.0f} logins/s), {sum(errors)} wrong results')
+    print(f'  latency p50 {cuts[49] * 1000:.1f} ms, p95 {cuts[94] * 1000:.1f} ms, p99 {cuts[98] * 1000:.1f} ms')
+    print(f'  login cache: {cache["hits"]} hits, {cache["misses"]} misses; '
+          f'{upgraded}/{users} hashes on current scheme')
+    return not sum(errors)
+
+_FILLER = ('Every weapon in the store rotates daily', 'Night market offers discounts',
+           'Upgrade levels unlock new finishers', 'Variants change the colour scheme',
+           'Radianite points unlock upgrades', 'Check back for the next episode')
+
+def write_catalog_fixtures(directory, pages, bundles_per_page=4, skins_per_bundle=5, seed=0):
+    """Deterministic saved-page corpus: har page me bundles, skins, prices aur filler markup."""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    for page in range(pages):
+        parts = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>Valorant skins</title></head><body>',
+                 '<nav><ul>' + ''.join(f'<li><a href="/p/{i}">Page {i}</a></li>' for i in range(30)) + '</ul></nav>']
+        for b in range(bundles_per_page):
+            parts.append(f'<h2>Page {page} Set {b} Bundle</h2><p>{rng.choice(_FILLER)}.</p>')
+            for s in range(skins_per_bundle):
+                weapon = rng.choice(scrape.WEAPONS + scrape.MELEE).title()
+                price = rng.choice([875, 1275, 1775, 2175, 3550])
+                parts.append(f'<h3>Page {page} Set {b}-{s} {weapon}</h3><!-- price -->'
+                             f'<p class="price">{price:,} VP</p>')
+                for _ in range(rng.randint(2, 5)):
+                    parts.append(f'<p><strong>Tip:</strong> {rng.choice(_FILLER)}. '
+                                 f'<a href="#">{rng.choice(_FILLER)}</a></p>')
+        parts.append('<footer><b>Copyright</b> 2026</footer></body></html>')
+        with open(os.path.join(directory, f'page{page:05d}.html'), 'w', encoding='utf-8') as f:
+            f.write(''.join(parts))
+
+def _legacy_parse(html):
+    """Purana scrape parser (bs4 html.parser + any() loops), comparison ke liye."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    bundles = []
+    current_bundle = None
+    for element in soup.find_all(['h2', 'h3', 'h4', 'strong', 'b']):
+        text = element.get_text(strip=True)
+        if 'bundle' in text.lower() or 'collection' in text.lower():
+            current_bundle = text
+            bundles.append({'bundle_name': current_bundle, 'skins': []})
+        elif any(gun in text.lower() for gun in scrape.WEAPONS):
+            if current_bundle:
+                skin_type = 'melee' if any(melee in text.lower() for melee in scrape.MELEE) else 'gun'
+                price = 1775
+                next_sibling = element.find_next_sibling()
+                if next_sibling and 'VP' in next_sibling.get_text():
+                    try:
+                        price = int(''.join(filter(str.isdigit, next_sibling.get_text())))
+                    except ValueError:
+                        pass
+                bundles[-1]['skins'].append({'skin_name': text, 'skin_type': skin_type,
+                                             'value_vp': price, 'image_url': None})
+    return bundles
+
+def bench_parse(pages=2000, workers=None, legacy_sample=200):
+    """
+    Offline catalog ingestion benchmark ek generated fixture corpus par: purana parser
+    (sample par) vs naya engine (html.parser / lxml, 1 vs N processes), aur DB ingest.
+    """
+    use_temp_database()
+    corpus = os.path.join(tempfile.mkdtemp(prefix='valorant-pages-'), 'pages')
+    write_catalog_fixtures(corpus, pages)
+    paths = sorted(os.path.join(corpus, name) for name in os.listdir(corpus))
+    size = sum(os.path.getsize(path) for path in paths)
+    sample = paths[:legacy_sample]
+    workers = workers or os.cpu_count() or 1
+
+    def timed(label, run, files):
+        start = time.perf_counter()
+        result = run(files)
+        seconds = time.perf_counter() - start
+        print(f'  {label}: {len(files) / seconds:.0f} pages/s ({seconds:.2f}s for {len(files)})')
+        return result
+
+    print(f'parse: {pages} pages, {size / 1048576:.1f} MiB, parser available: {scrape.html_parser()}')
+    legacy = timed('legacy bs4 + any()', lambda files: [_legacy_parse(open(p, encoding='utf-8').read()) for p in files], sample)
+    engine = timed('engine html.parser, 1 process',
+                   lambda files: [scrape.parse_skins_html(open(p, 'rb').read(), parser='html.parser') for p in files], sample)
+    problems = []
+    # Engine legacy ka superset hai (melee-only naam bhi skins hain)
+    legacy_skins = {(bundle['bundle_name'], skin['skin_name'], skin['value_vp'])
+                    for page in legacy for bundle in page for skin in bundle['skins']}
+    engine_skins = {(bundle['bundle_name'], skin['skin_name'], skin['value_vp'])
+                    for page in engine for bundle in page for skin in bundle['skins']}
+    print(f'  skins found in sample: legacy {len(legacy_skins)}, engine {len(engine_skins)}')
+    if not legacy_skins <= engine_skins:
+        problems.append(f'{len(legacy_skins - engine_skins)} legacy skins missing from engine output')
+    if scrape.html_parser() == 'lxml':
+        fast = timed('engine lxml, 1 process', lambda files: [b for _, b, _ in scrape.iter_parsed_files(files, 1)], paths)
+        if fast[:len(sample)] != engine:
+            problems.append('lxml and html.parser engine outputs differ')
+    if workers > 1:
+        timed(f'engine {scrape.html_parser()}, {workers} processes',
+              lambda files: [b for _, b, _ in scrape.iter_parsed_files(files, workers)], paths)
+    stats = timed('ingest into DB', lambda files: scrape.ingest_directory(corpus, workers), paths)
+    expected = pages * 4 * 5
+    if stats['skins'] != expected or stats['errors']:
+        problems.append(f"ingested {stats['skins']} skins (expected {expected}), {len(stats['errors'])} errors")
+    for problem in problems:
+        print('  ' + problem)
+    return not problems
+
+def start_catalog_server(pages, validators=True):
+    """
+    Local stand-in catalog server (keep-alive HTTP/1.1). pages: {path: bytes}, test ke
+    beech badla ja sakta hai. validators=False par ETag/Last-Modified nahi bhejta.
+    Return: (server, stats) - stats me requests, 200/304 counts, body bytes, connections.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    stats = {'requests': 0, 'full': 0, 'not_modified': 0, 'bytes': 0, 'connections': set()}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            body = pages.get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            not_modified = validators and self.headers.get('If-None-Match') == etag
+            with lock:
+                stats['requests'] += 1
+                stats['connections'].add(self.client_address)
+                stats['not_modified' if not_modified else 'full'] += 1
+                stats['bytes'] += 0 if not_modified else len(body)
+            self.send_response(304 if not_modified else 200)
+            if validators:
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', 'Sat, 17 Oct 2026 10:00:00 GMT')
+            if not_modified:
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+def bench_fetch(rounds=20, bundles=40):
+    """
+    Catalog refresh benchmark local stand-in server par: purana path (har baar naya
+    requests.get + parse + DB sync) vs scrape_valorant_skins() ka conditional GET path
+    (304 / same-hash par parse skip), validators wale aur bina validators wale server par.
+    """
+    import requests
+    use_temp_database()
+    workdir = tempfile.mkdtemp(prefix='valorant-fetch-')
+    fetch.FETCH_CACHE_DIR = os.path.join(workdir, 'http-cache')
+    write_catalog_fixtures(os.path.join(workdir, 'pages'), 1, bundles_per_page=bundles)
+    with open(os.path.join(workdir, 'pages', 'page00000.html'), 'rb') as f:
+        page = f.read()
+    problems = []
+    results = {}
+
+    def refreshes(label, run, server_stats):
+        start = time.perf_counter()
+        reports = [run() for _ in range(rounds)]
+        seconds = time.perf_counter() - start
+        results[label] = seconds / rounds
+        print(f'  {label}: {seconds / rounds * 1000:.1f} ms/refresh, {server_stats["full"]} full / '
+              f'{server_stats["not_modified"]} 304 responses, {server_stats["bytes"] / 1024:.0f} KiB, '
+              f'{len(server_stats["connections"])} connections')
+        return reports
+
+    # scrape_valorant_skins() CSV cwd me likhta hai - temp dir me chalao
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    scrape.LIVE_SCRAPE = True
+    try:
+        print(f'fetch: {len(page) / 1024:.0f} KiB catalog page, {rounds} refreshes each')
+        for validators in (True, False):
+            pages = {'/skins': page}
+            server, stats = start_catalog_server(pages, validators)
+            url = f'http://127.0.0.1:{server.server_address[1]}/skins'
+            kind = 'with validators' if validators else 'no validators'
+            if validators:
+                def legacy():
+                    response = requests.get(url)
+                    return scrape._save_bundles(scrape.parse_skins_html(response.content))
+                refreshes(f'legacy get + parse ({kind})', legacy, stats)
+                for key in ('requests', 'full', 'not_modified', 'bytes'):
+                    stats[key] = 0
+                stats['connections'].clear()
+            scrape.URL = url
+            fetch.forget(url)
+            parsed = [report['bundles'] for report in
+                      refreshes(f'conditional fetch ({kind})', scrape.scrape_valorant_skins, stats)]
+            if parsed[0] != bundles or any(parsed[1:]):
+                problems.append(f'{kind}: expected one full ingest then no-ops, got {parsed}')
+            if len(stats['connections']) != 1:
+                problems.append(f'{kind}: session opened {len(stats["connections"])} connections')
+            # Page badla - agla refresh use pakadna chahiye
+            pages['/skins'] = page.replace(b'Set 0 Bundle', b'Set 0 Renamed Bundle')
+            if scrape.scrape_valorant_skins()['bundles'] != bundles:
+                problems.append(f'{kind}: changed page was not re-ingested')
+            server.shutdown()
+    finally:
+        os.chdir(cwd)
+    for problem in problems:
+        print('  ' + problem)
+    return not problems
+
+def _legacy_replace_catalog(bundles):
+    """Purana insert_sample_data.py tareeka: saara catalog DELETE karke dobara INSERT. Return: rows written."""
+    with db.get_connection(immediate=True) as conn:
+        before = conn.total_changes
+        conn.execute('DELETE FROM bundle_skins')
+        conn.execute('DELETE FROM bundles')
+        for bundle in bundles:
+            bundle_id = conn.execute('INSERT INTO bundles (bundle_name) VALUES (?)', (bundle['bundle_name'],)).lastrowid
+            ids = db.item_ids(conn, 'skins', [skin['skin_name'] for skin in bundle['skins']])
+            conn.executemany('''
+                INSERT INTO bundle_skins (bundle_id, item_id, skin_type, value_vp, image_url)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(bundle_id, ids[skin['skin_name']], skin['skin_type'], skin['value_vp'], skin.get('image_url'))
+                  for skin in bundle['skins']])
+        written = conn.total_changes - before
+    db.invalidate_catalog()
+    return written
+
+def bench_catalog(bundles=500, skins_per_bundle=5, users=200, changed=0.01, rounds=3):
+    """
+    Catalog sync benchmark: purana delete-all + re-insert vs db.sync_catalog (diff). Fail agar
+    no-op sync koi row likhe, changed prices ka report galat ho, duplicate listings bachein
+    ya account_value reconcile mismatch dikhaye.
+    """
+    use_temp_database()
+    rng = random.Random(0)
+    catalog = [{'bundle_name': f'Bench Bundle {b}',
+                'skins': [{'skin_name': f'Bench Skin {b}-{s}', 'skin_type': 'gun',
+                           'value_vp': rng.choice([875, 1275, 1775, 2175]), 'image_url': None}
+                          for s in range(skins_per_bundle)]} for b in range(bundles)]
+    db.sync_catalog(catalog)
+    db.create_users_bulk({'username': f'cat{i}', 'email': f'cat{i}@valorant.com', 'password': 'pw',
+                          'name': 'Bench', 'region': 'EU', 'country': 'France'} for i in range(users))
+    with db.get_connection(immediate=True) as conn:
+        user_ids = [row[0] for row in conn.execute('SELECT id FROM users')]
+        bundle_ids = [row[0] for row in conn.execute('SELECT id FROM bundles')]
+        conn.execute('UPDATE store SET valorant_points = 10000000')
+    for user_id in user_ids:
+        for bundle_id in rng.sample(bundle_ids, 4):
+            db.purchase_bundle(user_id, bundle_id)
+
+    problems = []
+    print(f'catalog: {bundles} bundles x {skins_per_bundle} skins, {users} users owning 4 bundles each')
+
+    def timed(label, run):
+        start = time.perf_counter()
+        reports = [run() for _ in range(rounds)]
+        seconds = (time.perf_counter() - start) / rounds
+        written = reports[-1] if isinstance(reports[-1], int) else reports[-1]['rows_written']
+        print(f'  {label}: {seconds * 1000:.1f} ms, {written} rows written')
+        return reports
+
+    timed('legacy delete + re-insert', lambda: _legacy_replace_catalog(catalog))
+    noop = timed('sync (no changes)', lambda: db.sync_catalog(catalog))
+    if any(report['rows_written'] for report in noop):
+        problems.append(f'no-op sync wrote rows: {noop[-1]}')
+
+    repriced = 0
+    for bundle in catalog:
+        for skin in bundle['skins']:
+            if rng.random() < changed:
+                skin['value_vp'] += 100
+                repriced += 1
+    start = time.perf_counter()
+    report = db.sync_catalog(catalog)
+    print(f'  sync ({repriced} repriced): {(time.perf_counter() - start) * 1000:.1f} ms, '
+          f'{report["rows_written"]} rows written')
+    if report['skins_updated'] != repriced or report['skins_added'] or report['skins_removed']:
+        problems.append(f'repriced {repriced} skins, sync reported {report}')
+
+    with db.get_connection() as conn:
+        duplicates = conn.execute('SELECT COUNT(*) - COUNT(DISTINCT bundle_id || \'-\' || item_id) '
+                                  'FROM bundle_skins').fetchone()[0]
+    if duplicates:
+        problems.append(f'{duplicates} duplicate bundle listings')
+    mismatches = db.reconcile_account_values()
+    if mismatches:
+        problems.append(f'{len(mismatches)} account_value mismatches after sync')
+    for problem in problems:
+        print('  ' + problem)
+    return not problems
+
+def _async_workload(clients, ops, user_ids, skins, seed=0):
+    """Har client ke liye (function name, args) ops: zyada tar profile reads, kuch hot users par."""
+    rng = random.Random(seed)
+    hot = user_ids[:max(1, len(user_ids) // 10)]
+    plans = []
+    for _ in range(clients):
+        plan = []
+        for _ in range(ops):
+            user_id = rng.choice(hot if rng.random() < 0.5 else user_ids)
+            roll = rng.random()
+            if roll < 0.6:
+                plan.append(('get_user_data', (user_id,)))
+            elif roll < 0.75:
+                plan.append(('get_match_page', (user_id,)))
+            elif roll < 0.9:
+                plan.append(('add_match_history', (user_id, rng.choice(['Win', 'Loss']), '13-7')))
+            else:
+                plan.append(('purchase_skin', (user_id, rng.choice(skins))))
+        plans.append(plan)
+    return plans
+
+def bench_async(clients=200, ops=20, users=500, cache=False):
+    """
+    Async API load test: `clients` asyncio clients, har ek `ops` calls (reads + writes).
+    Teen raaste: sync functions seedhe event loop me (blocking), asyncio.to_thread, aur
+    async_db (DB thread + batching + coalescing). Read cache default band hai taaki har
+    read DB tak jaye. Fail agar koi call error de ya match rows / account values na milein.
+    """
+    use_temp_database()
+    if not cache:
+        db.read_cache.ttl = 0
+    prices = _seed_catalog(bundle_count=20, skins_per_bundle=5)
+    db.create_users_bulk({'username': f'api{i}', 'email': f'api{i}@valorant.com', 'password': 'pw',
+                          'name': 'Bench', 'region': 'EU', 'country': 'France'} for i in range(users))
+    with db.get_connection(immediate=True) as conn:
+        user_ids = [row[0] for row in conn.execute('SELECT id FROM users ORDER BY id')]
+        conn.execute('UPDATE store SET valorant_points = 10000000')
+    plans = _async_workload(clients, ops, user_ids, sorted(prices))
+    match_calls = sum(name == 'add_match_history' for plan in plans for name, args in plan)
+
+    def blocking(name):
+        async def call(*args):
+            return getattr(db, name)(*args)
+        return call
+
+    def threaded(name):
+        async def call(*args):
+            return await asyncio.to_thread(getattr(db, name), *args)
+        return call
+
+    async def run(resolve):
+        latencies, errors = [], []
+
+        async def client(plan):
+            for name, args in plan:
+                start = time.perf_counter()
+                try:
+                    await resolve(name)(*args)
+                except Exception as e:
+                    errors.append(f'{name}: {type(e).__name__}: {e}')
+                latencies.append(time.perf_counter() - start)
+
+        async def ticker():
+            # Event loop kitni der tak kisi aur kaam (HTTP I/O) ke liye available nahi tha
+            while True:
+                tick = time.perf_counter()
+                await asyncio.sleep(0.001)
+                stalls.append(time.perf_counter() - tick - 0.001)
+
+        stalls = []
+        monitor = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        await asyncio.gather(*(client(plan) for plan in plans))
+        elapsed = time.perf_counter() - start
+        # Ticker ko aakhri stall bhi record karne do
+        await asyncio.sleep(0.005)
+        monitor.cancel()
+        return elapsed, latencies, errors, max(stalls, default=0.0)
+
+    print(f'async: {clients} clients x {ops} ops, {users} users, read cache {"on" if cache else "off"}')
+    problems = []
+    for label, resolve in (('sync (blocking the loop)', blocking), ('sync via to_thread', threaded),
+                           ('async_db', lambda name: getattr(async_db, name))):
+        elapsed, latencies, errors, stall = asyncio.run(run(resolve))
+        cuts = statistics.quantiles(latencies, n=100)
+        print(f'  {label}: {len(latencies) / elapsed:.0f} ops/s, p50 {cuts[49] * 1000:.1f} ms, '
+              f'p99 {cuts[98] * 1000:.1f} ms, longest loop stall {stall * 1000:.1f} ms, {len(errors)} errors')
+        problems.extend(errors[:3])
+    counters = async_db.stats()
+    async_db.shutdown()
+    print(f'  async_db: {counters["calls"]} calls in {counters["batches"]} batches / '
+          f'{counters["transactions"]} transactions, {counters["coalesced"]} reads coalesced')
+
+    with db.get_connection() as conn:
+        matches = conn.execute('SELECT COUNT(*) FROM match_history').fetchone()[0]
+    if matches != 3 * match_calls:
+        problems.append(f'expected {3 * match_calls} match rows, found {matches}')
+    mismatches = db.reconcile_account_values()
+    if mismatches:
+        problems.append(f'{len(mismatches)} account_value mismatches')
+    for problem in problems:
+        print('  ' + problem)
+    return not problems
+
+def _latency_summary(label, samples):
+    cuts = statistics.quantiles(samples, n=100)
+    print(f'  {label}: p50 {cuts[49] * 1000:.2f} ms, p99 {cuts[98] * 1000:.2f} ms '
+          f'({len(samples)} requests, {len(samples) / sum(samples):.0f} req/s serial)')
+    return cuts[49]
+
+def bench_profile(requests_count=300, users=50, matches=40, streamlit_runs=20):
+    """
+    Shared profile link (?user_id=) latency: Streamlit script run (AppTest - websocket aur
+    browser ke bina, yani Streamlit ke liye best case) vs profile_api over HTTP: cold
+    (cache khaali), warm, aur If-None-Match revalidation (304). Fail agar 304 na mile,
+    write ke baad ETag na badle ya Cache-Control na ho.
+    """
+    import requests
+    import uvicorn
+    from streamlit.testing.v1 import AppTest
+    import profile_api
+    use_temp_database()
+    prices = _seed_catalog(bundle_count=10, skins_per_bundle=5)
+    db.create_users_bulk({'username': f'pub{i}', 'email': f'pub{i}@valorant.com', 'password': 'pw',
+                          'name': f'Player {i}', 'region': 'EU', 'country': 'France'} for i in range(users))
+    rng = random.Random(0)
+    with db.get_connection(immediate=True) as conn:
+        user_ids = [row[0] for row in conn.execute("SELECT id FROM users WHERE username LIKE 'pub%'")]
+        conn.execute('UPDATE store SET valorant_points = 10000000')
+    for user_id in user_ids:
+        for skin in rng.sample(sorted(prices), 5):
+            db.purchase_skin(user_id, skin)
+        for _ in range(matches):
+            db.add_match_history(user_id, rng.choice(['Win', 'Loss']), f'13-{rng.randrange(12)}')
+
+    # Lifespan off: wo pool ko query_only bana deta, aur ye benchmark isi process me writes bhi karta hai
+    db.require_schema()
+    server = uvicorn.Server(uvicorn.Config(profile_api.app, host='127.0.0.1', port=0, log_level='warning',
+                                           lifespan='off'))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    # Bare-mode AppTest warnings aur har request ki access log line output ko dhak deti hain
+    # (uvicorn start par logging config dobara lagata hai, isliye uske baad)
+    for name in ('uvicorn.access', 'streamlit.runtime.scriptrunner_utils.script_run_context'):
+        logging.getLogger(name).disabled = True
+    base = f'http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}/'
+    session = requests.Session()
+    problems = []
+    print(f'profile: {users} users, {matches} matches and 5 skins each')
+
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+    samples = []
+    for i in range(streamlit_runs + 1):
+        user_id = rng.choice(user_ids)
+        at = AppTest.from_file(app_path, default_timeout=60)
+        at.query_params['user_id'] = str(user_id)
+        start = time.perf_counter()
+        at.run()
+        if i:
+            # Pehla run imports warm karta hai
+            samples.append(time.perf_counter() - start)
+        if at.exception or not at.title or 'Player' not in at.title[0].value:
+            problems.append(f'streamlit view failed for user {user_id}: {[e.message for e in at.exception]}')
+            break
+    streamlit_p50 = _latency_summary('streamlit script run (AppTest)', samples)
+
+    def timed(label, make_headers, clear_cache=False, expect=200):
+        samples = []
+        for _ in range(requests_count):
+            user_id = rng.choice(user_ids)
+            if clear_cache:
+                db.read_cache.clear()
+            start = time.perf_counter()
+            response = session.get(base, params={'user_id': user_id}, headers=make_headers(user_id))
+            samples.append(time.perf_counter() - start)
+            if response.status_code != expect:
+                problems.append(f'{label}: expected {expect}, got {response.status_code}')
+                break
+        return _latency_summary(label, samples)
+
+    etags = {user_id: session.get(base, params={'user_id': user_id}).headers['ETag'] for user_id in user_ids}
+    timed('profile_api cold (no cache)', lambda user_id: {}, clear_cache=True)
+    warm_p50 = timed('profile_api warm', lambda user_id: {})
+    timed('profile_api revalidate (304)', lambda user_id: {'If-None-Match': etags[user_id]}, expect=304)
+    print(f'  warm profile_api is {streamlit_p50 / warm_p50:.0f}x faster than the Streamlit script run')
+
+    user_id = user_ids[0]
+    response = session.get(base, params={'user_id': user_id}, headers={'If-None-Match': etags[user_id]})
+    if 'max-age' not in response.headers.get('Cache-Control', ''):
+        problems.append('no Cache-Control max-age on profile responses')
+    db.add_match_history(user_id, 'Win', '13-0')
+    response = session.get(base, params={'user_id': user_id}, headers={'If-None-Match': etags[user_id]})
+    if response.status_code != 200 or response.headers['ETag'] == etags[user_id]:
+        problems.append('profile document did not change after a new match')
+    server.should_exit = True
+    for problem in problems:
+        print('  ' + problem)
+    return not problems
+
+# Ye modules app start par kabhi load nahi hone chahiye - sirf unke pages/actions par
+LAZY_MODULES = ('pandas', 'numpy', 'requests', 'bs4', 'pyarrow', 'openpyxl')
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+def _import_times(module, env):
+    """
+    Naye interpreter me `python -X importtime -c 'import module'`.
+    Return: (module ka cumulative ms, {direct import: cumulative ms}, saare loaded module names)
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if proc.returncode:
+        raise RuntimeError(f'import {module} failed:\n{proc.stderr[-2000:]}')
+    rows = [(match.group(4), int(match.group(2)) / 1000, len(match.group(3)) // 2)
+            for match in map(_IMPORTTIME_RE.match, proc.stderr.splitlines()) if match]
+    # importtime me children parent se pehle aate hain: module ki line tak, pichhli top-level line ke baad
+    end = next(i for i, (name, ms, depth) in enumerate(rows) if name == module and depth == 0)
+    start = max((i for i in range(end) if rows[i][2] == 0), default=-1) + 1
+    children = {name: ms for name, ms, depth in rows[start:end] if depth == 1}
+    return rows[end][1], children, {name for name, ms, depth in rows[start:end]}
+
+def bench_imports(module='app', runs=5, budget_ms=700.0, top=10):
+    """
+    Cold start benchmark: naye interpreter me `import module` ka -X importtime.
+    Fail agar median cumulative time budget se zyada ho ya koi LAZY_MODULES start par load ho.
+    Temp DB pehle ek baar bana li jati hai, taaki naapa gaya start wahi ho jo har
+    naye Streamlit worker ko milta hai.
+    """
+    env = dict(os.environ, VALORANT_DB_PATH=os.path.join(tempfile.mkdtemp(prefix='valorant-bench-'), 'bench.db'))
+    _import_times(module, env)
+    samples = [_import_times(module, env) for _ in range(runs)]
+    totals = [total for total, children, loaded in samples]
+    median = statistics.median(totals)
+    children = {name: statistics.median(sample[1].get(name, 0) for sample in samples) for name in samples[0][1]}
+    eager = sorted({name.split('.')[0] for sample in samples for name in sample[2]} & set(LAZY_MODULES))
+
+    print(f'imports: {module} median {median:.0f} ms over {runs} runs '
+          f'(min {min(totals):.0f}, max {max(totals):.0f}), budget {budget_ms:.0f} ms')
+    for name, ms in sorted(children.items(), key=lambda item: -item[1])[:top]:
+        print(f'  {name}: {ms:.1f} ms')
+    if eager:
+        print(f'  eagerly imported (should be lazy): {", ".join(eager)}')
+    return median <= budget_ms and not eager
+
+BENCHMARKS = {
+    'purchase': bench_purchase,
+    'valuation': bench_valuation,
+    'login': bench_login,
+    'imports': bench_imports,
+    'parse': bench_parse,
+    'fetch': bench_fetch,
+    'catalog': bench_catalog,
+    'async': bench_async,
+    'profile': bench_profile,
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Valorant account system benchmarks')
+    sub = parser.add_subparsers(dest='name', required=True)
+    purchase = sub.add_parser('purchase', help='concurrent purchase / lost-update check')
+    purchase.add_argument('--threads', type=int, default=16)
+    purchase.add_argument('--users', type=int, default=20)
+    purchase.add_argument('--attempts', type=int, default=200)
+    valuation = sub.add_parser('valuation', help='catalog size, account valuation and profile load cost')
+    valuation.add_argument('--users', type=int, default=5000)
+    valuation.add_argument('--owned', type=int, default=20)
+    login = sub.add_parser('login', help='concurrent login latency (p50/p95/p99)')
+    login.add_argument('--threads', type=int, default=16)
+    login.add_argument('--users', type=int, default=50)
+    login.add_argument('--logins', type=int, default=10, help='logins per thread')
+    login.add_argument('--no-cache', action='store_true', help='disable the verified-login cache')
+    login.add_argument('--legacy', action='store_true', help='start from legacy SHA-256 hashes')
+    imports = sub.add_parser('imports', help='cold start import time (-X importtime) with a budget')
+    imports.add_argument('--module', default='app')
+    imports.add_argument('--runs', type=int, default=5)
+    imports.add_argument('--budget-ms', type=float, default=700.0)
+    parse = sub.add_parser('parse', help='offline catalog page parsing / ingestion throughput')
+    parse.add_argument('--pages', type=int, default=2000)
+    parse.add_argument('--workers', type=int, default=None)
+    parse.add_argument('--legacy-sample', type=int, default=200)
+    fetch_parser = sub.add_parser('fetch', help='conditional-GET catalog refresh against a local stand-in server')
+    fetch_parser.add_argument('--rounds', type=int, default=20)
+    fetch_parser.add_argument('--bundles', type=int, default=40)
+    catalog = sub.add_parser('catalog', help='diff-based catalog sync vs delete + re-insert')
+    catalog.add_argument('--bundles', type=int, default=500)
+    catalog.add_argument('--users', type=int, default=200)
+    catalog.add_argument('--changed', type=float, default=0.01, help='fraction of skins repriced')
+    async_parser = sub.add_parser('async', help='async API load test: blocking vs to_thread vs async_db')
+    async_parser.add_argument('--clients', type=int, default=200)
+    async_parser.add_argument('--ops', type=int, default=20, help='calls per client')
+    async_parser.add_argument('--users', type=int, default=500)
+    async_parser.add_argument('--cache', action='store_true', help='keep the read cache on')
+    profile = sub.add_parser('profile', help='shared profile link latency: Streamlit script vs profile_api')
+    profile.add_argument('--requests', dest='requests_count', type=int, default=300)
+    profile.add_argument('--users', type=int, default=50)
+    profile.add_argument('--streamlit-runs', type=int, default=20)
+    args = vars(parser.parse_args(argv))
+    ok = BENCHMARKS[args.pop('name')](**args)
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
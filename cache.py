@@ -0,0 +1,162 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    Thread-safe TTL + LRU cache. Keys tuples hote hain, jinka pehla element
+    namespace aur doosra (agar ho) user_id hota hai - isse per-user invalidation hoti hai.
+    Values copy karke return hoti hain taaki caller cache ko mutate na kar sake.
+
+    Loader ke chalte waqt key invalidate ho jaye (doosre thread ka write commit hua) to
+    loader ka purana result cache me nahi jana chahiye. Isliye chal rahe loads ki har key
+    ki generation hai: begin(key) token deta hai, invalidate / clear generation badhate hain,
+    aur set(key, value, token) token purana ho to value drop kar deta hai.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> [chal rahe loads, generation]; sirf un keys ke liye jinka load chal raha hai
+        self._loading = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] < time.monotonic():
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def begin(self, key):
+        """
+        Load shuru karne se pehle (DB read se pehle) call karo. Return: token jo set() ko
+        dena hai; load fail ho to abort(key, token).
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            state = self._loading.setdefault(key, [0, 0])
+            state[0] += 1
+            return state[1]
+
+    def _finish(self, key, token):
+        """Load khatam; True agar beech me key invalidate nahi hui. Lock ke andar call karo."""
+        state = self._loading[key]
+        state[0] -= 1
+        if not state[0]:
+            del self._loading[key]
+        return state[1] == token
+
+    def abort(self, key, token):
+        if token is not None:
+            with self._lock:
+                self._finish(key, token)
+
+    def set(self, key, value, token=None):
+        """token: begin(key) wala; diya ho aur key tab se invalidate hui ho to value drop hoti hai."""
+        with self._lock:
+            if token is not None and not self._finish(key, token):
+                return
+            if not self.enabled:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            token = self.begin(key)
+            try:
+                value = loader()
+            except BaseException:
+                self.abort(key, token)
+                raise
+            self.set(key, value, token)
+        return value
+
+    def invalidate(self, namespace=None, user_id=None):
+        """namespace aur/ya user_id se match hone wali saari entries hata deta hai."""
+        def matches(k):
+            return ((namespace is None or k[0] == namespace)
+                    and (user_id is None or (len(k) > 1 and k[1] == user_id)))
+        with self._lock:
+            for key in [k for k in self._data if matches(k)]:
+                del self._data[key]
+            self._bump(matches)
+
+    def invalidate_users(self, user_ids):
+        """Kai users ki entries ek hi pass me hata deta hai."""
+        user_ids = set(user_ids)
+        def matches(k):
+            return len(k) > 1 and k[1] in user_ids
+        with self._lock:
+            for key in [k for k in self._data if matches(k)]:
+                del self._data[key]
+            self._bump(matches)
+
+    def _bump(self, matches):
+        # Chal rahe loads jinki key match hoti hai unka result ab purana hai
+        for key, state in self._loading.items():
+            if matches(key):
+                state[1] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bump(lambda key: True)
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses}
+
+class InternCache:
+    """
+    (namespace, name) -> integer id ka process-wide map. Interned ids kabhi badalte
+    nahi, isliye TTL ya eviction nahi hai - sirf DB badalne par clear().
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def ids(self, namespace, names):
+        """Return: ({name: id} jo cache me mile, [missing names])"""
+        found, missing = {}, []
+        for name in names:
+            item_id = self._ids.get((namespace, name))
+            if item_id is None:
+                missing.append(name)
+            else:
+                found[name] = item_id
+        return found, missing
+
+    def add(self, rows):
+        """rows: [(id, namespace, name)]"""
+        with self._lock:
+            for item_id, namespace, name in rows:
+                self._ids[(namespace, name)] = item_id
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+
+    def __len__(self):
+        return len(self._ids)
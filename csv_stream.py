@@ -0,0 +1,35 @@
+import csv
+import io
+
+def iter_csv_records(binary_file, required_columns, encoding='utf-8-sig'):
+    """
+    Binary upload (Streamlit UploadedFile / file object) ki CSV rows ek-ek karke
+    dicts me yield karta hai - poori file kabhi parse ho kar memory me nahi aati.
+    Header me required_columns na hon to ValueError.
+    """
+    binary_file.seek(0)
+    text = io.TextIOWrapper(binary_file, encoding=encoding, newline='')
+    try:
+        reader = csv.reader(text)
+        header = [column.strip() for column in next(reader, [])]
+        missing = [column for column in required_columns if column not in header]
+        if missing:
+            raise ValueError(f"CSV must have these columns: {', '.join(required_columns)}")
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            yield dict(zip(header, row))
+    finally:
+        # Wrapper band hone par upload band na ho
+        text.detach()
+
+def iter_batches(iterable, size):
+    """Iterable ko `size` tak ki lists me todta hai."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
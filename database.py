@@ -1,11 +1,333 @@
+import atexit
 import sqlite3
-import hashlib
+import json
+import os
+import queue
+import re
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
-def init_database():
-    conn = sqlite3.connect('valorant_game.db')
+import passwords
+from cache import InternCache, TTLCache
+from csv_stream import iter_batches
+
+# Database file aur pool settings env se override ho sakti hain
+DB_PATH = os.environ.get('VALORANT_DB_PATH', 'valorant_game.db')
+POOL_SIZE = int(os.environ.get('VALORANT_DB_POOL_SIZE', '8'))
+DB_PROFILE = os.environ.get('VALORANT_DB_PROFILE', 'balanced')
+CHECKPOINT_INTERVAL = float(os.environ.get('VALORANT_DB_CHECKPOINT_INTERVAL', '60'))
+CACHE_TTL = float(os.environ.get('VALORANT_CACHE_TTL', '300'))
+CACHE_SIZE = int(os.environ.get('VALORANT_CACHE_SIZE', '4096'))
+# Admin pages / jobs (sab users ka export) sirf in usernames ya user ids ke liye, comma separated
+ADMIN_USERS = frozenset(filter(None, (name.strip() for name in os.environ.get('VALORANT_ADMIN_USERS', '').split(','))))
+
+# Durability/performance profiles - har nayi connection par sirf ek baar lagte hain
+DB_PROFILES = {
+    # WAL + FULL sync: power loss par bhi committed data safe
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'busy_timeout': 10000,
+        'cache_size': -16000,
+        'mmap_size': 0,
+        'temp_store': 'MEMORY',
+        'journal_size_limit': 67108864,
+    },
+    # Concurrent Streamlit sessions ke liye default
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -32000,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'journal_size_limit': 67108864,
+    },
+    # Purana rollback-journal behaviour
+    'legacy': {
+        'temp_store': 'MEMORY',
+    },
+}
+
+def load_pragmas(profile=None):
+    """
+    Profile ke PRAGMAs return karta hai. Har PRAGMA env se override ho sakta hai,
+    jaise VALORANT_DB_BUSY_TIMEOUT=20000 ya VALORANT_DB_SYNCHRONOUS=FULL.
+    """
+    profile = profile or DB_PROFILE
+    if profile not in DB_PROFILES:
+        raise ValueError(f'Unknown database profile: {profile}')
+    pragmas = dict(DB_PROFILES[profile])
+    for name in {name for settings in DB_PROFILES.values() for name in settings}:
+        override = os.environ.get(f'VALORANT_DB_{name.upper()}')
+        if override:
+            pragmas[name] = override
+    return pragmas
+
+class ConnectionPool:
+    """
+    Thread-safe SQLite connection pool.
+    Har thread ko ek time par ek hi connection milta hai; same thread me nested
+    calls wahi connection (SAVEPOINT ke sath) reuse karti hain.
+    """
+
+    def __init__(self, db_path=DB_PATH, pool_size=POOL_SIZE, pragmas=None, timeout=30.0):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.pragmas = load_pragmas() if pragmas is None else dict(pragmas)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._local = threading.local()
+        self._all = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout,
+                               isolation_level=None, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        with self._lock:
+            self._all.add(conn)
+        return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            self._all.discard(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    @staticmethod
+    def is_healthy(conn):
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return not conn.in_transaction
+        except sqlite3.Error:
+            return False
+
+    def _acquire(self):
+        if self._closed:
+            raise sqlite3.ProgrammingError('Connection pool is closed.')
+        if not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError('Timed out waiting for a pooled connection.')
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                if self.is_healthy(conn):
+                    return conn
+                self._discard(conn)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, conn):
+        try:
+            if self._closed or not self.is_healthy(conn):
+                self._discard(conn)
+            else:
+                self._idle.put_nowait(conn)
+        except queue.Full:
+            self._discard(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, immediate=False):
+        """
+        Transaction scope. Outermost block BEGIN/COMMIT karta hai, nested block
+        SAVEPOINT; exception par rollback hota hai.
+        """
+        state = self._local
+        conn = getattr(state, 'conn', None)
+        if conn is not None:
+            state.depth += 1
+            savepoint = f'sp_{state.depth}'
+            pending = len(state.on_commit)
+            conn.execute(f'SAVEPOINT {savepoint}')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute(f'ROLLBACK TO {savepoint}')
+                conn.execute(f'RELEASE {savepoint}')
+                # Rollback hue savepoint ke callbacks bhi hatao
+                del state.on_commit[pending:]
+                raise
+            else:
+                conn.execute(f'RELEASE {savepoint}')
+            finally:
+                state.depth -= 1
+            return
+
+        conn = self._acquire()
+        state.conn, state.depth, state.on_commit = conn, 0, []
+        try:
+            conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        else:
+            if conn.in_transaction:
+                conn.commit()
+            callbacks = state.on_commit
+        finally:
+            state.conn, state.on_commit = None, []
+            self._release(conn)
+        for callback in callbacks:
+            callback()
+
+    def after_commit(self, callback):
+        """
+        Current thread ka transaction commit hone ke baad callback chalata hai
+        (rollback par nahi). Transaction ke bahar turant chalta hai.
+        """
+        if getattr(self._local, 'conn', None) is None:
+            callback()
+        else:
+            self._local.on_commit.append(callback)
+
+    def checkpoint(self, mode='TRUNCATE'):
+        """
+        WAL ko main DB me checkpoint karta hai (transaction ke bahar).
+        Return: (busy, wal_pages, checkpointed_pages)
+        """
+        conn = self._acquire()
+        try:
+            return conn.execute(f'PRAGMA wal_checkpoint({mode})').fetchone()
+        finally:
+            self._release(conn)
+
+    def close_all(self):
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        with self._lock:
+            leftover = list(self._all)
+        for conn in leftover:
+            self._discard(conn)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH, POOL_SIZE)
+    return _pool
+
+def configure_pool(db_path=None, pool_size=None, pragmas=None):
+    """Pool ko naye settings ke sath dobara banata hai (purani connections band)."""
+    global _pool, DB_PATH
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        if db_path is not None:
+            DB_PATH = db_path
+        _pool = ConnectionPool(DB_PATH, pool_size or POOL_SIZE, pragmas)
+    read_cache.clear()
+    item_cache.clear()
+    return _pool
+
+def get_connection(immediate=False):
+    """Pooled connection ka transaction context: `with get_connection() as conn:`"""
+    return get_pool().connection(immediate=immediate)
+
+# Process-wide read cache. Har write function apne transaction me get_pool().after_commit()
+# se sirf apne user ya catalog ki entries invalidate karta hai (commit ke baad, rollback par nahi).
+read_cache = TTLCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+# items catalog ke (item_type, name) -> id; sirf committed rows isme aati hain
+item_cache = InternCache()
+_catalog_version = 0
+
+def catalog_version():
+    return _catalog_version
+
+def invalidate_user(user_id):
+    read_cache.invalidate(user_id=user_id)
+
+def invalidate_catalog():
+    """Catalog (bundles/prices) badla: version bump karo aur catalog-dependent entries hatao."""
+    global _catalog_version
+    with _pool_lock:
+        _catalog_version += 1
+    read_cache.invalidate('catalog')
+    read_cache.invalidate('account_value')
+    read_cache.invalidate('account_total')
+
+class WalCheckpointer(threading.Thread):
+    """
+    Background thread jo har `interval` seconds par WAL checkpoint karta hai. Default
+    PASSIVE: readers / writers ka wait nahi karta, isliye app ke writes kabhi is par
+    busy_timeout tak nahi rukte; WAL file journal_size_limit se chhoti rehti hai.
+    TRUNCATE (sab readers ka wait) sirf shutdown / maintenance par - stop_checkpointer().
+    """
+
+    def __init__(self, interval=CHECKPOINT_INTERVAL, mode='PASSIVE'):
+        super().__init__(name='wal-checkpointer', daemon=True)
+        self.interval = interval
+        self.mode = mode
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                get_pool().checkpoint(self.mode)
+            except sqlite3.Error:
+                # Busy DB par agli baar try karenge
+                pass
+
+    def stop(self):
+        self._stop_event.set()
+
+_checkpointer = None
+
+def start_checkpointer(interval=CHECKPOINT_INTERVAL, mode='PASSIVE'):
+    """
+    Process me ek hi checkpointer chalata hai; dobara call karna safe hai.
+    Process exit par stop_checkpointer() ek TRUNCATE checkpoint karta hai.
+    """
+    global _checkpointer
+    with _pool_lock:
+        if _checkpointer is None or not _checkpointer.is_alive():
+            if _checkpointer is None:
+                atexit.register(stop_checkpointer)
+            _checkpointer = WalCheckpointer(interval, mode)
+            _checkpointer.start()
+    return _checkpointer
+
+def stop_checkpointer(truncate=True):
+    """
+    Checkpointer band karta hai; truncate=True par WAL ko poora main DB me likh kar
+    file 0 bytes kar deta hai (shutdown / maintenance). Return: checkpoint result ya None.
+    """
+    global _checkpointer
+    with _pool_lock:
+        checkpointer, _checkpointer = _checkpointer, None
+    if checkpointer is not None:
+        checkpointer.stop()
+        checkpointer.join()
+    if truncate:
+        try:
+            return get_pool().checkpoint('TRUNCATE')
+        except sqlite3.Error:
+            return None
+
+def _migration_001_base_schema(conn):
     cursor = conn.cursor()
-    
+
     # Users table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS users (
@@ -20,7 +342,7 @@ def init_database():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    
+
     # User details table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS user_details (
@@ -38,7 +360,7 @@ def init_database():
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
-    
+
     # Store table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS store (
@@ -49,7 +371,7 @@ def init_database():
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
-    
+
     # Inventory tables
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS inventory_skins (
@@ -59,7 +381,7 @@ def init_database():
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
-    
+
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS inventory_battlepass (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -68,7 +390,7 @@ def init_database():
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
-    
+
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS inventory_buddies (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -77,7 +399,7 @@ def init_database():
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
-    
+
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS inventory_agents (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -86,7 +408,7 @@ def init_database():
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
-    
+
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS inventory_cards (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -95,7 +417,7 @@ def init_database():
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
-    
+
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS inventory_titles (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -104,7 +426,7 @@ def init_database():
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
-    
+
     # Skins table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS skins (
@@ -114,7 +436,7 @@ def init_database():
             tier TEXT NOT NULL
         )
     ''')
-    
+
     # Match history table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS match_history (
@@ -127,7 +449,7 @@ def init_database():
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
-    
+
     # Bundles table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS bundles (
@@ -147,189 +469,1128 @@ def init_database():
             FOREIGN KEY (bundle_id) REFERENCES bundles (id)
         )
     ''')
-    
-    conn.commit()
-    conn.close()
 
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+# Har per-user / skin_name lookup path ke liye secondary indexes
+INDEXES = {
+    'idx_inventory_skins_user_skin': 'inventory_skins (user_id, skin_name)',
+    'idx_inventory_battlepass_user': 'inventory_battlepass (user_id, battlepass_name)',
+    'idx_inventory_buddies_user': 'inventory_buddies (user_id, buddy_name)',
+    'idx_inventory_agents_user': 'inventory_agents (user_id, agent_name)',
+    'idx_inventory_cards_user': 'inventory_cards (user_id, card_name)',
+    'idx_inventory_titles_user': 'inventory_titles (user_id, title_name)',
+    'idx_match_history_user_date': 'match_history (user_id, match_date DESC)',
+    'idx_bundle_skins_skin_name': 'bundle_skins (skin_name)',
+    'idx_bundle_skins_bundle': 'bundle_skins (bundle_id)',
+}
+
+def create_indexes(conn):
+    """Schema migration step: missing indexes bana do (dobara chalana safe hai)."""
+    for name, target in INDEXES.items():
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {target}')
+
+def _migration_002_user_details_episode_act(conn):
+    # Purani DBs me episode/act columns nahi the
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(user_details)')}
+    for column in ('episode', 'act'):
+        if column not in columns:
+            conn.execute(f'ALTER TABLE user_details ADD COLUMN {column} TEXT')
+
+def _migration_003_indexes(conn):
+    create_indexes(conn)
+
+def _migration_004_unique_inventory_skins(conn):
+    # Race se bane duplicate rows hatao, phir (user_id, skin_name) UNIQUE karo
+    conn.execute('''
+        DELETE FROM inventory_skins WHERE id NOT IN (
+            SELECT MIN(id) FROM inventory_skins GROUP BY user_id, skin_name
+        )
+    ''')
+    conn.execute('DROP INDEX IF EXISTS idx_inventory_skins_user_skin')
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS uq_inventory_skins_user_skin ON inventory_skins (user_id, skin_name)')
+
+def _migration_005_account_value(conn):
+    # skin_values: har skin ka effective price (pehli bundle_skins listing)
+    # account_value: har user ki total skin value, triggers se incrementally maintained
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS skin_values (
+            skin_name TEXT PRIMARY KEY,
+            value_vp INTEGER
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS account_value (
+            user_id INTEGER PRIMARY KEY,
+            total_value_vp INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_inventory_skins_skin_name ON inventory_skins (skin_name)')
+
+    # Backfill
+    conn.execute('DELETE FROM skin_values')
+    conn.execute('''
+        INSERT INTO skin_values (skin_name, value_vp)
+        SELECT skin_name, value_vp FROM bundle_skins bs
+        WHERE id = (SELECT MIN(id) FROM bundle_skins WHERE skin_name = bs.skin_name)
+    ''')
+    conn.execute('DELETE FROM account_value')
+    conn.execute('''
+        INSERT INTO account_value (user_id, total_value_vp)
+        SELECT inv.user_id, COALESCE(SUM(sv.value_vp), 0)
+        FROM inventory_skins inv LEFT JOIN skin_values sv ON sv.skin_name = inv.skin_name
+        GROUP BY inv.user_id
+    ''')
+
+    def add_skin(user_expr, name_expr, sign):
+        return f'''
+            INSERT INTO account_value (user_id, total_value_vp)
+            VALUES ({user_expr}, {sign} COALESCE((SELECT value_vp FROM skin_values WHERE skin_name = {name_expr}), 0))
+            ON CONFLICT (user_id) DO UPDATE SET total_value_vp = total_value_vp + excluded.total_value_vp;'''
+
+    def refresh_price(name_expr):
+        # Owners ko (naya price - purana price) ka delta, phir skin_values update
+        return f'''
+            UPDATE account_value SET total_value_vp = total_value_vp
+                + COALESCE((SELECT value_vp FROM bundle_skins WHERE skin_name = {name_expr} ORDER BY id LIMIT 1), 0)
+                - COALESCE((SELECT value_vp FROM skin_values WHERE skin_name = {name_expr}), 0)
+            WHERE user_id IN (SELECT user_id FROM inventory_skins WHERE skin_name = {name_expr});
+            DELETE FROM skin_values WHERE skin_name = {name_expr};
+            INSERT INTO skin_values (skin_name, value_vp)
+                SELECT skin_name, value_vp FROM bundle_skins WHERE skin_name = {name_expr} ORDER BY id LIMIT 1;'''
+
+    triggers = {
+        'trg_inventory_skins_insert': ('AFTER INSERT ON inventory_skins',
+                                       add_skin('NEW.user_id', 'NEW.skin_name', '')),
+        'trg_inventory_skins_delete': ('AFTER DELETE ON inventory_skins',
+                                       add_skin('OLD.user_id', 'OLD.skin_name', '-')),
+        'trg_inventory_skins_update': ('AFTER UPDATE OF user_id, skin_name ON inventory_skins',
+                                       add_skin('OLD.user_id', 'OLD.skin_name', '-')
+                                       + add_skin('NEW.user_id', 'NEW.skin_name', '')),
+        'trg_bundle_skins_insert': ('AFTER INSERT ON bundle_skins', refresh_price('NEW.skin_name')),
+        'trg_bundle_skins_delete': ('AFTER DELETE ON bundle_skins', refresh_price('OLD.skin_name')),
+        'trg_bundle_skins_update': ('AFTER UPDATE OF skin_name, value_vp ON bundle_skins',
+                                    refresh_price('OLD.skin_name') + refresh_price('NEW.skin_name')),
+    }
+    for name, (event, body) in triggers.items():
+        conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+        conn.execute(f'CREATE TRIGGER {name} {event} BEGIN {body} END')
+
+def _migration_006_match_pagination(conn):
+    # Keyset pagination (match_date, id) ke liye index; purana (user_id, match_date) iska prefix hai
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_match_history_user_date_id '
+                 'ON match_history (user_id, match_date DESC, id DESC)')
+    conn.execute('DROP INDEX IF EXISTS idx_match_history_user_date')
+    # match_stats: har user ke win/loss/draw counts, triggers se maintained
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS match_stats (
+            user_id INTEGER PRIMARY KEY,
+            wins INTEGER NOT NULL DEFAULT 0,
+            losses INTEGER NOT NULL DEFAULT 0,
+            draws INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+    conn.execute('DELETE FROM match_stats')
+    conn.execute('''
+        INSERT INTO match_stats (user_id, wins, losses, draws)
+        SELECT user_id, SUM(result = 'Win'), SUM(result = 'Loss'), SUM(result = 'Draw')
+        FROM match_history GROUP BY user_id
+    ''')
+
+    def count(user_expr, result_expr, sign):
+        return f'''
+            INSERT INTO match_stats (user_id, wins, losses, draws)
+            VALUES ({user_expr}, {sign}({result_expr} = 'Win'), {sign}({result_expr} = 'Loss'), {sign}({result_expr} = 'Draw'))
+            ON CONFLICT (user_id) DO UPDATE SET wins = wins + excluded.wins,
+                losses = losses + excluded.losses, draws = draws + excluded.draws;'''
+
+    triggers = {
+        'trg_match_history_insert': ('AFTER INSERT ON match_history', count('NEW.user_id', 'NEW.result', '')),
+        'trg_match_history_delete': ('AFTER DELETE ON match_history', count('OLD.user_id', 'OLD.result', '-')),
+        'trg_match_history_update': ('AFTER UPDATE OF user_id, result ON match_history',
+                                     count('OLD.user_id', 'OLD.result', '-') + count('NEW.user_id', 'NEW.result', '')),
+    }
+    for name, (event, body) in triggers.items():
+        conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+        conn.execute(f'CREATE TRIGGER {name} {event} BEGIN {body} END')
+
+def _migration_007_structured_matches(conn):
+    # Score text ("13-7") se typed columns; played_at poora timestamp, mode/agent optional
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(match_history)')}
+    for column, kind in (('rounds_won', 'INTEGER'), ('rounds_lost', 'INTEGER'),
+                         ('played_at', 'TEXT'), ('mode', 'TEXT'), ('agent', 'TEXT')):
+        if column not in columns:
+            conn.execute(f'ALTER TABLE match_history ADD COLUMN {column} {kind}')
+    # Backfill: purani rows ka sirf din pata hai
+    conn.execute("UPDATE match_history SET played_at = match_date || ' 00:00:00' WHERE played_at IS NULL")
+    parsed = ((*parse_score(score), match_id)
+              for match_id, score in conn.execute('SELECT id, score FROM match_history WHERE rounds_won IS NULL').fetchall())
+    conn.executemany('UPDATE match_history SET rounds_won = ?, rounds_lost = ? WHERE id = ?',
+                     (row for row in parsed if row[0] is not None))
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_match_history_user_played '
+                 'ON match_history (user_id, played_at, id)')
+
+def _migration_008_unified_inventory(conn):
+    # Chhe inventory_* tables ki jagah ek inventory (user_id, item_type, item_id);
+    # naam items catalog me ek hi baar store hote hain
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY,
+            item_type TEXT NOT NULL,
+            name TEXT NOT NULL,
+            UNIQUE (item_type, name)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS inventory (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            item_type TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (item_id) REFERENCES items (id)
+        )
+    ''')
+    # Covering: profile load = (user_id) range scan, ownership check = point lookup
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS uq_inventory_user_item ON inventory (user_id, item_type, item_id)')
+    # Price change par owners dhoondhne ke liye
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_inventory_item ON inventory (item_id)')
+
+    legacy_tables = {
+        'skins': ('inventory_skins', 'skin_name'),
+        'battlepass': ('inventory_battlepass', 'battlepass_name'),
+        'buddies': ('inventory_buddies', 'buddy_name'),
+        'agents': ('inventory_agents', 'agent_name'),
+        'cards': ('inventory_cards', 'card_name'),
+        'titles': ('inventory_titles', 'title_name'),
+    }
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for item_type, (table, column) in legacy_tables.items():
+        if table not in existing:
+            continue
+        conn.execute(f'''
+            INSERT OR IGNORE INTO items (item_type, name)
+            SELECT ?, {column} FROM {table} WHERE {column} IS NOT NULL
+            GROUP BY {column} ORDER BY MIN(id)
+        ''', (item_type,))
+        # Purane tables me skins ke alawa duplicates allowed the - yahan ek hi row bachti hai
+        conn.execute(f'''
+            INSERT OR IGNORE INTO inventory (user_id, item_type, item_id)
+            SELECT t.user_id, ?, i.id FROM {table} t
+            JOIN items i ON i.item_type = ? AND i.name = t.{column}
+            ORDER BY t.id
+        ''', (item_type, item_type))
+    for name in ('trg_inventory_skins_insert', 'trg_inventory_skins_delete', 'trg_inventory_skins_update'):
+        conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+    for table, column in legacy_tables.values():
+        conn.execute(f'DROP TABLE IF EXISTS {table}')
+
+    # account_value triggers ab inventory (item_type = 'skins') par
+    def add_skin(row, sign):
+        return f'''
+            INSERT INTO account_value (user_id, total_value_vp)
+            SELECT {row}.user_id, {sign} COALESCE((SELECT sv.value_vp FROM items i
+                JOIN skin_values sv ON sv.skin_name = i.name WHERE i.id = {row}.item_id), 0)
+            WHERE {row}.item_type = 'skins'
+            ON CONFLICT (user_id) DO UPDATE SET total_value_vp = total_value_vp + excluded.total_value_vp;'''
+
+    def refresh_price(name_expr):
+        return f'''
+            UPDATE account_value SET total_value_vp = total_value_vp
+                + COALESCE((SELECT value_vp FROM bundle_skins WHERE skin_name = {name_expr} ORDER BY id LIMIT 1), 0)
+                - COALESCE((SELECT value_vp FROM skin_values WHERE skin_name = {name_expr}), 0)
+            WHERE user_id IN (SELECT inv.user_id FROM items i JOIN inventory inv ON inv.item_id = i.id
+                              WHERE i.item_type = 'skins' AND i.name = {name_expr});
+            DELETE FROM skin_values WHERE skin_name = {name_expr};
+            INSERT INTO skin_values (skin_name, value_vp)
+                SELECT skin_name, value_vp FROM bundle_skins WHERE skin_name = {name_expr} ORDER BY id LIMIT 1;'''
+
+    triggers = {
+        'trg_inventory_insert': ('AFTER INSERT ON inventory', add_skin('NEW', '')),
+        'trg_inventory_delete': ('AFTER DELETE ON inventory', add_skin('OLD', '-')),
+        'trg_inventory_update': ('AFTER UPDATE OF user_id, item_type, item_id ON inventory',
+                                 add_skin('OLD', '-') + add_skin('NEW', '')),
+        'trg_bundle_skins_insert': ('AFTER INSERT ON bundle_skins', refresh_price('NEW.skin_name')),
+        'trg_bundle_skins_delete': ('AFTER DELETE ON bundle_skins', refresh_price('OLD.skin_name')),
+        'trg_bundle_skins_update': ('AFTER UPDATE OF skin_name, value_vp ON bundle_skins',
+                                    refresh_price('OLD.skin_name') + refresh_price('NEW.skin_name')),
+    }
+    for name, (event, body) in triggers.items():
+        conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+        conn.execute(f'CREATE TRIGGER {name} {event} BEGIN {body} END')
+
+def _migration_009_interned_skins(conn):
+    # bundle_skins / skins / skin_values me skin_name string ki jagah items.id
+    for table in ('bundle_skins', 'skins'):
+        conn.execute(f'''
+            INSERT OR IGNORE INTO items (item_type, name)
+            SELECT 'skins', skin_name FROM {table} GROUP BY skin_name ORDER BY MIN(id)
+        ''')
+    for name in ('trg_inventory_insert', 'trg_inventory_delete', 'trg_inventory_update',
+                 'trg_bundle_skins_insert', 'trg_bundle_skins_delete', 'trg_bundle_skins_update'):
+        conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+    # SQLite column type nahi badal sakta - naya table, copy, rename
+    conn.execute('''
+        CREATE TABLE bundle_skins_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            bundle_id INTEGER,
+            item_id INTEGER NOT NULL,
+            skin_type TEXT,
+            value_vp INTEGER,
+            image_url TEXT,
+            FOREIGN KEY (bundle_id) REFERENCES bundles (id),
+            FOREIGN KEY (item_id) REFERENCES items (id)
+        )
+    ''')
+    conn.execute('''
+        INSERT INTO bundle_skins_new (id, bundle_id, item_id, skin_type, value_vp, image_url)
+        SELECT bs.id, bs.bundle_id, i.id, bs.skin_type, bs.value_vp, bs.image_url
+        FROM bundle_skins bs JOIN items i ON i.item_type = 'skins' AND i.name = bs.skin_name
+    ''')
+    conn.execute('DROP TABLE bundle_skins')
+    conn.execute('ALTER TABLE bundle_skins_new RENAME TO bundle_skins')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_bundle_skins_item ON bundle_skins (item_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_bundle_skins_bundle ON bundle_skins (bundle_id)')
+
+    conn.execute('''
+        CREATE TABLE skins_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id INTEGER UNIQUE NOT NULL,
+            vp_price INTEGER NOT NULL,
+            tier TEXT NOT NULL,
+            FOREIGN KEY (item_id) REFERENCES items (id)
+        )
+    ''')
+    conn.execute('''
+        INSERT INTO skins_new (id, item_id, vp_price, tier)
+        SELECT s.id, i.id, s.vp_price, s.tier
+        FROM skins s JOIN items i ON i.item_type = 'skins' AND i.name = s.skin_name
+    ''')
+    conn.execute('DROP TABLE skins')
+    conn.execute('ALTER TABLE skins_new RENAME TO skins')
+
+    conn.execute('DROP TABLE IF EXISTS skin_values')
+    conn.execute('''
+        CREATE TABLE skin_values (
+            item_id INTEGER PRIMARY KEY,
+            value_vp INTEGER
+        )
+    ''')
+    conn.execute('''
+        INSERT INTO skin_values (item_id, value_vp)
+        SELECT item_id, value_vp FROM bundle_skins bs
+        WHERE id = (SELECT MIN(id) FROM bundle_skins WHERE item_id = bs.item_id)
+    ''')
+
+    # Triggers ab sirf integer keys compare karte hain
+    def add_skin(row, sign):
+        return f'''
+            INSERT INTO account_value (user_id, total_value_vp)
+            SELECT {row}.user_id, {sign} COALESCE((SELECT value_vp FROM skin_values WHERE item_id = {row}.item_id), 0)
+            WHERE {row}.item_type = 'skins'
+            ON CONFLICT (user_id) DO UPDATE SET total_value_vp = total_value_vp + excluded.total_value_vp;'''
+
+    def refresh_price(item_expr):
+        return f'''
+            UPDATE account_value SET total_value_vp = total_value_vp
+                + COALESCE((SELECT value_vp FROM bundle_skins WHERE item_id = {item_expr} ORDER BY id LIMIT 1), 0)
+                - COALESCE((SELECT value_vp FROM skin_values WHERE item_id = {item_expr}), 0)
+            WHERE user_id IN (SELECT user_id FROM inventory WHERE item_id = {item_expr});
+            DELETE FROM skin_values WHERE item_id = {item_expr};
+            INSERT INTO skin_values (item_id, value_vp)
+                SELECT item_id, value_vp FROM bundle_skins WHERE item_id = {item_expr} ORDER BY id LIMIT 1;'''
+
+    triggers = {
+        'trg_inventory_insert': ('AFTER INSERT ON inventory', add_skin('NEW', '')),
+        'trg_inventory_delete': ('AFTER DELETE ON inventory', add_skin('OLD', '-')),
+        'trg_inventory_update': ('AFTER UPDATE OF user_id, item_type, item_id ON inventory',
+                                 add_skin('OLD', '-') + add_skin('NEW', '')),
+        'trg_bundle_skins_insert': ('AFTER INSERT ON bundle_skins', refresh_price('NEW.item_id')),
+        'trg_bundle_skins_delete': ('AFTER DELETE ON bundle_skins', refresh_price('OLD.item_id')),
+        'trg_bundle_skins_update': ('AFTER UPDATE OF item_id, value_vp ON bundle_skins',
+                                    refresh_price('OLD.item_id') + refresh_price('NEW.item_id')),
+    }
+    for name, (event, body) in triggers.items():
+        conn.execute(f'CREATE TRIGGER {name} {event} BEGIN {body} END')
+
+def _migration_010_jobs(conn):
+    # Background jobs (scrape / bulk upload / export); runner = 'host:pid' jo job chala raha hai
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            user_id INTEGER,
+            status TEXT NOT NULL DEFAULT 'queued',
+            params TEXT,
+            runner TEXT,
+            done INTEGER NOT NULL DEFAULT 0,
+            total INTEGER,
+            message TEXT,
+            result TEXT,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            finished_at TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_user_kind ON jobs (user_id, kind, id DESC)')
+    # Sirf chalte jobs - restart recovery isi chhote index se
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_active ON jobs (status) WHERE status IN ('queued', 'running')")
+
+def _migration_011_unique_bundle_skins(conn):
+    # Purane blind re-inserts ke duplicates hatao - pehli listing (price source) rehti hai
+    conn.execute('''
+        DELETE FROM bundle_skins
+        WHERE id NOT IN (SELECT MIN(id) FROM bundle_skins GROUP BY bundle_id, item_id)
+    ''')
+    # Catalog sync ki diff key; (bundle_id) wala index iska prefix hai
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS uq_bundle_skins_bundle_item ON bundle_skins (bundle_id, item_id)')
+    conn.execute('DROP INDEX IF EXISTS idx_bundle_skins_bundle')
+
+def _migration_012_catalog_sources(conn):
+    # Kis catalog page (url) ka kaunsa content hash DB me sync ho chuka hai - HTTP cache
+    # alag rehta hai, isliye "unchanged" ka faisla isi se hota hai
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS catalog_sources (
+            url TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            synced_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+# (version, description, function) - sirf aage add karo, purani migrations kabhi edit mat karo
+MIGRATIONS = [
+    (1, 'base schema', _migration_001_base_schema),
+    (2, 'user_details episode/act columns', _migration_002_user_details_episode_act),
+    (3, 'lookup indexes', _migration_003_indexes),
+    (4, 'unique inventory_skins (user_id, skin_name)', _migration_004_unique_inventory_skins),
+    (5, 'materialized account_value', _migration_005_account_value),
+    (6, 'match history keyset index + match_stats', _migration_006_match_pagination),
+    (7, 'structured match_history columns', _migration_007_structured_matches),
+    (8, 'unified inventory + items catalog', _migration_008_unified_inventory),
+    (9, 'interned skin ids in bundle_skins / skins / skin_values', _migration_009_interned_skins),
+    (10, 'background jobs table', _migration_010_jobs),
+    (11, 'unique bundle_skins (bundle_id, item_id)', _migration_011_unique_bundle_skins),
+    (12, 'catalog_sources (last synced content hash per url)', _migration_012_catalog_sources),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+_schema_ready = False
+
+def get_schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate():
+    """
+    PRAGMA user_version se aage ki migrations ek baar, order me apply karta hai.
+    Return: applied versions ki list (DB current ho to khali).
+    """
+    with get_connection() as conn:
+        if get_schema_version(conn) >= SCHEMA_VERSION:
+            return []
+    applied = []
+    with get_connection(immediate=True) as conn:
+        # Lock ke baad dobara padho - doosra worker pehle migrate kar chuka ho sakta hai
+        current = get_schema_version(conn)
+        for version, description, migration in MIGRATIONS:
+            if version <= current:
+                continue
+            migration(conn)
+            conn.execute(f'PRAGMA user_version = {version}')
+            applied.append(version)
+    return applied
+
+def init_database():
+    """Schema ko current version tak laata hai; process me sirf pehli call DB chhooti hai."""
+    global _schema_ready
+    if not _schema_ready:
+        migrate()
+        _schema_ready = True
+
+def require_schema(read_only=False):
+    """
+    Migrations / seeding ke bina: DB file maujood hai aur schema current hai, warna
+    RuntimeError. read_only=True par pool query_only connections se dobara banta hai,
+    taaki is process se koi write na ho sake (read-only services, jaise profile_api).
+    """
+    global _schema_ready
+    if not os.path.exists(DB_PATH):
+        raise RuntimeError(f'Database {DB_PATH} not found - start the main app or run `python database.py` first')
+    if read_only:
+        configure_pool(pragmas={**load_pragmas(), 'query_only': 1})
+    with get_connection() as conn:
+        version = get_schema_version(conn)
+    if version < SCHEMA_VERSION:
+        raise RuntimeError(f'Database schema is at version {version}, this code needs {SCHEMA_VERSION} - '
+                           'start the main app or run `python database.py` to migrate')
+    _schema_ready = True
+
+def hot_queries():
+    """
+    (label, sql, params) - app ke har page par chalne wali queries. SQL wahi module
+    constants hain jo functions chalate hain, taaki yahan ki copy drift na kare.
+    """
+    return [
+        ('verify_user', _VERIFY_USER_SQL, ('demo',)),
+        ('get_user_data', _profile_sql(PROFILE_SECTIONS), {'user_id': 1}),
+        ('item id', _ITEM_IDS_SQL, ('skins', '["Prime Vandal"]')),
+        ('purchase_skin price', _SKIN_PRICE_SQL, (1,)),
+        ('purchase store', _STORE_EXISTS_SQL, (1,)),
+        ('purchase_skin owned', _SKIN_OWNED_SQL, (1, 1)),
+        ('purchase_bundle skins', _BUNDLE_SKINS_SQL, (1,)),
+        ('purchase_bundle owned', _BUNDLE_OWNED_SQL, (1, '[1, 2]')),
+        ('account value', _ACCOUNT_VALUE_SQL.format(where='AND inv.user_id = ?'), (1,)),
+        ('match page', _MATCH_PAGE_SQL.format(after=''), (1, MATCH_PAGE_SIZE + 1)),
+        ('match page cursor', _MATCH_PAGE_SQL.format(after='AND (match_date, id) < (?, ?)'),
+         (1, '9999-12-31', 0, MATCH_PAGE_SIZE + 1)),
+        ('match stats', _MATCH_STATS_SQL, (1,)),
+        ('match timeline', _MATCH_TIMELINE_SQL, {'user_id': 1, 'preceding': MATCH_STATS_WINDOW - 1}),
+        ('latest job', _LATEST_JOB_SQL, (1, 'scrape')),
+        ('active jobs', _ACTIVE_JOBS_SQL, ()),
+    ]
+
+_SCAN_RE = re.compile(r'SCAN (?:TABLE )?([A-Za-z_][A-Za-z0-9_]*)\b(.*)')
+
+def _is_table_scan(detail):
+    """Plan step kisi table (ya uske alias) ka full scan hai? Purane sqlite ka `SCAN TABLE x` bhi."""
+    match = _SCAN_RE.match(detail)
+    if not match or match[1] in ('CONSTANT', 'SUBQUERY'):
+        return False
+    rest = match[2]
+    return 'COVERING INDEX' not in rest and 'VIRTUAL TABLE' not in rest
+
+def check_query_plans(conn=None):
+    """
+    EXPLAIN QUERY PLAN self-check. Agar koi hot query kisi table ka full SCAN karti hai
+    (alias ke naam se bhi, jaise `SCAN inv`) to RuntimeError raise hota hai. Sirf covering
+    index, subquery, virtual table (json_each) aur CONSTANT ROW scans theek hain.
+    Return: {label: [plan details]}
+    """
+    if conn is None:
+        with get_connection() as conn:
+            return check_query_plans(conn)
+    plans, scans = {}, []
+    for label, sql, params in hot_queries():
+        details = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+        plans[label] = details
+        for detail in details:
+            if _is_table_scan(detail):
+                scans.append(f'{label}: {detail}')
+    if scans:
+        raise RuntimeError('Hot queries falling back to table scans:\n' + '\n'.join(scans))
+    return plans
+
+# Har naye account ko milne wale default items (INVENTORY_TYPES keys)
+DEFAULT_INVENTORY = {
+    'skins': ['Classic Pistol', 'Vandal'],
+    'agents': ['Jett', 'Phoenix'],
+    'battlepass': ['Episode 1'],
+    'buddies': ['Default Buddy'],
+    'cards': ['Default Card'],
+    'titles': ['Rookie'],
+}
+
+def _insert_new_user_profiles(conn, profiles):
+    """
+    Naye users ki details, store aur default inventory insert karta hai.
+    profiles: [(user_id, name, region, country)]
+    """
+    registration_date = datetime.now().strftime('%Y-%m-%d')
+    conn.executemany('''
+        INSERT INTO user_details (user_id, name, region, country, registration_date)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(user_id, name, region, country, registration_date) for user_id, name, region, country in profiles])
+    conn.executemany('''
+        INSERT INTO store (user_id, valorant_points, radiant_points, kingdom_points)
+        VALUES (?, 1000, 200, 300)
+    ''', [(profile[0],) for profile in profiles])
+    default_items = [(item_type, name) for item_type, names in DEFAULT_INVENTORY.items() for name in names]
+    add_inventory_items(conn, [(profile[0], item_type, name) for profile in profiles for item_type, name in default_items])
+
+_ITEM_IDS_SQL = 'SELECT name, id FROM items WHERE item_type = ? AND name IN (SELECT value FROM json_each(?))'
+
+def item_ids(conn, item_type, names, create=True):
+    """
+    Item names ke catalog ids - pehle item_cache, sirf misses DB tak jate hain.
+    create=True par naye naam items me add ho jate hain (write transaction me chalao).
+    Return: {name: item_id} (create=False par unknown naam missing rehte hain)
+    """
+    ids, missing = item_cache.ids(item_type, dict.fromkeys(names))
+    if missing:
+        if create:
+            conn.executemany('INSERT OR IGNORE INTO items (item_type, name) VALUES (?, ?)',
+                             [(item_type, name) for name in missing])
+        rows = conn.execute(_ITEM_IDS_SQL, (item_type, json.dumps(missing))).fetchall()
+        ids.update(rows)
+        # Rollback hone wali transaction ke ids cache me nahi jane chahiye
+        get_pool().after_commit(lambda: item_cache.add((item_id, item_type, name) for name, item_id in rows))
+    return ids
+
+def add_inventory_items(conn, rows):
+    """rows: [(user_id, item_type, name)] - saare items ek executemany me inventory me (pehle se owned skip)."""
+    ids = {item_type: item_ids(conn, item_type, [name for _, row_type, name in rows if row_type == item_type])
+           for item_type in dict.fromkeys(row[1] for row in rows)}
+    conn.executemany('INSERT OR IGNORE INTO inventory (user_id, item_type, item_id) VALUES (?, ?, ?)',
+                     [(user_id, item_type, ids[item_type][name]) for user_id, item_type, name in rows])
 
 def create_user(username, email, password, name, region, country):
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    
+    # KDF write lock ke bahar - warna har signup ke dauran baaki saare writers ruke rehte
+    password_hash = passwords.hash_password(password)
     try:
-        password_hash = hash_password(password)
-        cursor.execute('''
-            INSERT INTO users (username, email, password_hash)
-            VALUES (?, ?, ?)
-        ''', (username, email, password_hash))
-        
-        user_id = cursor.lastrowid
-        
-        # Create user details
-        cursor.execute('''
-            INSERT INTO user_details (user_id, name, region, country, registration_date)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (user_id, name, region, country, datetime.now().strftime('%Y-%m-%d')))
-        
-        # Create store
-        cursor.execute('''
-            INSERT INTO store (user_id, valorant_points, radiant_points, kingdom_points)
-            VALUES (?, 1000, 200, 300)
-        ''', (user_id,))
-        
-        # Add default inventory items
-        default_skins = ['Classic Pistol', 'Vandal']
-        for skin in default_skins:
-            cursor.execute('INSERT INTO inventory_skins (user_id, skin_name) VALUES (?, ?)', (user_id, skin))
-        
-        default_agents = ['Jett', 'Phoenix']
-        for agent in default_agents:
-            cursor.execute('INSERT INTO inventory_agents (user_id, agent_name) VALUES (?, ?)', (user_id, agent))
-        
-        cursor.execute('INSERT INTO inventory_battlepass (user_id, battlepass_name) VALUES (?, ?)', (user_id, 'Episode 1'))
-        cursor.execute('INSERT INTO inventory_buddies (user_id, buddy_name) VALUES (?, ?)', (user_id, 'Default Buddy'))
-        cursor.execute('INSERT INTO inventory_cards (user_id, card_name) VALUES (?, ?)', (user_id, 'Default Card'))
-        cursor.execute('INSERT INTO inventory_titles (user_id, title_name) VALUES (?, ?)', (user_id, 'Rookie'))
-        
-        conn.commit()
+        with get_connection(immediate=True) as conn:
+            user_id = conn.execute('''
+                INSERT INTO users (username, email, password_hash)
+                VALUES (?, ?, ?)
+            ''', (username, email, password_hash)).lastrowid
+            _insert_new_user_profiles(conn, [(user_id, name, region, country)])
+            get_pool().after_commit(lambda: invalidate_user(user_id))
         return True
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
+
+NEW_USER_FIELDS = ('username', 'email', 'password', 'name', 'region', 'country')
+
+def _clean_field(value):
+    # pandas khali cells ko NaN deta hai
+    if value is None or (isinstance(value, float) and value != value):
+        return ''
+    return str(value).strip()
+
+def _drop_taken_users(conn, candidates):
+    """
+    DB me pehle se maujood usernames/emails wale candidates ka status set karke unhe hata deta hai
+    (ek query per column). Return: bache hue [(result, values)]
+    """
+    taken_usernames = {row[0] for row in conn.execute(
+        'SELECT username FROM users WHERE username IN (SELECT value FROM json_each(?))',
+        (json.dumps([values['username'] for result, values in candidates]),))}
+    taken_emails = {row[0] for row in conn.execute(
+        'SELECT email FROM users WHERE email IN (SELECT value FROM json_each(?))',
+        (json.dumps([values['email'] for result, values in candidates]),))}
+    remaining = []
+    for result, values in candidates:
+        if values['username'] in taken_usernames:
+            result['status'] = 'Already Exists: username'
+        elif values['email'] in taken_emails:
+            result['status'] = 'Already Exists: email'
+        else:
+            remaining.append((result, values))
+    return remaining
+
+def _create_users_chunk(chunk, seen_usernames, seen_emails):
+    results = []
+    candidates = []
+    # Validation: missing fields aur file ke andar duplicates
+    for row in chunk:
+        values = {field: _clean_field(row.get(field)) for field in NEW_USER_FIELDS}
+        result = {'username': values['username'], 'status': 'Registered'}
+        results.append(result)
+        missing = [field for field in NEW_USER_FIELDS if not values[field]]
+        if missing:
+            result['status'] = f"Error: missing {', '.join(missing)}"
+        elif values['username'] in seen_usernames or values['email'] in seen_emails:
+            result['status'] = 'Duplicate in file'
+        else:
+            seen_usernames.add(values['username'])
+            seen_emails.add(values['email'])
+            candidates.append((result, values))
+    if not candidates:
+        return results
+    # Pehle chhoti read me maujood accounts hatao - unke liye KDF chalana bekaar hai
+    with get_connection() as conn:
+        candidates = _drop_taken_users(conn, candidates)
+    if not candidates:
+        return results
+    # KDF har password ke liye mehenga hai - bache hue users pool me parallel hash, write lock ke bahar
+    for (result, values), password_hash in zip(
+            candidates, passwords.hash_passwords([values['password'] for result, values in candidates])):
+        values['password_hash'] = password_hash
+
+    with get_connection(immediate=True) as conn:
+        # Dobara check: read aur write lock ke beech kisi aur ne wahi username/email le liya ho
+        new_users = [values for result, values in _drop_taken_users(conn, candidates)]
+        if not new_users:
+            return results
+        conn.executemany('INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)',
+                         [(v['username'], v['email'], v['password_hash']) for v in new_users])
+        # Write lock hamare paas hai, isliye username se naye ids wapas padhna safe hai
+        user_ids = dict(conn.execute(
+            'SELECT username, id FROM users WHERE username IN (SELECT value FROM json_each(?))',
+            (json.dumps([v['username'] for v in new_users]),)))
+        _insert_new_user_profiles(conn, [(user_ids[v['username']], v['name'], v['region'], v['country'])
+                                         for v in new_users])
+        get_pool().after_commit(lambda: read_cache.invalidate_users(user_ids.values()))
+    return results
+
+def iter_create_users_bulk(rows, chunk_size=1000):
+    """
+    Bulk registration ka generator: har chunk ek transaction me insert hota hai aur
+    uske results ([{'username', 'status'}]) yield hote hain. Duplicate/invalid rows
+    sirf apna status paati hain, chunk abort nahi hota.
+    """
+    seen_usernames, seen_emails = set(), set()
+    for chunk in iter_batches(rows, chunk_size):
+        yield _create_users_chunk(chunk, seen_usernames, seen_emails)
+
+def create_users_bulk(rows, chunk_size=1000, progress=None):
+    """
+    rows (NEW_USER_FIELDS keys wale dicts) ko chunked executemany se register karta hai.
+    progress(done, chunk_results) har chunk ke baad call hota hai.
+    Return: input order me [{'username', 'status'}]
+    """
+    results = []
+    for chunk_results in iter_create_users_bulk(rows, chunk_size):
+        results.extend(chunk_results)
+        if progress:
+            progress(len(results), chunk_results)
+    return results
+
+def _rehash_password(user_id, password, old_hash):
+    """Login ke baad purana hash naye scheme me - sirf tab jab beech me password badla na ho."""
+    new_hash = passwords.hash_password(password)
+    with get_connection(immediate=True) as conn:
+        conn.execute('UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?',
+                     (new_hash, user_id, old_hash))
+    return new_hash
+
+_VERIFY_USER_SQL = '''
+    SELECT id, password_hash, status, ban_type, suspension_end, email_verified
+    FROM users u
+    LEFT JOIN user_details ud ON u.id = ud.user_id
+    WHERE u.username = ?
+'''
 
 def verify_user(username, email, password):
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT id, password_hash, status, ban_type, suspension_end, email_verified
-        FROM users u
-        LEFT JOIN user_details ud ON u.id = ud.user_id
-        WHERE u.username = ?
-    ''', (username,))
-    
-    result = cursor.fetchone()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(_VERIFY_USER_SQL, (username,))
+        result = cursor.fetchone()
     
-    if result:
-        user_id, stored_hash, status, ban_type, suspension_end, email_verified = result
-        if stored_hash == hash_password(password):
-            return {
-                'user_id': user_id,
-                'status': status,
-                'ban_type': ban_type,
-                'suspension_end': suspension_end,
-                'email_verified': email_verified
-            }
+    if not result:
+        # Unknown username par bhi KDF chalao, taaki response time se pata na chale
+        passwords.check_password(password, passwords.dummy_hash())
+        return None
+    user_id, stored_hash, status, ban_type, suspension_end, email_verified = result
+    if passwords.check_password(password, stored_hash):
+        if passwords.needs_rehash(stored_hash):
+            passwords.submit(_rehash_password, user_id, password, stored_hash)
+        return {
+            'user_id': user_id,
+            'status': status,
+            'ban_type': ban_type,
+            'suspension_end': suspension_end,
+            'email_verified': email_verified
+        }
     return None
 
-def get_user_data(user_id):
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    
-    # Get user details
-    cursor.execute('SELECT * FROM user_details WHERE user_id = ?', (user_id,))
-    details = cursor.fetchone()
-    
-    # Get store
-    cursor.execute('SELECT * FROM store WHERE user_id = ?', (user_id,))
-    store = cursor.fetchone()
-    
-    # Get inventory
-    cursor.execute('SELECT skin_name FROM inventory_skins WHERE user_id = ?', (user_id,))
-    skins = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute('SELECT battlepass_name FROM inventory_battlepass WHERE user_id = ?', (user_id,))
-    battlepass = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute('SELECT buddy_name FROM inventory_buddies WHERE user_id = ?', (user_id,))
-    buddies = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute('SELECT agent_name FROM inventory_agents WHERE user_id = ?', (user_id,))
-    agents = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute('SELECT card_name FROM inventory_cards WHERE user_id = ?', (user_id,))
-    cards = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute('SELECT title_name FROM inventory_titles WHERE user_id = ?', (user_id,))
-    titles = [row[0] for row in cursor.fetchall()]
-    
-    # Get match history
-    cursor.execute('SELECT * FROM match_history WHERE user_id = ? ORDER BY match_date DESC', (user_id,))
-    matches = cursor.fetchall()
-    
-    conn.close()
-    
-    return {
-        'details': {
-            'name': details[1] if details else '',
-            'region': details[2] if details else '',
-            'country': details[3] if details else '',
-            'level': details[4] if details else 1,
-            'rank': details[5] if details else '',
-            'registration_date': details[6] if details else '',
-            'phone_verified': bool(details[7]) if details else False,
-            'email_verified': bool(details[8]) if details else False,
-            'episode': details[9] if len(details) > 9 and details[9] else '',
-            'act': details[10] if len(details) > 10 and details[10] else '',
-        },
-        'store': {
-            'valorant_points': store[1] if store else 0,
-            'radiant_points': store[2] if store else 0,
-            'kingdom_points': store[3] if store else 0,
-        },
-        'inventory': {
-            'skins': skins,
-            'battlepass': battlepass,
-            'buddies': buddies,
-            'agents': agents,
-            'cards': cards,
-            'titles': titles,
-        },
-        'match_history': [
-            {
-                'date': match[2],
-                'result': match[3],
-                'score': match[4],
-                'link': match[5]
-            } for match in matches
-        ]
-    }
+def check_accounts(rows):
+    """
+    Bulk account check: username/password rows ke batch ke liye ek query me users,
+    details aur skins load karta hai. Return: [{'username', 'status', 'user_id'}]
+    (user_id sirf tab jab account usable ho).
+    """
+    rows = [(_clean_field(row.get('username')), _clean_field(row.get('password'))) for row in rows]
+    with get_connection() as conn:
+        accounts = {row[0]: row[1:] for row in conn.execute('''
+            SELECT u.username, u.id, u.password_hash, u.status, u.ban_type, u.suspension_end,
+                   ud.email_verified, ud.rank,
+                   (SELECT json_group_array(name) FROM
+                        (SELECT i.name FROM inventory inv JOIN items i ON i.id = inv.item_id
+                         WHERE inv.user_id = u.id AND inv.item_type = 'skins' ORDER BY inv.item_id))
+            FROM users u
+            LEFT JOIN user_details ud ON ud.user_id = u.id
+            WHERE u.username IN (SELECT value FROM json_each(?))
+        ''', (json.dumps([username for username, password in rows]),))}
+    # Saare password checks pool me parallel (unknown users ke liye None -> False)
+    password_ok = passwords.check_passwords(
+        [(password, accounts[username][1] if username in accounts else None) for username, password in rows])
+    results = []
+    for (username, password), ok in zip(rows, password_ok):
+        result = {'username': username, 'status': '', 'user_id': None}
+        results.append(result)
+        account = accounts.get(username)
+        if not account:
+            result['status'] = "User Not Found"
+            continue
+        user_id, stored_hash, status, ban_type, suspension_end, email_verified, rank, skins = account
+        if not ok:
+            result['status'] = "Password Incorrect"
+        elif status == 'locked':
+            result['status'] = "Account Locked"
+        elif status == 'banned':
+            if ban_type == 'permanent':
+                result['status'] = "Permanently Banned"
+            else:
+                result['status'] = f"Suspended until {suspension_end}"
+        elif not email_verified:
+            result['status'] = "Email Verification Required"
+        else:
+            if not rank or rank.lower() == 'unranked':
+                result['status'] = "Unranked Account"
+            else:
+                result['status'] = f"Rank Ready: {rank}"
+            skins = json.loads(skins)
+            if skins:
+                result['status'] += f" | Skins: {', '.join(skins)}"
+            result['user_id'] = user_id
+    return results
+
+# Profile ke sections jo get_user_data load kar sakta hai
+PROFILE_SECTIONS = ('details', 'store', 'inventory', 'match_history')
+
+# inventory.item_type values (profile me inventory dict ki keys)
+INVENTORY_TYPES = ('skins', 'battlepass', 'buddies', 'agents', 'cards', 'titles')
+
+_PROFILE_SECTION_SQL = {
+    'details': '''(SELECT json_object(
+            'name', name, 'region', region, 'country', country, 'level', level,
+            'rank', rank, 'registration_date', registration_date,
+            'phone_verified', phone_verified, 'email_verified', email_verified,
+            'episode', episode, 'act', act)
+        FROM user_details WHERE user_id = :user_id)''',
+    'store': '''(SELECT json_object(
+            'valorant_points', valorant_points, 'radiant_points', radiant_points,
+            'kingdom_points', kingdom_points)
+        FROM store WHERE user_id = :user_id)''',
+    'inventory': '''(SELECT json_group_array(json_array(item_type, name))
+        FROM (SELECT inv.item_type, i.name FROM inventory inv JOIN items i ON i.id = inv.item_id
+              WHERE inv.user_id = :user_id ORDER BY inv.item_type, inv.item_id))''',
+    'match_history': '''(SELECT json_group_array(json_object(
+            'date', match_date, 'result', result, 'score', score, 'link', link,
+            'played_at', played_at, 'mode', mode, 'agent', agent,
+            'rounds_won', rounds_won, 'rounds_lost', rounds_lost))
+        FROM (SELECT * FROM match_history
+              WHERE user_id = :user_id ORDER BY match_date DESC, id DESC))''',
+}
+
+def _profile_sql(sections):
+    return 'SELECT ' + ', '.join(_PROFILE_SECTION_SQL[section] for section in sections)
+
+def _profile_section(section, raw):
+    if section == 'details':
+        details = json.loads(raw) if raw else {}
+        return {
+            'name': details.get('name') or '',
+            'region': details.get('region') or '',
+            'country': details.get('country') or '',
+            'level': details['level'] if details.get('level') is not None else 1,
+            'rank': details.get('rank') or '',
+            'registration_date': details.get('registration_date') or '',
+            'phone_verified': bool(details.get('phone_verified')),
+            'email_verified': bool(details.get('email_verified')),
+            'episode': details.get('episode') or '',
+            'act': details.get('act') or '',
+        }
+    if section == 'store':
+        store = json.loads(raw) if raw else {}
+        return {key: store.get(key) or 0 for key in ('valorant_points', 'radiant_points', 'kingdom_points')}
+    if section == 'inventory':
+        inventory = {item_type: [] for item_type in INVENTORY_TYPES}
+        for item_type, name in json.loads(raw):
+            inventory.setdefault(item_type, []).append(name)
+        return inventory
+    # match_history hamesha JSON array return karta hai
+    return json.loads(raw)
+
+def get_user_data(user_id, sections=None):
+    """
+    User ka profile ek hi query (JSON aggregation) me load karta hai.
+    sections: PROFILE_SECTIONS ka subset, jaise ('store',); None = poora profile.
+    """
+    sections = PROFILE_SECTIONS if sections is None else tuple(sections)
+    unknown = set(sections) - set(PROFILE_SECTIONS)
+    if unknown:
+        raise ValueError(f'Unknown profile sections: {sorted(unknown)}')
+    profile = {}
+    for section in sections:
+        cached = read_cache.get(('profile', user_id, section))
+        if cached is not None:
+            profile[section] = cached
+    missing = [section for section in sections if section not in profile]
+    if missing:
+        # Read se pehle token: beech me write commit hua to purana result cache me nahi jata
+        tokens = {section: read_cache.begin(('profile', user_id, section)) for section in missing}
+        try:
+            with get_connection() as conn:
+                row = conn.execute(_profile_sql(missing), {'user_id': user_id}).fetchone()
+        except BaseException:
+            for section, token in tokens.items():
+                read_cache.abort(('profile', user_id, section), token)
+            raise
+        for section, raw in zip(missing, row):
+            profile[section] = _profile_section(section, raw)
+            read_cache.set(('profile', user_id, section), profile[section], tokens[section])
+    return {section: profile[section] for section in sections}
+
+_EXPORT_PROFILE_SQL = '''
+    SELECT u.id, d.name, d.region, d.country, d.level, d.rank, d.registration_date,
+           d.phone_verified, d.email_verified, d.episode, d.act,
+           s.valorant_points, s.radiant_points, s.kingdom_points
+    FROM users u
+    LEFT JOIN user_details d ON d.user_id = u.id
+    LEFT JOIN store s ON s.user_id = u.id
+    WHERE u.id > ? ORDER BY u.id LIMIT ?
+'''
+_EXPORT_PROFILE_COLUMNS = (
+    'name', 'region', 'country', 'level', 'rank', 'registration_date', 'phone_verified',
+    'email_verified', 'episode', 'act', 'valorant_points', 'radiant_points', 'kingdom_points',
+)
+_EXPORT_INVENTORY_SQL = '''
+    SELECT inv.user_id, inv.item_type, i.name FROM inventory inv JOIN items i ON i.id = inv.item_id
+    WHERE inv.user_id BETWEEN ? AND ? ORDER BY inv.user_id, inv.item_type, inv.item_id
+'''
+_EXPORT_MATCH_COLUMNS = (
+    'match_date', 'result', 'score', 'link', 'played_at', 'mode', 'agent', 'rounds_won', 'rounds_lost',
+)
+_EXPORT_MATCH_SQL = '''
+    SELECT user_id, match_date, result, score, link, played_at, mode, agent, rounds_won, rounds_lost
+    FROM match_history WHERE user_id BETWEEN ? AND ? ORDER BY user_id, match_date DESC
+'''
+
+def is_admin(user_id):
+    """
+    User ADMIN_USERS me (id ya username se) hai? List khaali ho to koi admin nahi.
+    Har rerun par chalta hai, isliye cached; ADMIN_USERS key me hai, to role list
+    badalte hi purani entries kaam nahi aati (user ke writes bhi inhe hata dete hain).
+    """
+    if user_id is None or not ADMIN_USERS:
+        return False
+    if str(user_id) in ADMIN_USERS:
+        return True
+    def load():
+        with get_connection() as conn:
+            row = conn.execute('SELECT username FROM users WHERE id = ?', (user_id,)).fetchone()
+        return row is not None and row[0] in ADMIN_USERS
+    return read_cache.get_or_load(('is_admin', user_id, ADMIN_USERS), load)
+
+def count_users():
+    with get_connection() as conn:
+        return conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+
+def iter_export_records(batch_size=500):
+    """
+    Admin export: saare users ke profile / inventory / match records yield karta hai.
+    Users keyset batches (id > last_id) me aate hain, har batch 3 set-based queries;
+    memory sirf ek batch jitni, aur records yield hote waqt connection pool me wapas hota hai.
+    """
+    last_id = 0
+    while True:
+        with get_connection() as conn:
+            profiles = conn.execute(_EXPORT_PROFILE_SQL, (last_id, batch_size)).fetchall()
+            if not profiles:
+                return
+            first_id, last_id = profiles[0][0], profiles[-1][0]
+            inventory = conn.execute(_EXPORT_INVENTORY_SQL, (first_id, last_id)).fetchall()
+            matches = conn.execute(_EXPORT_MATCH_SQL, (first_id, last_id)).fetchall()
+        items_by_user, matches_by_user = {}, {}
+        for user_id, item_type, item_name in inventory:
+            items_by_user.setdefault(user_id, []).append((item_type, item_name))
+        for user_id, *match in matches:
+            matches_by_user.setdefault(user_id, []).append(match)
+        for user_id, *values in profiles:
+            record = {'record_type': 'profile', 'user_id': user_id}
+            record.update(zip(_EXPORT_PROFILE_COLUMNS, values))
+            record['phone_verified'] = bool(record['phone_verified'])
+            record['email_verified'] = bool(record['email_verified'])
+            yield record
+            for item_type, item_name in items_by_user.get(user_id, ()):
+                yield {'record_type': 'inventory', 'user_id': user_id,
+                       'item_type': item_type, 'item_name': item_name}
+            for match in matches_by_user.get(user_id, ()):
+                record = {'record_type': 'match', 'user_id': user_id}
+                record.update(zip(_EXPORT_MATCH_COLUMNS, match))
+                yield record
 
 def update_user_details(user_id, **kwargs):
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    
-    for key, value in kwargs.items():
-        cursor.execute(f'UPDATE user_details SET {key} = ? WHERE user_id = ?', (value, user_id))
-    
-    conn.commit()
-    conn.close()
+    with get_connection(immediate=True) as conn:
+        cursor = conn.cursor()
+        for key, value in kwargs.items():
+            cursor.execute(f'UPDATE user_details SET {key} = ? WHERE user_id = ?', (value, user_id))
+        get_pool().after_commit(lambda: invalidate_user(user_id))
 
-def add_match_history(user_id, result, score, link="#"):
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO match_history (user_id, match_date, result, score, link)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (user_id, datetime.now().strftime('%Y-%m-%d'), result, score, link))
-    
-    conn.commit()
-    conn.close()
+MATCH_MODES = ('Competitive', 'Unrated', 'Swiftplay', 'Spike Rush', 'Deathmatch')
+
+_SCORE_RE = re.compile(r'^\s*(\d+)\s*[-:]\s*(\d+)\s*$')
+
+def parse_score(score):
+    """'13-7' -> (13, 7); samajh na aaye to (None, None)."""
+    match = _SCORE_RE.match(score or '')
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
+
+def add_match_history(user_id, result, score, link="#", mode='Competitive', agent=None):
+    rounds_won, rounds_lost = parse_score(score)
+    played_at = datetime.now()
+    with get_connection(immediate=True) as conn:
+        conn.execute('''
+            INSERT INTO match_history (user_id, match_date, result, score, link,
+                                       rounds_won, rounds_lost, played_at, mode, agent)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (user_id, played_at.strftime('%Y-%m-%d'), result, score, link,
+              rounds_won, rounds_lost, played_at.strftime('%Y-%m-%d %H:%M:%S'), mode, agent or None))
+        get_pool().after_commit(lambda: invalidate_user(user_id))
+
+MATCH_PAGE_SIZE = 25
+
+_MATCH_PAGE_SQL = '''
+    SELECT id, match_date, result, score, link, mode, agent, rounds_won, rounds_lost FROM match_history
+    WHERE user_id = ? {after}
+    ORDER BY match_date DESC, id DESC LIMIT ?
+'''
+
+def get_match_page(user_id, cursor=None, page_size=MATCH_PAGE_SIZE):
+    """
+    Match history ka ek page, newest pehle. Keyset pagination (match_date, id) par -
+    OFFSET nahi, isliye page N bhi utna hi sasta hai jitna page 1.
+    cursor: pichle page ka next_cursor (None = pehla page).
+    Return: {'matches': [{'id', 'date', 'result', 'score', 'link', 'mode', 'agent', 'round_diff'}],
+             'next_cursor': (match_date, id) ya None}
+    """
+    def load():
+        if cursor is None:
+            sql, params = _MATCH_PAGE_SQL.format(after=''), (user_id, page_size + 1)
+        else:
+            sql, params = _MATCH_PAGE_SQL.format(after='AND (match_date, id) < (?, ?)'), (user_id, *cursor, page_size + 1)
+        with get_connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        # Ek extra row se pata chalta hai ke agla page hai ya nahi
+        matches = [{'id': row[0], 'date': row[1], 'result': row[2], 'score': row[3], 'link': row[4],
+                    'mode': row[5], 'agent': row[6],
+                    'round_diff': row[7] - row[8] if row[7] is not None else None}
+                   for row in rows[:page_size]]
+        next_cursor = (matches[-1]['date'], matches[-1]['id']) if len(rows) > page_size else None
+        return {'matches': matches, 'next_cursor': next_cursor}
+    key = ('match_page', user_id, tuple(cursor) if cursor else None, page_size)
+    return read_cache.get_or_load(key, load)
+
+_MATCH_STATS_SQL = 'SELECT wins, losses, draws FROM match_stats WHERE user_id = ?'
+
+def get_match_stats(user_id):
+    """Win/loss/draw counts aur win rate (%) - materialized match_stats table se O(1)."""
+    def load():
+        with get_connection() as conn:
+            row = conn.execute(_MATCH_STATS_SQL, (user_id,)).fetchone()
+        wins, losses, draws = row or (0, 0, 0)
+        total = wins + losses + draws
+        return {'wins': wins, 'losses': losses, 'draws': draws, 'total': total,
+                'win_rate': round(100.0 * wins / total, 1) if total else 0.0}
+    return read_cache.get_or_load(('match_stats', user_id), load)
+
+# Rolling win rate itne recent matches par
+MATCH_STATS_WINDOW = 10
+
+# Har match ek row, purane se naye ki taraf. streak: us match tak same result ki lagataar ginti
+# (gaps-and-islands: do ROW_NUMBERs ka farq har run ke liye constant rehta hai)
+_MATCH_TIMELINE_SQL = '''
+    SELECT id, played_at, result, rounds_won, rounds_lost,
+           rounds_won - rounds_lost AS round_diff,
+           AVG(result = 'Win') OVER recent AS rolling_win_rate,
+           SUM(rounds_won - rounds_lost) OVER (ORDER BY played_at, id) AS cumulative_round_diff,
+           ROW_NUMBER() OVER (PARTITION BY result, island ORDER BY played_at, id) AS streak
+    FROM (SELECT id, played_at, result, rounds_won, rounds_lost,
+                 ROW_NUMBER() OVER (ORDER BY played_at, id)
+                 - ROW_NUMBER() OVER (PARTITION BY result ORDER BY played_at, id) AS island
+          FROM match_history WHERE user_id = :user_id)
+    WINDOW recent AS (ORDER BY played_at, id ROWS BETWEEN :preceding PRECEDING AND CURRENT ROW)
+'''
+
+_MATCH_SUMMARY_SQL = f'''
+    WITH timeline AS ({_MATCH_TIMELINE_SQL}),
+    latest AS (SELECT result, streak, rolling_win_rate FROM timeline ORDER BY played_at DESC, id DESC LIMIT 1)
+    SELECT (SELECT result FROM latest), (SELECT streak FROM latest), (SELECT rolling_win_rate FROM latest),
+           MAX(CASE WHEN result = 'Win' THEN streak END), MAX(CASE WHEN result = 'Loss' THEN streak END),
+           SUM(round_diff), AVG(round_diff)
+    FROM timeline
+'''
+
+def get_match_timeline(user_id, window=MATCH_STATS_WINDOW):
+    """
+    Per-match trend rows (SQL window functions): rolling win rate (%), round diff,
+    cumulative round diff aur current streak length. Purane se naye order me.
+    """
+    def load():
+        with get_connection() as conn:
+            rows = conn.execute(_MATCH_TIMELINE_SQL + ' ORDER BY played_at, id',
+                                {'user_id': user_id, 'preceding': window - 1}).fetchall()
+        return [{'id': row[0], 'played_at': row[1], 'result': row[2], 'rounds_won': row[3],
+                 'rounds_lost': row[4], 'round_diff': row[5], 'rolling_win_rate': round(100.0 * row[6], 1),
+                 'cumulative_round_diff': row[7] or 0, 'streak': row[8]} for row in rows]
+    return read_cache.get_or_load(('match_timeline', user_id, window), load)
+
+def get_match_summary(user_id, window=MATCH_STATS_WINDOW):
+    """Current streak, longest win/loss streaks, round differential aur recent win rate - ek query me."""
+    def load():
+        with get_connection() as conn:
+            row = conn.execute(_MATCH_SUMMARY_SQL, {'user_id': user_id, 'preceding': window - 1}).fetchone()
+        result, streak, rolling, longest_win, longest_loss, diff, avg_diff = row
+        return {
+            'current_streak': {'result': result, 'length': streak or 0},
+            'longest_win_streak': longest_win or 0,
+            'longest_loss_streak': longest_loss or 0,
+            'round_diff': diff or 0,
+            'avg_round_diff': round(avg_diff, 2) if avg_diff is not None else 0.0,
+            'recent_win_rate': round(100.0 * rolling, 1) if rolling is not None else 0.0,
+        }
+    return read_cache.get_or_load(('match_summary', user_id, window), load)
+
+def match_stats_report(user_ids=None, window=MATCH_STATS_WINDOW):
+    """
+    Batch report (admin / offline): bahut saare users ke stats ek query + vectorized
+    pandas/NumPy se. Return: user_id indexed DataFrame - matches, wins, losses, draws,
+    win_rate, recent_win_rate, round_diff, avg_round_diff, longest_win_streak, longest_loss_streak.
+    """
+    import numpy as np
+    import pandas as pd
+
+    sql = 'SELECT user_id, result, rounds_won, rounds_lost FROM match_history'
+    params = ()
+    if user_ids is not None:
+        sql += ' WHERE user_id IN (SELECT value FROM json_each(?))'
+        params = (json.dumps(list(user_ids)),)
+    with get_connection() as conn:
+        df = pd.read_sql_query(sql + ' ORDER BY user_id, played_at, id', conn, params=params)
+    columns = ['matches', 'wins', 'losses', 'draws', 'win_rate', 'recent_win_rate', 'round_diff',
+               'avg_round_diff', 'longest_win_streak', 'longest_loss_streak']
+    if df.empty:
+        return pd.DataFrame(columns=columns).rename_axis('user_id')
+
+    users = df['user_id'].to_numpy()
+    results = df['result'].to_numpy()
+    df['win'] = results == 'Win'
+    df['loss'] = results == 'Loss'
+    df['draw'] = results == 'Draw'
+    df['round_diff'] = df['rounds_won'] - df['rounds_lost']
+    grouped = df.groupby('user_id', sort=True)
+    report = pd.DataFrame({
+        'matches': grouped.size(),
+        'wins': grouped['win'].sum(),
+        'losses': grouped['loss'].sum(),
+        'draws': grouped['draw'].sum(),
+        'round_diff': grouped['round_diff'].sum().astype('int64'),
+        'avg_round_diff': grouped['round_diff'].mean().round(2),
+    })
+    report['win_rate'] = (100.0 * report['wins'] / report['matches']).round(1)
+    report['recent_win_rate'] = (100.0 * df.groupby('user_id').tail(window).groupby('user_id')['win'].mean()).round(1)
+
+    # Streaks: user ya result badalte hi naya run; run lengths np.bincount se
+    starts = np.ones(len(df), dtype=bool)
+    starts[1:] = (users[1:] != users[:-1]) | (results[1:] != results[:-1])
+    run_ids = np.cumsum(starts) - 1
+    run_lengths = np.bincount(run_ids)
+    runs = pd.DataFrame({'user_id': users[starts], 'result': results[starts], 'length': run_lengths})
+    longest = runs.groupby(['user_id', 'result'])['length'].max().unstack(fill_value=0)
+    for result, column in (('Win', 'longest_win_streak'), ('Loss', 'longest_loss_streak')):
+        report[column] = longest[result] if result in longest else 0
+    return report[columns].fillna(0)
 
 def auto_verify_email(user_id):
     """Auto-verify email for demo purposes"""
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('UPDATE user_details SET email_verified = 1 WHERE user_id = ?', (user_id,))
-    
-    conn.commit()
-    conn.close()
+    with get_connection(immediate=True) as conn:
+        conn.execute('UPDATE user_details SET email_verified = 1 WHERE user_id = ?', (user_id,))
+        get_pool().after_commit(lambda: invalidate_user(user_id))
 
 # Top 20 popular Valorant skins with price and tier
 POPULAR_SKINS = [
@@ -355,30 +1616,19 @@ POPULAR_SKINS = [
     ("Glitchpop Phantom", 2175, "Premium Edition"),
 ]
 
+def _insert_skins(skins):
+    with get_connection(immediate=True) as conn:
+        ids = item_ids(conn, 'skins', [name for name, price, tier in skins])
+        conn.executemany('''
+            INSERT OR IGNORE INTO skins (item_id, vp_price, tier)
+            VALUES (?, ?, ?)
+        ''', [(ids[name], price, tier) for name, price, tier in skins])
+
 def insert_popular_skins():
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    try:
-        for skin_name, vp_price, tier in POPULAR_SKINS:
-            cursor.execute('''
-                INSERT OR IGNORE INTO skins (skin_name, vp_price, tier)
-                VALUES (?, ?, ?)
-            ''', (skin_name, vp_price, tier))
-        conn.commit()
-    finally:
-        conn.close()
+    _insert_skins(POPULAR_SKINS)
 
 def insert_prime_vandal_skin():
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    try:
-        cursor.execute('''
-            INSERT OR IGNORE INTO skins (skin_name, vp_price, tier)
-            VALUES (?, ?, ?)
-        ''', ("Prime Vandal", 1775, "Premium Edition"))
-        conn.commit()
-    finally:
-        conn.close()
+    _insert_skins([("Prime Vandal", 1775, "Premium Edition")])
 
 # Unicorny set ki skins aur prices
 UNICORNY_SKINS = [
@@ -389,143 +1639,451 @@ UNICORNY_SKINS = [
     ("Wonderstallion Hammer (melee)", 3550, "Exclusive Edition"),
 ]
 
+def insert_unicorny_skins():
+    _insert_skins(UNICORNY_SKINS)
+
 def insert_bundle_and_skins(bundle_name, skins):
     """
     skins: list of dicts with keys: skin_name, skin_type, value_vp, image_url
+    Bundle ki skin list ko upsert karta hai (dobara call karne par duplicates nahi) - sync_catalog dekho.
     """
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    try:
-        cursor.execute('INSERT OR IGNORE INTO bundles (bundle_name) VALUES (?)', (bundle_name,))
-        cursor.execute('SELECT id FROM bundles WHERE bundle_name = ?', (bundle_name,))
-        bundle_id = cursor.fetchone()[0]
-        for skin in skins:
-            cursor.execute('''
-                INSERT INTO bundle_skins (bundle_id, skin_name, skin_type, value_vp, image_url)
+    return sync_catalog([{'bundle_name': bundle_name, 'skins': skins}])
+
+# sync_catalog report ki keys
+CATALOG_SYNC_FIELDS = ('bundles', 'bundles_added', 'bundles_removed', 'skins_added', 'skins_updated',
+                       'skins_removed', 'rows_written')
+
+def catalog_source_hash(url):
+    """url ka aakhri successfully synced content hash (kabhi sync na hua ho to None)."""
+    with get_connection() as conn:
+        row = conn.execute('SELECT content_hash FROM catalog_sources WHERE url = ?', (url,)).fetchone()
+    return row[0] if row else None
+
+def sync_catalog(bundles, prune=False, source=None):
+    """
+    Incoming catalog [{'bundle_name', 'skins': [...]}] ko DB se diff karke sirf zaroori
+    INSERT / UPDATE / DELETE ek transaction me. Key (bundle, skin_name) hai: incoming bundle
+    me jo skin nahi hai wo us bundle se hat jati hai; prune=True par incoming me na hone wale
+    bundles bhi hat jate hain (poora catalog replace). Same catalog dobara sync karne par
+    koi row nahi likhi jati aur caches invalidate nahi hote.
+    source: (url, content_hash) - isi transaction me catalog_sources me record hota hai, yani
+    sync fail / rollback ho to page "synced" nahi mana jata.
+    Return: {field: count} (CATALOG_SYNC_FIELDS); rows_written me trigger writes bhi hain.
+    """
+    incoming = {}
+    for bundle in bundles:
+        skins = incoming.setdefault(bundle['bundle_name'], {})
+        for skin in bundle['skins']:
+            skins.setdefault(skin['skin_name'], (skin.get('skin_type'), skin.get('value_vp'), skin.get('image_url')))
+    report = dict.fromkeys(CATALOG_SYNC_FIELDS, 0)
+    report['bundles'] = len(incoming)
+
+    with get_connection(immediate=True) as conn:
+        before = conn.total_changes
+        bundle_ids = dict(conn.execute('SELECT bundle_name, id FROM bundles'))
+        current = {}
+        for bundle_id, row_id, skin_name, skin_type, value_vp, image_url in conn.execute('''
+            SELECT bs.bundle_id, bs.id, i.name, bs.skin_type, bs.value_vp, bs.image_url
+            FROM bundle_skins bs JOIN items i ON i.id = bs.item_id
+            WHERE bs.bundle_id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps([bundle_ids[name] for name in incoming if name in bundle_ids]),)):
+            current.setdefault(bundle_id, {})[skin_name] = (row_id, skin_type, value_vp, image_url)
+
+        new_bundles = [name for name in incoming if name not in bundle_ids]
+        if new_bundles:
+            conn.executemany('INSERT INTO bundles (bundle_name) VALUES (?)', [(name,) for name in new_bundles])
+            bundle_ids.update(conn.execute('SELECT bundle_name, id FROM bundles WHERE bundle_name IN '
+                                           '(SELECT value FROM json_each(?))', (json.dumps(new_bundles),)))
+            report['bundles_added'] = len(new_bundles)
+
+        inserts, price_updates, detail_updates, deletes = [], [], [], []
+        for bundle_name, skins in incoming.items():
+            bundle_id = bundle_ids[bundle_name]
+            existing = current.get(bundle_id, {})
+            for skin_name, (skin_type, value_vp, image_url) in skins.items():
+                row = existing.get(skin_name)
+                if row is None:
+                    inserts.append((bundle_id, skin_name, skin_type, value_vp, image_url))
+                    continue
+                # Price alag UPDATE me - value_vp update account_value triggers chalata hai
+                if row[2] != value_vp:
+                    price_updates.append((value_vp, row[0]))
+                if (row[1], row[3]) != (skin_type, image_url):
+                    detail_updates.append((skin_type, image_url, row[0]))
+            deletes.extend((row[0],) for skin_name, row in existing.items() if skin_name not in skins)
+
+        if inserts:
+            ids = item_ids(conn, 'skins', list(dict.fromkeys(row[1] for row in inserts)))
+            conn.executemany('''
+                INSERT INTO bundle_skins (bundle_id, item_id, skin_type, value_vp, image_url)
                 VALUES (?, ?, ?, ?, ?)
-            ''', (bundle_id, skin['skin_name'], skin['skin_type'], skin['value_vp'], skin.get('image_url')))
-        conn.commit()
-    finally:
-        conn.close()
+            ''', [(bundle_id, ids[skin_name], skin_type, value_vp, image_url)
+                  for bundle_id, skin_name, skin_type, value_vp, image_url in inserts])
+        conn.executemany('UPDATE bundle_skins SET value_vp = ? WHERE id = ?', price_updates)
+        conn.executemany('UPDATE bundle_skins SET skin_type = ?, image_url = ? WHERE id = ?', detail_updates)
+        conn.executemany('DELETE FROM bundle_skins WHERE id = ?', deletes)
+        report['skins_added'] = len(inserts)
+        report['skins_updated'] = len({row[-1] for row in price_updates + detail_updates})
+        report['skins_removed'] = len(deletes)
+
+        if prune:
+            stale = [bundle_id for bundle_name, bundle_id in bundle_ids.items() if bundle_name not in incoming]
+            if stale:
+                stale_json = json.dumps(stale)
+                report['skins_removed'] += conn.execute(
+                    'DELETE FROM bundle_skins WHERE bundle_id IN (SELECT value FROM json_each(?))', (stale_json,)).rowcount
+                conn.execute('DELETE FROM bundles WHERE id IN (SELECT value FROM json_each(?))', (stale_json,))
+                report['bundles_removed'] = len(stale)
+        report['rows_written'] = conn.total_changes - before
+        if source:
+            conn.execute('''
+                INSERT INTO catalog_sources (url, content_hash) VALUES (?, ?)
+                ON CONFLICT (url) DO UPDATE SET content_hash = excluded.content_hash, synced_at = CURRENT_TIMESTAMP
+            ''', source)
+        if report['rows_written']:
+            get_pool().after_commit(invalidate_catalog)
+    return report
+
+def get_store_catalog(user_id=None):
+    """
+    Store page ke liye saari skins aur bundles, har bundle ke skin_count/total_vp
+    aur user ke owned_count ke sath. Catalog version aur user_id par cached.
+    Return: {'skins': [(skin_name, value_vp)], 'bundles': [dict]}
+    """
+    return read_cache.get_or_load(('catalog', user_id, _catalog_version),
+                                  lambda: _load_store_catalog(user_id))
+
+def _load_store_catalog(user_id):
+    with get_connection() as conn:
+        skins = conn.execute('SELECT i.name, bs.value_vp FROM bundle_skins bs JOIN items i ON i.id = bs.item_id '
+                             'ORDER BY bs.id').fetchall()
+        # Ek grouped query - har bundle ke liye alag query nahi
+        bundles = [
+            {'bundle_id': bundle_id, 'bundle_name': bundle_name, 'skin_count': skin_count,
+             'total_vp': total_vp, 'owned_count': owned_count}
+            for bundle_id, bundle_name, skin_count, total_vp, owned_count in conn.execute('''
+                SELECT b.id, b.bundle_name,
+                       COUNT(NULLIF(bs.value_vp, 0)),
+                       COALESCE(SUM(bs.value_vp), 0),
+                       COUNT(DISTINCT inv.id)
+                FROM bundles b
+                LEFT JOIN bundle_skins bs ON bs.bundle_id = b.id
+                LEFT JOIN inventory inv ON inv.user_id = ? AND inv.item_type = 'skins' AND inv.item_id = bs.item_id
+                GROUP BY b.id
+                ORDER BY b.id
+            ''', (user_id,))
+        ]
+    return {'skins': skins, 'bundles': bundles}
 
 def calculate_account_skin_value(user_id):
     """
     User ki owned skins ki total value (VP) calculate karta hai.
     """
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    # User ki inventory_skins se skin_name lein
-    cursor.execute('SELECT skin_name FROM inventory_skins WHERE user_id = ?', (user_id,))
-    owned_skins = [row[0] for row in cursor.fetchall()]
-    total_value = 0
-    details = []
-    for skin in owned_skins:
-        # bundle_skins table se price uthao
-        cursor.execute('SELECT value_vp, bundle_id FROM bundle_skins WHERE skin_name = ?', (skin,))
-        result = cursor.fetchone()
-        if result:
-            value_vp, bundle_id = result
-            # Bundle ka naam bhi nikal lo
-            cursor.execute('SELECT bundle_name FROM bundles WHERE id = ?', (bundle_id,))
-            bundle_row = cursor.fetchone()
-            bundle_name = bundle_row[0] if bundle_row else None
-            total_value += value_vp if value_vp else 0
-            details.append({'skin_name': skin, 'bundle': bundle_name, 'value_vp': value_vp})
+    return read_cache.get_or_load(('account_value', user_id, _catalog_version),
+                                  lambda: _calculate_account_skin_value(user_id))
+
+# Har owned skin ke sath uski pehli bundle_skins listing ka price aur bundle naam
+_ACCOUNT_VALUE_SQL = '''
+    SELECT inv.user_id, i.name, b.bundle_name, bs.value_vp, bs.id IS NOT NULL
+    FROM inventory inv
+    JOIN items i ON i.id = inv.item_id
+    LEFT JOIN bundle_skins bs ON bs.id = (
+        SELECT MIN(id) FROM bundle_skins WHERE item_id = inv.item_id
+    )
+    LEFT JOIN bundles b ON b.id = bs.bundle_id
+    WHERE inv.item_type = 'skins' {where}
+    ORDER BY inv.user_id, inv.item_id
+'''
+
+def _account_values(rows):
+    values = {}
+    for user_id, skin_name, bundle_name, value_vp, listed in rows:
+        result = values.setdefault(user_id, {'total_value_vp': 0, 'details': []})
+        result['total_value_vp'] += value_vp or 0
+        result['details'].append({'skin_name': skin_name, 'bundle': bundle_name if listed else None, 'value_vp': value_vp})
+    return values
+
+def _calculate_account_skin_value(user_id):
+    with get_connection() as conn:
+        rows = conn.execute(_ACCOUNT_VALUE_SQL.format(where='AND inv.user_id = ?'), (user_id,)).fetchall()
+    return _account_values(rows).get(user_id, {'total_value_vp': 0, 'details': []})
+
+def calculate_account_skin_values(user_ids=None):
+    """
+    Batch variant (leaderboards / admin reports): bahut saare users ek hi query me.
+    user_ids=None ho to saare users. Return: {user_id: {'total_value_vp', 'details'}}
+    """
+    with get_connection() as conn:
+        if user_ids is None:
+            rows = conn.execute(_ACCOUNT_VALUE_SQL.format(where='')).fetchall()
+            user_ids = [row[0] for row in conn.execute('SELECT id FROM users ORDER BY id')]
         else:
-            details.append({'skin_name': skin, 'bundle': None, 'value_vp': None})
-    conn.close()
-    return {'total_value_vp': total_value, 'details': details}
+            user_ids = list(user_ids)
+            rows = conn.execute(
+                _ACCOUNT_VALUE_SQL.format(where='AND inv.user_id IN (SELECT value FROM json_each(?))'),
+                (json.dumps(user_ids),),
+            ).fetchall()
+    values = _account_values(rows)
+    return {user_id: values.get(user_id, {'total_value_vp': 0, 'details': []}) for user_id in user_ids}
 
-def purchase_skin(user_id, skin_name):
+def get_account_value(user_id):
+    """User ki total skin value (VP) - materialized account_value table se O(1) lookup."""
+    def load():
+        with get_connection() as conn:
+            row = conn.execute('SELECT total_value_vp FROM account_value WHERE user_id = ?', (user_id,)).fetchone()
+        return row[0] if row else 0
+    return read_cache.get_or_load(('account_total', user_id), load)
+
+def reconcile_account_values(fix=False):
     """
-    User ek skin buy karta hai. Points check karo, inventory update karo.
-    Return: (success, message)
+    account_value ko full recompute (calculate_account_skin_values) se verify karta hai.
+    fix=True par galat rows theek kar deta hai. Return: [(user_id, stored, actual)]
     """
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    # Skin ki value nikaalo
-    cursor.execute('SELECT value_vp FROM bundle_skins WHERE skin_name = ?', (skin_name,))
-    row = cursor.fetchone()
+    actual = {user_id: value['total_value_vp'] for user_id, value in calculate_account_skin_values().items()}
+    with get_connection(immediate=fix) as conn:
+        stored = dict(conn.execute('SELECT user_id, total_value_vp FROM account_value').fetchall())
+        mismatches = [(user_id, stored.get(user_id, 0), actual.get(user_id, 0))
+                      for user_id in sorted(set(stored) | set(actual))
+                      if stored.get(user_id, 0) != actual.get(user_id, 0)]
+        if fix and mismatches:
+            conn.executemany(
+                'INSERT INTO account_value (user_id, total_value_vp) VALUES (?, ?) '
+                'ON CONFLICT (user_id) DO UPDATE SET total_value_vp = excluded.total_value_vp',
+                [(user_id, value) for user_id, stored_value, value in mismatches],
+            )
+            get_pool().after_commit(lambda: read_cache.invalidate('account_total'))
+    return mismatches
+
+class PurchaseError(Exception):
+    """Purchase reject hui; transaction rollback ho jata hai aur message user ko dikhta hai."""
+
+def _run_purchase(purchase, user_id, *args):
+    """
+    Purchase ko ek BEGIN IMMEDIATE transaction me chalata hai.
+    PurchaseError par poora kaam rollback hota hai; success par commit ke baad user ka
+    cache invalidate. Return: (success, message)
+    """
+    try:
+        with get_connection(immediate=True) as conn:
+            message = purchase(conn, user_id, *args)
+            get_pool().after_commit(lambda: invalidate_user(user_id))
+            return True, message
+    except PurchaseError as e:
+        return False, str(e)
+
+def _charge_points(conn, user_id, amount):
+    # Conditional UPDATE: balance check aur deduction ek hi statement me
+    updated = conn.execute(
+        'UPDATE store SET valorant_points = valorant_points - ? WHERE user_id = ? AND valorant_points >= ?',
+        (amount, user_id, amount),
+    ).rowcount
+    if not updated:
+        raise PurchaseError('Not enough points.')
+
+_SKIN_PRICE_SQL = 'SELECT value_vp FROM skin_values WHERE item_id = ?'
+_STORE_EXISTS_SQL = 'SELECT 1 FROM store WHERE user_id = ?'
+_SKIN_OWNED_SQL = "SELECT 1 FROM inventory WHERE user_id = ? AND item_type = 'skins' AND item_id = ?"
+_BUNDLE_SKINS_SQL = 'SELECT item_id, value_vp FROM bundle_skins WHERE bundle_id = ?'
+_BUNDLE_OWNED_SQL = ("SELECT item_id FROM inventory WHERE user_id = ? AND item_type = 'skins' "
+                     "AND item_id IN (SELECT value FROM json_each(?))")
+
+def _purchase_skin(conn, user_id, skin_name):
+    # Skin ki value nikaalo (interned id se)
+    item_id = item_ids(conn, 'skins', [skin_name], create=False).get(skin_name)
+    row = conn.execute(_SKIN_PRICE_SQL, (item_id,)).fetchone()
     if not row or row[0] is None:
-        conn.close()
-        return False, 'Skin price not found.'
+        raise PurchaseError('Skin price not found.')
     price = row[0]
-    # User ke points dekho
-    cursor.execute('SELECT valorant_points FROM store WHERE user_id = ?', (user_id,))
-    row = cursor.fetchone()
-    if not row:
-        conn.close()
-        return False, 'User store not found.'
-    points = row[0]
+    if not conn.execute(_STORE_EXISTS_SQL, (user_id,)).fetchone():
+        raise PurchaseError('User store not found.')
     # Already owned?
-    cursor.execute('SELECT 1 FROM inventory_skins WHERE user_id = ? AND skin_name = ?', (user_id, skin_name))
-    if cursor.fetchone():
-        conn.close()
-        return False, 'Already owned.'
-    if points < price:
-        conn.close()
-        return False, 'Not enough points.'
-    # Purchase
-    cursor.execute('UPDATE store SET valorant_points = valorant_points - ? WHERE user_id = ?', (price, user_id))
-    cursor.execute('INSERT INTO inventory_skins (user_id, skin_name) VALUES (?, ?)', (user_id, skin_name))
-    conn.commit()
-    conn.close()
-    return True, 'Purchase successful!'
+    if conn.execute(_SKIN_OWNED_SQL, (user_id, item_id)).fetchone():
+        raise PurchaseError('Already owned.')
+    _charge_points(conn, user_id, price)
+    try:
+        conn.execute("INSERT INTO inventory (user_id, item_type, item_id) VALUES (?, 'skins', ?)", (user_id, item_id))
+    except sqlite3.IntegrityError:
+        raise PurchaseError('Already owned.')
+    return 'Purchase successful!'
+
+def _purchase_bundle(conn, user_id, bundle_id):
+    # Bundle ki saari skins nikaalo (duplicate naam sirf ek baar)
+    skins = {}
+    for item_id, price in conn.execute(_BUNDLE_SKINS_SQL, (bundle_id,)):
+        skins.setdefault(item_id, price)
+    if not skins:
+        raise PurchaseError('Bundle not found.')
+    # Already owned skins filter karo
+    owned = {row[0] for row in conn.execute(_BUNDLE_OWNED_SQL, (user_id, json.dumps(list(skins))))}
+    to_buy = [(item_id, price) for item_id, price in skins.items() if item_id not in owned]
+    if not to_buy:
+        raise PurchaseError('All skins already owned.')
+    if not conn.execute(_STORE_EXISTS_SQL, (user_id,)).fetchone():
+        raise PurchaseError('User store not found.')
+    _charge_points(conn, user_id, sum(price for item_id, price in to_buy if price))
+    try:
+        conn.executemany("INSERT INTO inventory (user_id, item_type, item_id) VALUES (?, 'skins', ?)",
+                         [(user_id, item_id) for item_id, price in to_buy])
+    except sqlite3.IntegrityError:
+        raise PurchaseError('All skins already owned.')
+    return f'Bundle purchased! {len(to_buy)} new skins added.'
+
+def purchase_skin(user_id, skin_name):
+    """
+    User ek skin buy karta hai. Points check karo, inventory update karo.
+    Return: (success, message)
+    """
+    return _run_purchase(_purchase_skin, user_id, skin_name)
 
 def purchase_bundle(user_id, bundle_id):
     """
     User ek bundle buy karta hai. Saari skins ek sath milti hain, total price sum hota hai.
     Return: (success, message)
     """
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    # Bundle ki saari skins nikaalo
-    cursor.execute('SELECT skin_name, value_vp FROM bundle_skins WHERE bundle_id = ?', (bundle_id,))
-    skins = cursor.fetchall()
-    if not skins:
-        conn.close()
-        return False, 'Bundle not found.'
-    # Already owned skins filter karo
-    owned = set()
-    cursor.execute('SELECT skin_name FROM inventory_skins WHERE user_id = ?', (user_id,))
-    for row in cursor.fetchall():
-        owned.add(row[0])
-    to_buy = [(name, price) for name, price in skins if name not in owned]
-    if not to_buy:
-        conn.close()
-        return False, 'All skins already owned.'
-    total_price = sum(price for name, price in to_buy if price)
-    # User ke points dekho
-    cursor.execute('SELECT valorant_points FROM store WHERE user_id = ?', (user_id,))
-    row = cursor.fetchone()
-    if not row:
-        conn.close()
-        return False, 'User store not found.'
-    points = row[0]
-    if points < total_price:
-        conn.close()
-        return False, 'Not enough points.'
-    # Purchase
-    cursor.execute('UPDATE store SET valorant_points = valorant_points - ? WHERE user_id = ?', (total_price, user_id))
-    for name, price in to_buy:
-        cursor.execute('INSERT INTO inventory_skins (user_id, skin_name) VALUES (?, ?)', (user_id, name))
-    conn.commit()
-    conn.close()
-    return True, f'Bundle purchased! {len(to_buy)} new skins added.'
+    return _run_purchase(_purchase_bundle, user_id, bundle_id)
+
+# jobs.status values; pehle do "active" hain
+JOB_STATUSES = ('queued', 'running', 'done', 'failed', 'cancelled')
+
+_JOB_COLUMNS = ('id', 'kind', 'user_id', 'status', 'params', 'runner', 'done', 'total', 'message',
+                'result', 'cancel_requested', 'created_at', 'updated_at', 'finished_at')
+
+_LATEST_JOB_SQL = f'SELECT {", ".join(_JOB_COLUMNS)} FROM jobs WHERE user_id = ? AND kind = ? ORDER BY id DESC LIMIT 1'
+
+def _job_row(row):
+    if row is None:
+        return None
+    job = dict(zip(_JOB_COLUMNS, row))
+    job['params'] = json.loads(job['params'] or '{}')
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    job['cancel_requested'] = bool(job['cancel_requested'])
+    return job
+
+def create_job(kind, user_id=None, params=None, runner=None):
+    """Naya 'queued' job; return: job id."""
+    with get_connection(immediate=True) as conn:
+        get_pool().after_commit(_invalidate_latest_jobs)
+        return conn.execute('INSERT INTO jobs (kind, user_id, params, runner) VALUES (?, ?, ?, ?)',
+                            (kind, user_id, json.dumps(params or {}), runner)).lastrowid
+
+def get_job(job_id):
+    # Cache nahi - pages isi ko poll karte hain
+    with get_connection() as conn:
+        return _job_row(conn.execute(f'SELECT {", ".join(_JOB_COLUMNS)} FROM jobs WHERE id = ?',
+                                     (job_id,)).fetchone())
+
+def _invalidate_latest_jobs():
+    # Naya job ya koi job khatam hua - latest_job ka answer (id / active ya nahi) badla
+    read_cache.invalidate('latest_job')
+
+def latest_job(user_id, kind):
+    """
+    User ka is kind ka sabse naya job (page refresh ke baad bhi dikhta hai). Cached - sirf
+    job banne / khatam / cancel hone par invalidate hota hai, isliye idle page ke rerun par
+    DB hit nahi. Progress fields purane ho sakte hain; chalte job ke liye get_job() poll karo.
+    """
+    def load():
+        with get_connection() as conn:
+            return _job_row(conn.execute(_LATEST_JOB_SQL, (user_id, kind)).fetchone())
+    return read_cache.get_or_load(('latest_job', user_id, kind), load)
+
+def claim_job(job_id):
+    """queued -> running. False agar job beech me cancel ho gaya (ya pehle hi claim hua)."""
+    with get_connection(immediate=True) as conn:
+        return conn.execute('''
+            UPDATE jobs SET status = 'running', updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'queued'
+        ''', (job_id,)).rowcount == 1
+
+def update_job_progress(job_id, done, total=None, message=None):
+    """Progress likhta hai; return: True agar cancel maanga gaya hai."""
+    with get_connection(immediate=True) as conn:
+        row = conn.execute('''
+            UPDATE jobs SET done = ?, total = COALESCE(?, total), message = COALESCE(?, message),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? RETURNING cancel_requested
+        ''', (done, total, message, job_id)).fetchone()
+    return bool(row and row[0])
+
+def finish_job(job_id, status, message=None, result=None):
+    with get_connection(immediate=True) as conn:
+        conn.execute('''
+            UPDATE jobs SET status = ?, message = COALESCE(?, message), result = ?,
+                updated_at = CURRENT_TIMESTAMP, finished_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (status, message, json.dumps(result) if result is not None else None, job_id))
+        get_pool().after_commit(_invalidate_latest_jobs)
+
+def cancel_job(job_id, user_id=None):
+    """
+    Queued job turant 'cancelled'; running job ko flag milta hai aur wo agle
+    progress update par ruk jata hai. False agar job active nahi tha.
+    """
+    with get_connection(immediate=True) as conn:
+        get_pool().after_commit(_invalidate_latest_jobs)
+        return conn.execute('''
+            UPDATE jobs SET cancel_requested = 1, updated_at = CURRENT_TIMESTAMP,
+                status = CASE status WHEN 'queued' THEN 'cancelled' ELSE status END,
+                finished_at = CASE status WHEN 'queued' THEN CURRENT_TIMESTAMP ELSE finished_at END
+            WHERE id = ? AND status IN ('queued', 'running') AND (? IS NULL OR user_id = ?)
+        ''', (job_id, user_id, user_id)).rowcount == 1
+
+_ACTIVE_JOBS_SQL = "SELECT id, runner FROM jobs WHERE status IN ('queued', 'running')"
+
+def active_jobs():
+    """[(job_id, runner)] saare queued/running jobs."""
+    with get_connection() as conn:
+        return conn.execute(_ACTIVE_JOBS_SQL).fetchall()
+
+_demo_user_ready = False
 
 # Initialize database with demo user
 def create_demo_user():
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    
-    # Check if demo user exists
-    cursor.execute('SELECT id FROM users WHERE username = ?', ('demo',))
-    if not cursor.fetchone():
-        create_user('demo', 'demo@valorant.com', 'valorant123', 'Demo Player', 'EU', 'France')
+    # Process me ek baar kaafi hai, Streamlit reruns par DB hit nahi
+    global _demo_user_ready
+    if not _demo_user_ready:
+        _create_demo_user()
+        _demo_user_ready = True
+
+_bootstrap_lock = threading.Lock()
+_bootstrapped = False
+
+def bootstrap(checkpointer=True):
+    """
+    App start ka ek-baar setup: schema, demo user aur WAL checkpointer.
+    Streamlit har rerun par app script dobara chalata hai, lekin module process me
+    ek hi baar load hota hai - isliye doosri call se ye sirf ek flag check hai.
+    """
+    global _bootstrapped
+    if _bootstrapped:
+        return
+    with _bootstrap_lock:
+        if not _bootstrapped:
+            init_database()
+            create_demo_user()
+            if checkpointer:
+                start_checkpointer()
+            _bootstrapped = True
+
+def _create_demo_user():
+    # Sasta read-only check pehle, taaki write lock na lage
+    with get_connection() as conn:
+        if conn.execute('SELECT 1 FROM users WHERE username = ?', ('demo',)).fetchone():
+            return
+    # KDF write lock ke bahar (create_user jaisa) - bootstrap ke dauran baaki writers na rukein
+    password_hash = passwords.hash_password('valorant123')
+    with get_connection(immediate=True) as conn:
+        cursor = conn.cursor()
         
-        # Get demo user ID
+        # Check if demo user exists (read aur lock ke beech kisi aur worker ne bana diya ho)
         cursor.execute('SELECT id FROM users WHERE username = ?', ('demo',))
-        demo_user_id = cursor.fetchone()[0]
+        if cursor.fetchone():
+            return
+        demo_user_id = cursor.execute('''
+            INSERT INTO users (username, email, password_hash)
+            VALUES (?, ?, ?)
+        ''', ('demo', 'demo@valorant.com', password_hash)).lastrowid
+        _insert_new_user_profiles(conn, [(demo_user_id, 'Demo Player', 'EU', 'France')])
         
         # Update demo user details
         update_user_details(demo_user_id, level=45, rank='Platinum', phone_verified=True, email_verified=True)
@@ -537,19 +2095,17 @@ def create_demo_user():
             WHERE user_id = ?
         ''', (demo_user_id,))
         
-        # Add demo inventory
-        demo_skins = ['Prime Vandal', 'Elderflame Operator']
-        for skin in demo_skins:
-            cursor.execute('INSERT INTO inventory_skins (user_id, skin_name) VALUES (?, ?)', (demo_user_id, skin))
-        
-        demo_agents = ['Jett', 'Phoenix', 'Sage']
-        for agent in demo_agents:
-            cursor.execute('INSERT INTO inventory_agents (user_id, agent_name) VALUES (?, ?)', (demo_user_id, agent))
-        
-        cursor.execute('INSERT INTO inventory_battlepass (user_id, battlepass_name) VALUES (?, ?)', (demo_user_id, 'Episode 6'))
-        cursor.execute('INSERT INTO inventory_buddies (user_id, buddy_name) VALUES (?, ?)', (demo_user_id, 'Valorant Buddy'))
-        cursor.execute('INSERT INTO inventory_cards (user_id, card_name) VALUES (?, ?)', (demo_user_id, 'Valorant Card'))
-        cursor.execute('INSERT INTO inventory_titles (user_id, title_name) VALUES (?, ?)', (demo_user_id, 'The Unstoppable'))
+        # Add demo inventory (default items pehle se hain, woh skip ho jate hain)
+        demo_items = {
+            'skins': ['Prime Vandal', 'Elderflame Operator'],
+            'agents': ['Jett', 'Phoenix', 'Sage'],
+            'battlepass': ['Episode 6'],
+            'buddies': ['Valorant Buddy'],
+            'cards': ['Valorant Card'],
+            'titles': ['The Unstoppable'],
+        }
+        add_inventory_items(conn, [(demo_user_id, item_type, name)
+                                   for item_type, names in demo_items.items() for name in names])
         
         # Add demo matches
         demo_matches = [
@@ -557,11 +2113,31 @@ def create_demo_user():
             ('2023-05-28', 'Loss', '8-13'),
         ]
         for date, result, score in demo_matches:
+            rounds_won, rounds_lost = parse_score(score)
             cursor.execute('''
-                INSERT INTO match_history (user_id, match_date, result, score, link)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (demo_user_id, date, result, score, '#'))
-        
-        conn.commit()
-    
-    conn.close() 
\ No newline at end of file
+                INSERT INTO match_history (user_id, match_date, result, score, link,
+                                           rounds_won, rounds_lost, played_at, mode)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (demo_user_id, date, result, score, '#', rounds_won, rounds_lost, f'{date} 00:00:00', 'Competitive'))
+        get_pool().after_commit(lambda: invalidate_user(demo_user_id))
+
+if __name__ == "__main__":
+    import sys
+    init_database()
+    command = sys.argv[1] if len(sys.argv) > 1 else 'check'
+    if command == 'reconcile':
+        mismatches = reconcile_account_values(fix='--fix' in sys.argv)
+        for user_id, stored, actual in mismatches:
+            print(f"user {user_id}: stored {stored} VP, actual {actual} VP")
+        print(f"{len(mismatches)} account_value mismatches")
+        sys.exit(1 if mismatches and '--fix' not in sys.argv else 0)
+    if command == 'report':
+        print(match_stats_report().to_string())
+        sys.exit(0)
+    if command == 'checkpoint':
+        # Maintenance: WAL ko main DB me likh kar truncate (app chalte waqt bhi safe)
+        busy, wal_pages, checkpointed = stop_checkpointer(truncate=True)
+        print(f"checkpoint: {checkpointed}/{wal_pages} WAL pages, busy={busy}")
+        sys.exit(1 if busy else 0)
+    for label, details in check_query_plans().items():
+        print(f"{label}: {' | '.join(details)}")
@@ -0,0 +1,120 @@
+import csv
+import io
+import json
+
+# Format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'XLSX': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'NDJSON': ('ndjson', 'application/x-ndjson'),
+}
+
+PROFILE_FIELDS = [
+    'name', 'region', 'country', 'level', 'rank', 'registration_date', 'phone_verified',
+    'email_verified', 'episode', 'act', 'valorant_points', 'radiant_points', 'kingdom_points',
+]
+INVENTORY_FIELDS = ['item_type', 'item_name']
+MATCH_FIELDS = ['match_date', 'result', 'score', 'link', 'played_at', 'mode', 'agent', 'rounds_won', 'rounds_lost']
+
+# Flat export record: record_type 'profile' / 'inventory' / 'match'
+RECORD_COLUMNS = ['record_type', 'user_id'] + PROFILE_FIELDS + INVENTORY_FIELDS + MATCH_FIELDS
+
+# XLSX sheet -> (record_type, columns)
+XLSX_SHEETS = {
+    'Profile': ('profile', ['user_id'] + PROFILE_FIELDS),
+    'Inventory': ('inventory', ['user_id'] + INVENTORY_FIELDS),
+    'MatchHistory': ('match', ['user_id'] + MATCH_FIELDS),
+}
+
+def user_records(user_id, user_data):
+    """get_user_data() ke dict se flat export records yield karta hai."""
+    profile = {'record_type': 'profile', 'user_id': user_id}
+    profile.update(user_data['details'])
+    profile.update(user_data['store'])
+    yield profile
+    for item_type, items in user_data['inventory'].items():
+        for item in items:
+            yield {'record_type': 'inventory', 'user_id': user_id, 'item_type': item_type, 'item_name': item}
+    for match in user_data['match_history']:
+        record = {'record_type': 'match', 'user_id': user_id, 'match_date': match['date']}
+        record.update((field, match.get(field)) for field in MATCH_FIELDS[1:])
+        yield record
+
+def _write_csv(records, fileobj):
+    text = io.TextIOWrapper(fileobj, encoding='utf-8', newline='')
+    try:
+        writer = csv.DictWriter(text, fieldnames=RECORD_COLUMNS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+        text.flush()
+    finally:
+        text.detach()
+
+def _write_ndjson(records, fileobj):
+    for record in records:
+        fileobj.write(json.dumps({k: v for k, v in record.items() if v is not None}).encode('utf-8') + b'\n')
+
+def _parquet_schema(pa):
+    types = {'user_id': pa.int64(), 'level': pa.int64(), 'phone_verified': pa.bool_(),
+             'email_verified': pa.bool_(), 'valorant_points': pa.int64(),
+             'radiant_points': pa.int64(), 'kingdom_points': pa.int64(),
+             'rounds_won': pa.int64(), 'rounds_lost': pa.int64()}
+    return pa.schema([(column, types.get(column, pa.string())) for column in RECORD_COLUMNS])
+
+def _write_parquet(records, fileobj, row_group_size=10000):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError('Parquet export needs pyarrow: pip install pyarrow')
+    schema = _parquet_schema(pa)
+    with pq.ParquetWriter(fileobj, schema) as writer:
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= row_group_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+def _write_xlsx(records, fileobj):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError('XLSX export needs openpyxl: pip install openpyxl')
+    # write_only workbook rows ko disk par stream karta hai
+    workbook = Workbook(write_only=True)
+    sheets = {}
+    for title, (record_type, columns) in XLSX_SHEETS.items():
+        sheet = workbook.create_sheet(title)
+        sheet.append(columns)
+        sheets[record_type] = (sheet, columns)
+    for record in records:
+        sheet, columns = sheets[record['record_type']]
+        sheet.append([record.get(column) for column in columns])
+    workbook.save(fileobj)
+
+_WRITERS = {
+    'CSV': _write_csv,
+    'XLSX': _write_xlsx,
+    'Parquet': _write_parquet,
+    'NDJSON': _write_ndjson,
+}
+
+def write_records(records, fmt, fileobj):
+    """Records ko chune hue format me binary fileobj me likhta hai (records ek baar iterate hote hain)."""
+    if fmt not in _WRITERS:
+        raise ValueError(f'Unknown export format: {fmt}')
+    _WRITERS[fmt](records, fileobj)
+
+def export_bytes(records, fmt):
+    """Chhote exports (ek user) ke liye: poora file memory me bytes."""
+    buffer = io.BytesIO()
+    write_records(records, fmt, buffer)
+    return buffer.getvalue()
+
+def export_filename(base, fmt):
+    return f'{base}.{EXPORT_FORMATS[fmt][0]}'
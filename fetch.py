@@ -0,0 +1,112 @@
+"""
+Catalog fetching: pooled requests.Session + disk cache with conditional GET.
+Har URL ke liye body aur validators (ETag / Last-Modified / content hash) FETCH_CACHE_DIR
+me rehte hain. Server 304 de ya same bytes dobara bheje, dono me `changed` False hota hai
+aur caller parse/DB kaam skip kar sakta hai.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+FETCH_CACHE_DIR = os.environ.get('VALORANT_FETCH_CACHE_DIR',
+                                 os.path.join(tempfile.gettempdir(), 'valorant-http-cache'))
+# (connect, read) timeout seconds
+FETCH_TIMEOUT = (float(os.environ.get('VALORANT_FETCH_CONNECT_TIMEOUT', '5')),
+                 float(os.environ.get('VALORANT_FETCH_READ_TIMEOUT', '30')))
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3")
+
+# content: bytes (304 par disk se); changed: pichhli fetch se content badla ya nahi;
+# from_cache: body disk se aayi (304); status: HTTP status
+FetchResult = namedtuple('FetchResult', 'url status content changed from_cache content_hash')
+
+_local = threading.local()
+
+def get_session():
+    """
+    Thread-local Session (requests.Session threads me share karna safe nahi) - har thread
+    ke connections keep-alive se reuse hote hain. Transient 5xx / connect errors par retry.
+    """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4,
+                              max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                                                allowed_methods=('GET', 'HEAD')))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['User-Agent'] = USER_AGENT
+        _local.session = session
+    return session
+
+def _paths(url):
+    key = hashlib.sha256(url.encode()).hexdigest()
+    return os.path.join(FETCH_CACHE_DIR, key + '.json'), os.path.join(FETCH_CACHE_DIR, key + '.body')
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def load_cached(url):
+    """Return: (meta dict, body bytes) ya (None, None) agar cache me nahi / adhoora hai."""
+    meta_path, body_path = _paths(url)
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            return meta, f.read()
+    except (OSError, ValueError):
+        return None, None
+
+def fetch(url, session=None, timeout=FETCH_TIMEOUT):
+    """
+    Conditional GET: cached ETag / Last-Modified ke sath request. 304 par body disk se;
+    200 par content hash compare hota hai (validators na dene wale servers ke liye).
+    Non-200/304 status par body cache nahi hoti aur content None hota hai.
+    """
+    meta, body = load_cached(url)
+    headers = {}
+    if meta:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+    response = (session or get_session()).get(url, headers=headers, timeout=timeout)
+    meta_path, body_path = _paths(url)
+    if response.status_code == 304 and meta:
+        meta['checked_at'] = time.time()
+        os.makedirs(FETCH_CACHE_DIR, exist_ok=True)
+        _write_atomic(meta_path, json.dumps(meta).encode())
+        return FetchResult(url, 304, body, False, True, meta['content_hash'])
+    if response.status_code != 200:
+        return FetchResult(url, response.status_code, None, True, False, None)
+
+    content = response.content
+    content_hash = hashlib.sha256(content).hexdigest()
+    changed = not meta or meta.get('content_hash') != content_hash
+    os.makedirs(FETCH_CACHE_DIR, exist_ok=True)
+    if changed:
+        _write_atomic(body_path, content)
+    _write_atomic(meta_path, json.dumps({
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'content_hash': content_hash,
+        'checked_at': time.time(),
+    }).encode())
+    return FetchResult(url, 200, content, changed, False, content_hash)
+
+def forget(url):
+    """URL ki cache entry hata deta hai (agla fetch poora download + changed=True)."""
+    for path in _paths(url):
+        if os.path.exists(path):
+            os.remove(path)
@@ -1,4 +1,4 @@
-import sqlite3
+import database as db
 
 sample_bundles = [
     {
@@ -33,23 +33,9 @@ sample_bundles = [
     }
 ]
 
-conn = sqlite3.connect('valorant_game.db')
-cursor = conn.cursor()
+db.init_database()
 
-# Clear old data
-cursor.execute('DELETE FROM bundle_skins')
-cursor.execute('DELETE FROM bundles')
-conn.commit()
-
-# Insert new sample data
-for bundle in sample_bundles:
-    cursor.execute('INSERT INTO bundles (bundle_name) VALUES (?)', (bundle['bundle_name'],))
-    bundle_id = cursor.lastrowid
-    for skin in bundle['skins']:
-        cursor.execute('''
-            INSERT INTO bundle_skins (bundle_id, skin_name, skin_type, value_vp, image_url)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (bundle_id, skin['skin_name'], skin['skin_type'], skin['value_vp'], skin['image_url']))
-conn.commit()
-conn.close()
-print('Sample bundles and skins inserted!') 
\ No newline at end of file
+# Catalog ko exactly sample data bana do - diff se sirf badli rows likhi jati hain (prune:
+# baaki bundles hat jate hain); dobara chalane par kuch nahi likha jata
+report = db.sync_catalog(sample_bundles, prune=True)
+print(f"Sample bundles and skins synced: {report}")
@@ -0,0 +1,274 @@
+"""
+Background jobs: scraping, bulk uploads aur exports UI thread se bahar chalte hain.
+Har job `jobs` table me persisted hai (status, progress, result), isliye page refresh
+ya naya session bhi use dekh sakta hai - pages bas db.latest_job / db.get_job poll karte hain.
+Cancel cooperative hai: db.cancel_job flag lagata hai aur job agle progress() par ruk jata hai.
+"""
+import contextlib
+import csv
+import io
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import csv_stream
+import database as db
+import exports
+
+JOB_WORKERS = int(os.environ.get('VALORANT_JOB_WORKERS', '2'))
+# Uploads aur result files yahan; DB me sirf path rehta hai
+JOB_DIR = os.environ.get('VALORANT_JOB_DIR', os.path.join(tempfile.gettempdir(), 'valorant-jobs'))
+# Result files itne seconds baad process start par hata di jati hain
+JOB_FILE_TTL = float(os.environ.get('VALORANT_JOB_FILE_TTL', str(24 * 3600)))
+RUNNER = f'{socket.gethostname()}:{os.getpid()}'
+
+class JobCancelled(Exception):
+    pass
+
+def job_dir():
+    """
+    JOB_DIR (uploads, results, exports me user data hai) sirf is process ke user ke liye
+    0700 banata hai. Shared temp dir me kisi aur ka bana hua dir ya symlink use nahi hota.
+    """
+    os.makedirs(JOB_DIR, mode=0o700, exist_ok=True)
+    info = os.lstat(JOB_DIR)
+    if not stat.S_ISDIR(info.st_mode) or (hasattr(os, 'getuid') and info.st_uid != os.getuid()):
+        raise RuntimeError(f'Job directory {JOB_DIR} is not a directory owned by this user')
+    if stat.S_IMODE(info.st_mode) != 0o700:
+        os.chmod(JOB_DIR, 0o700)
+    return JOB_DIR
+
+def _private_opener(path, flags):
+    # open(..., opener=) ke liye: nayi job files owner-only (0600)
+    return os.open(path, flags, 0o600)
+
+class Job:
+    """Job function ko milta hai: params, progress() aur apni files ke liye path()."""
+
+    def __init__(self, job_id, params):
+        self.id = job_id
+        self.params = params
+
+    def progress(self, done, total=None, message=None):
+        """Progress DB me likhta hai; cancel maanga gaya ho to JobCancelled."""
+        if db.update_job_progress(self.id, done, total, message):
+            raise JobCancelled()
+
+    def path(self, name):
+        """Job ki file ka path; file _private_opener se kholo."""
+        job_dir()
+        return job_file(self.id, name)
+
+def job_file(job_id, name):
+    return os.path.join(JOB_DIR, f'{job_id}-{name}')
+
+def _scrape_job(job):
+    from scrape_valorant_skins import scrape_valorant_skins
+    return scrape_valorant_skins(
+        progress=lambda done, total: job.progress(done, total, f'Synced {done}/{total} bundles'))
+
+def _count_rows(path):
+    """CSV data rows ka andaza (newlines - header), progress bar ke total ke liye."""
+    with open(path, 'rb') as f:
+        return max(sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b'')) - 1, 0)
+
+def status_summary(processed, counts):
+    return f"Processed {processed} rows - " + ", ".join(f"{status}: {n}" for status, n in Counter(counts).most_common())
+
+def _bulk_job(job, columns, result_batches):
+    """
+    Upload CSV ko batches me process karta hai; saare result rows job ki results CSV me,
+    memory me sirf status counts. Cancel par tab tak ke batches committed rehte hain.
+    """
+    upload = job.params['upload']
+    total = _count_rows(upload)
+    results_path = job.path('results.csv')
+    counts = Counter()
+    processed = 0
+    with open(upload, 'rb') as source, open(results_path, 'w', newline='', encoding='utf-8',
+                                            opener=_private_opener) as out:
+        writer = None
+        for results in result_batches(csv_stream.iter_csv_records(source, columns)):
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=list(results[0]))
+                writer.writeheader()
+            writer.writerows(results)
+            # Chalte job ke results UI me dikhte hain (tail_results) - har batch disk par
+            out.flush()
+            processed += len(results)
+            counts.update(result['status'].split(' | ')[0] for result in results)
+            job.progress(processed, max(total, processed), status_summary(processed, counts))
+    return {'rows': processed, 'counts': dict(counts), 'file': results_path}
+
+def tail_results(job_id, rows=50, max_bytes=64 * 1024):
+    """
+    Bulk job ki results CSV ki aakhri `rows` rows (chalte job ki bhi, jitni abhi tak likhi
+    gayi). Sirf file ka header aur aakhri max_bytes padhe jate hain. File na ho to [].
+    """
+    try:
+        f = open(job_file(job_id, 'results.csv'), 'rb')
+    except FileNotFoundError:
+        return []
+    with f:
+        header = f.readline()
+        if not header.endswith(b'\n'):
+            return []
+        size = os.fstat(f.fileno()).st_size
+        # Ek byte pehle se padho taaki pehli (adhoori) line hamesha chhodi ja sake
+        start = max(len(header), size - max_bytes) - 1
+        f.seek(start)
+        data = f.read(size - start).partition(b'\n')[2]
+    # Aakhri line writer abhi likh raha ho sakta hai
+    data = data[:data.rfind(b'\n') + 1]
+    reader = csv.DictReader(io.StringIO((header + data).decode('utf-8', errors='replace'), newline=''))
+    return list(deque(reader, maxlen=rows))
+
+def _bulk_register_job(job):
+    return _bulk_job(job, list(db.NEW_USER_FIELDS), db.iter_create_users_bulk)
+
+def _bulk_check_job(job):
+    base_link = job.params['base_link']
+
+    def check_batches(records):
+        for batch in csv_stream.iter_batches(records, 1000):
+            results = []
+            for result in db.check_accounts(batch):
+                user_id = result.pop('user_id')
+                result['user_link'] = f"{base_link}?user_id={user_id}" if user_id else ""
+                results.append(result)
+            yield results
+
+    return _bulk_job(job, ['username', 'password'], check_batches)
+
+def _export_job(job, progress_every=500):
+    fmt = job.params['format']
+    filename = exports.export_filename('all_users_export', fmt)
+    path = job.path(filename)
+    total = db.count_users()
+
+    def counted(records):
+        users = 0
+        for record in records:
+            if record['record_type'] == 'profile':
+                users += 1
+                if users % progress_every == 0:
+                    job.progress(users, total, f'Exported {users}/{total} users')
+            yield record
+        job.progress(users, users, f'Exported {users} users')
+
+    try:
+        with open(path, 'wb', opener=_private_opener) as f:
+            exports.write_records(counted(db.iter_export_records()), fmt, f)
+    except BaseException:
+        # open() khud fail hua ho to file bani hi nahi
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        raise
+    return {'file': path, 'filename': filename, 'mime': exports.EXPORT_FORMATS[fmt][1]}
+
+# kind -> job function(job) -> result dict (JSON me store hota hai)
+JOB_KINDS = {
+    'scrape': _scrape_job,
+    'bulk_register': _bulk_register_job,
+    'bulk_check': _bulk_check_job,
+    'export': _export_job,
+}
+
+# Ye kinds sab users ka data chhoote hain - sirf db.is_admin() users submit kar sakte hain
+ADMIN_JOB_KINDS = {'export'}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                recover_interrupted()
+                prune_files()
+                _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='job')
+    return _executor
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def recover_interrupted():
+    """
+    Is host par jin processes ke jobs queued/running the aur wo process ab zinda nahi,
+    unhe 'failed' mark karta hai - warna restart ke baad UI me hamesha "running" dikhte.
+    """
+    host = socket.gethostname()
+    for job_id, runner in db.active_jobs():
+        runner_host, _, pid = (runner or '').rpartition(':')
+        if runner_host == host and pid.isdigit() and int(pid) != os.getpid() and not _pid_alive(int(pid)):
+            db.finish_job(job_id, 'failed', 'Interrupted: the process running this job exited')
+
+def prune_files(max_age=JOB_FILE_TTL):
+    """JOB_DIR ki max_age se purani files (purane exports / results) delete karta hai."""
+    if not os.path.isdir(JOB_DIR):
+        return
+    cutoff = time.time() - max_age
+    for entry in os.scandir(JOB_DIR):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+
+def _run(job_id, kind, params):
+    try:
+        if not db.claim_job(job_id):
+            return
+        try:
+            result = JOB_KINDS[kind](Job(job_id, params))
+        except JobCancelled:
+            db.finish_job(job_id, 'cancelled')
+        except (ValueError, RuntimeError) as e:
+            # Galat CSV columns, missing pyarrow/openpyxl - user ko message kaafi hai
+            db.finish_job(job_id, 'failed', str(e))
+        except Exception as e:
+            traceback.print_exc()
+            db.finish_job(job_id, 'failed', str(e) or type(e).__name__)
+        else:
+            db.finish_job(job_id, 'done', result=result)
+    finally:
+        if params.get('upload') and os.path.exists(params['upload']):
+            os.remove(params['upload'])
+
+def submit(kind, user_id=None, **params):
+    """Job ko table me 'queued' likh kar pool me bhejta hai. Return: job id."""
+    if kind not in JOB_KINDS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    if kind in ADMIN_JOB_KINDS and not db.is_admin(user_id):
+        raise PermissionError(f'{kind} jobs are restricted to admin users')
+    job_id = db.create_job(kind, user_id, params, RUNNER)
+    get_executor().submit(_run, job_id, kind, params)
+    return job_id
+
+def submit_upload(kind, uploaded_file, user_id=None, **params):
+    """Upload ko JOB_DIR me copy karke job submit - Streamlit upload session ke sath khatam ho jata hai."""
+    # mkstemp file 0600 banata hai
+    fd, path = tempfile.mkstemp(prefix='upload-', suffix='.csv', dir=job_dir())
+    with os.fdopen(fd, 'wb') as f:
+        uploaded_file.seek(0)
+        shutil.copyfileobj(uploaded_file, f)
+    return submit(kind, user_id, upload=path, **params)
+
+def shutdown(wait=True):
+    """Pool band karta hai (chalte jobs poore hone tak ruk kar); agla submit naya pool banata hai."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
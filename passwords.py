@@ -0,0 +1,153 @@
+"""
+Password hashing. Stored format versioned hai taaki kai algorithms ek sath chal sakein:
+
+    $scrypt$ln=14,r=8,p=1$<salt>$<hash>
+    $pbkdf2-sha256$i=600000$<salt>$<hash>
+    <64 hex chars>                         (purana unsalted SHA-256, sirf verify ke liye)
+
+Login par purana ya kamzor hash naye default scheme me upgrade hota hai (needs_rehash).
+KDF kaam ek bounded thread pool me chalta hai - hashlib ke scrypt/pbkdf2 GIL chhod dete
+hain, isliye Streamlit ka script thread aur baaki sessions block nahi hote.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import TTLCache
+
+DEFAULT_SCHEME = os.environ.get('VALORANT_PASSWORD_SCHEME', 'scrypt')
+KDF_WORKERS = int(os.environ.get('VALORANT_KDF_WORKERS', str(os.cpu_count() or 2)))
+LOGIN_CACHE_TTL = float(os.environ.get('VALORANT_LOGIN_CACHE_TTL', '300'))
+SALT_BYTES = 16
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+def _unb64(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+def _scrypt(password, salt, params):
+    n = 1 << params['ln']
+    return hashlib.scrypt(password, salt=salt, n=n, r=params['r'], p=params['p'],
+                          maxmem=256 * n * params['r'] * params['p'], dklen=32)
+
+def _pbkdf2_sha256(password, salt, params):
+    return hashlib.pbkdf2_hmac('sha256', password, salt, params['i'])
+
+# scheme -> (KDF, default params); params env se tune ho sakte hain
+SCHEMES = {
+    'scrypt': (_scrypt, {
+        'ln': int(os.environ.get('VALORANT_SCRYPT_LN', '14')),
+        'r': int(os.environ.get('VALORANT_SCRYPT_R', '8')),
+        'p': int(os.environ.get('VALORANT_SCRYPT_P', '1')),
+    }),
+    'pbkdf2-sha256': (_pbkdf2_sha256, {
+        'i': int(os.environ.get('VALORANT_PBKDF2_ITERATIONS', '600000')),
+    }),
+}
+
+def _legacy_sha256(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+def identify(stored):
+    """Stored hash ka (scheme, params) - legacy SHA-256 ke liye ('sha256', {})."""
+    if not stored.startswith('$'):
+        return 'sha256', {}
+    scheme, params = stored.split('$')[1:3]
+    return scheme, {key: int(value) for key, value in (item.split('=') for item in params.split(','))}
+
+def hash_password(password, scheme=None):
+    """Naya salted hash (default scheme aur current params ke sath)."""
+    scheme = scheme or DEFAULT_SCHEME
+    if scheme not in SCHEMES:
+        raise ValueError(f'Unknown password scheme: {scheme}')
+    kdf, params = SCHEMES[scheme]
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = kdf(password.encode(), salt, params)
+    encoded_params = ','.join(f'{key}={value}' for key, value in params.items())
+    return f'${scheme}${encoded_params}${_b64(salt)}${_b64(digest)}'
+
+def verify_password(password, stored):
+    """Constant-time comparison; galat/unknown format par False."""
+    if not stored:
+        return False
+    scheme, params = identify(stored)
+    if scheme == 'sha256':
+        return hmac.compare_digest(stored, _legacy_sha256(password))
+    if scheme not in SCHEMES:
+        return False
+    salt, expected = stored.split('$')[3:5]
+    digest = SCHEMES[scheme][0](password.encode(), _unb64(salt), params)
+    return hmac.compare_digest(digest, _unb64(expected))
+
+def needs_rehash(stored):
+    """True agar hash default scheme / current params par nahi hai."""
+    scheme, params = identify(stored)
+    return scheme != DEFAULT_SCHEME or params != SCHEMES[DEFAULT_SCHEME][1]
+
+_dummy_hash = None
+
+def dummy_hash():
+    """Unknown username par bhi utna hi KDF kaam ho, taaki timing se username pata na chale."""
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(secrets.token_hex(8))
+    return _dummy_hash
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=KDF_WORKERS, thread_name_prefix='kdf')
+    return _executor
+
+def shutdown(wait=True):
+    """Pool band karta hai (pending rehash poore hone tak ruk kar); agla call naya pool banata hai."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+def submit(fn, *args):
+    """KDF pool me background kaam (jaise rehash) - Future return karta hai."""
+    return get_executor().submit(fn, *args)
+
+# Successful verifications: stored hash -> HMAC(process key, password).
+# Key har process me random hai aur sirf memory me rehta hai; password badalne par
+# stored hash badal jata hai, isliye purani entry kabhi match nahi hoti.
+login_cache = TTLCache(maxsize=4096, ttl=LOGIN_CACHE_TTL)
+_login_cache_key = secrets.token_bytes(32)
+
+def _login_token(password):
+    return hmac.new(_login_cache_key, password.encode(), hashlib.sha256).digest()
+
+def check_password(password, stored):
+    """
+    Login path: pehle login_cache, warna KDF pool me verify_password.
+    Calling thread sirf result ka wait karta hai.
+    """
+    token = _login_token(password)
+    cached = login_cache.get(stored)
+    if cached is not None and hmac.compare_digest(cached, token):
+        return True
+    ok = get_executor().submit(verify_password, password, stored).result()
+    if ok:
+        login_cache.set(stored, token)
+    return ok
+
+def check_passwords(pairs):
+    """Bulk verify: [(password, stored)] -> [bool], pool me parallel."""
+    return list(get_executor().map(lambda pair: verify_password(*pair), pairs))
+
+def hash_passwords(passwords):
+    """Bulk hash (registration batches): [password] -> [stored], pool me parallel."""
+    return list(get_executor().map(hash_password, passwords))
@@ -0,0 +1,211 @@
+"""
+Public profile links (?user_id=) ke liye read-only HTTP service, Streamlit app ke bagal me.
+Streamlit har shared link par websocket session kholta hai, CSS inject karta hai aur poora
+script chalata hai. Ye plain ASGI app wahi profile pre-rendered HTML ya JSON me deta hai,
+ETag / 304 aur Cache-Control ke sath. Data async_db se aata hai.
+
+    uvicorn profile_api:app --port 8502        (ya: python profile_api.py --port 8502)
+
+    GET /?user_id=12                 HTML (Streamlit wale links ka same format)
+    GET /profile?user_id=12          HTML
+    GET /profile?user_id=12&format=json   JSON (ya `Accept: application/json`)
+
+Service sirf reads karti hai: startup par DB query_only pool se khulti hai, migrations /
+demo user nahi chalte. Schema peeche ho to startup fail hota hai - pehle main app ya
+`python database.py` chalao.
+
+Rendered documents db.read_cache me user ke key ke sath rehte hain (('profile_doc', user_id, fmt)),
+isliye is process ka koi bhi write jo invalidate_user() karta hai unhe bhi hata deta hai.
+Alag process me chalne par Streamlit ke writes yahan invalidate nahi karte, isliye startup
+par read_cache TTL max-age tak cap hota hai (VALORANT_CACHE_TTL set na ho to).
+"""
+import asyncio
+import hashlib
+import html
+import json
+import os
+from urllib.parse import parse_qs
+
+import async_db
+import database as db
+
+# Browser / CDN kitne seconds tak bina revalidate kiye reuse kare
+PROFILE_MAX_AGE = int(os.environ.get('VALORANT_PROFILE_MAX_AGE', '60'))
+# Public profile me kitne latest matches
+PROFILE_MATCHES = int(os.environ.get('VALORANT_PROFILE_MATCHES', '25'))
+PROFILE_PATHS = ('/', '/profile')
+# Public document me sirf wahi fields jo Streamlit ka profile view dikhata hai (store/points nahi)
+PUBLIC_DETAILS = ('name', 'region', 'country', 'level', 'rank', 'registration_date',
+                  'phone_verified', 'email_verified')
+PUBLIC_SECTIONS = ('details', 'inventory')
+
+CONTENT_TYPES = {'html': b'text/html; charset=utf-8', 'json': b'application/json'}
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+async def load_profile(user_id):
+    """Public profile dict ya None (user nahi mila). Dono reads ek hi DB batch me jati hain."""
+    data, page, stats = await asyncio.gather(
+        async_db.get_user_data(user_id, sections=PUBLIC_SECTIONS),
+        async_db.get_match_page(user_id, page_size=PROFILE_MATCHES),
+        async_db.get_match_stats(user_id))
+    if not data['details']['name']:
+        return None
+    return {
+        'user_id': user_id,
+        'details': {key: data['details'][key] for key in PUBLIC_DETAILS},
+        'inventory': data['inventory'],
+        'match_stats': stats,
+        'matches': [{key: match[key] for key in ('date', 'result', 'score', 'mode', 'agent', 'link')}
+                    for match in page['matches']],
+    }
+
+def render_json(profile):
+    return json.dumps(profile, separators=(',', ':')).encode()
+
+def _text(value):
+    return html.escape(str(value)) if value not in (None, '') else 'None'
+
+def render_html(profile):
+    d = profile['details']
+    stats = profile['match_stats']
+    rows = ''.join(f"<li>{_text(match['date'])} | {_text(match['result'])} | {_text(match['score'])} | "
+                   f"{_text(match['mode'])}</li>" for match in profile['matches'])
+    inventory = ''.join(f"<li><b>{_text(item_type.title())}:</b> "
+                        f"{', '.join(map(html.escape, names)) if names else 'None'}</li>"
+                        for item_type, names in profile['inventory'].items())
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{_text(d['name'])} - Valorant Hub</title>
+<style>body{{font-family:sans-serif;background:#282a36;color:#f8f8f2;max-width:760px;margin:2em auto;padding:0 1em}}
+h1,h2{{color:#bd93f9}}ul{{padding-left:1.2em}}li{{margin:.2em 0}}</style></head>
+<body><h1>👤 {_text(d['name'])} (User ID: {profile['user_id']})</h1>
+<ul><li><b>Region:</b> {_text(d['region'])}</li><li><b>Country:</b> {_text(d['country'])}</li>
+<li><b>Level:</b> {_text(d['level'])}</li><li><b>Rank:</b> {_text(d['rank'])}</li>
+<li><b>Registration date:</b> {_text(d['registration_date'])}</li>
+<li><b>Phone verified:</b> {'Yes' if d['phone_verified'] else 'No'}</li>
+<li><b>Email verified:</b> {'Yes' if d['email_verified'] else 'No'}</li></ul>
+<h2>Inventory</h2><ul>{inventory}</ul>
+<h2>Match History</h2>
+<p>{stats['wins']}W / {stats['losses']}L / {stats['draws']}D ({stats['win_rate']}% win rate)</p>
+<ul>{rows or '<li>No matches found.</li>'}</ul>
+</body></html>""".encode()
+
+RENDERERS = {'html': render_html, 'json': render_json}
+
+async def get_document(user_id, fmt):
+    """Return: (etag, body) - read_cache se, warna load + render karke cache me."""
+    key = ('profile_doc', user_id, fmt)
+    document = db.read_cache.get(key)
+    if document is None:
+        token = db.read_cache.begin(key)
+        try:
+            profile = await load_profile(user_id)
+            if profile is None:
+                raise HTTPError(404, 'User not found.')
+        except BaseException:
+            db.read_cache.abort(key, token)
+            raise
+        body = RENDERERS[fmt](profile)
+        document = (f'"{hashlib.sha256(body).hexdigest()[:32]}"', body)
+        db.read_cache.set(key, document, token)
+    return document
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match header (comma list, W/ weak tags, ya *) me etag hai?"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+
+def negotiate(query, headers):
+    fmt = query.get('format', [None])[0]
+    if fmt is None:
+        fmt = 'json' if 'application/json' in headers.get('accept', '') else 'html'
+    if fmt not in RENDERERS:
+        raise HTTPError(400, f'Unknown format: {fmt}')
+    return fmt
+
+def parse_user_id(query):
+    value = query.get('user_id', [None])[0]
+    if not value:
+        raise HTTPError(400, 'No user_id provided in link.')
+    try:
+        user_id = int(value)
+    except ValueError:
+        raise HTTPError(400, 'Invalid user_id.')
+    if user_id <= 0:
+        raise HTTPError(400, 'Invalid user_id.')
+    return user_id
+
+async def handle(method, path, query, headers):
+    """Return: (status, headers list, body)"""
+    if path == '/healthz':
+        return 200, [(b'content-type', b'text/plain')], b'ok'
+    if path not in PROFILE_PATHS:
+        raise HTTPError(404, 'Not found.')
+    if method not in ('GET', 'HEAD'):
+        raise HTTPError(405, 'Method not allowed.')
+    fmt = negotiate(query, headers)
+    etag, body = await get_document(parse_user_id(query), fmt)
+    response_headers = [
+        (b'etag', etag.encode()),
+        (b'cache-control', f'public, max-age={PROFILE_MAX_AGE}'.encode()),
+        (b'vary', b'Accept'),
+    ]
+    if etag_matches(headers.get('if-none-match'), etag):
+        return 304, response_headers, b''
+    return 200, response_headers + [(b'content-type', CONTENT_TYPES[fmt])], body
+
+async def _send_response(send, status, headers, body, head=False):
+    headers = headers + [(b'content-length', str(len(body)).encode())] if status != 304 else headers
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': b'' if head else body})
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Checkpointer bhi nahi: WAL sirf writer process (Streamlit app) badhata hai aur
+            # wahi checkpoint karta hai
+            try:
+                db.require_schema(read_only=True)
+            except RuntimeError as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            if 'VALORANT_CACHE_TTL' not in os.environ:
+                db.read_cache.ttl = min(db.read_cache.ttl, PROFILE_MAX_AGE)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await asyncio.to_thread(async_db.shutdown)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    """ASGI entry point."""
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    try:
+        status, response_headers, body = await handle(scope['method'], scope['path'], query, headers)
+    except HTTPError as e:
+        # Errors kabhi cache nahi hote - naya user ban sakta hai
+        status, body = e.status, json.dumps({'error': e.message}).encode()
+        response_headers = [(b'content-type', b'application/json'), (b'cache-control', b'no-store')]
+    await _send_response(send, status, response_headers, body, head=scope['method'] == 'HEAD')
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+    parser = argparse.ArgumentParser(description='Read-only profile service for shared ?user_id= links')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
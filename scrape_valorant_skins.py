@@ -1,123 +1,210 @@
-import requests
-from bs4 import BeautifulSoup
 import csv
-import sqlite3
-from database import insert_bundle_and_skins
-from database import calculate_account_skin_value
-
-URL = "https://www.pcgamesn.com/valorant/skins"
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3"
-}
-
-def scrape_valorant_skins():
-    # --- Force sample data for demo ---
-    sample_bundles = [
-        {
-            'bundle_name': 'Prime Bundle',
-            'skins': [
-                {'skin_name': 'Prime Vandal', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                {'skin_name': 'Prime Classic', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                {'skin_name': 'Prime Guardian', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                {'skin_name': 'Prime Spectre', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                {'skin_name': 'Prime Karambit', 'skin_type': 'melee', 'value_vp': 3550, 'image_url': None}
-            ]
-        },
-        {
-            'bundle_name': 'Oni Bundle',
-            'skins': [
-                {'skin_name': 'Oni Phantom', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                {'skin_name': 'Oni Guardian', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                {'skin_name': 'Oni Bucky', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                {'skin_name': 'Oni Shorty', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                {'skin_name': 'Oni Claw', 'skin_type': 'melee', 'value_vp': 3550, 'image_url': None}
-            ]
-        },
-        {
-            'bundle_name': 'Reaver Bundle',
-            'skins': [
-                {'skin_name': 'Reaver Vandal', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                {'skin_name': 'Reaver Operator', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                {'skin_name': 'Reaver Guardian', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                {'skin_name': 'Reaver Sheriff', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                {'skin_name': 'Reaver Knife', 'skin_type': 'melee', 'value_vp': 3550, 'image_url': None}
-            ]
-        }
-    ]
-    for bundle in sample_bundles:
-        insert_bundle_and_skins(bundle['bundle_name'], bundle['skins'])
-    print("Forcefully added sample data for demo.")
-    # --- End force sample data ---
-    return
-    response = requests.get(URL, headers=HEADERS)
-    if response.status_code != 200:
-        print(f"Failed to fetch page: {response.status_code}")
-        # Sample data add karo agar scraping fail ho
-        sample_bundles = [
-            {
-                'bundle_name': 'Prime Bundle',
-                'skins': [
-                    {'skin_name': 'Prime Vandal', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                    {'skin_name': 'Prime Classic', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                    {'skin_name': 'Prime Guardian', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                    {'skin_name': 'Prime Spectre', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                    {'skin_name': 'Prime Karambit', 'skin_type': 'melee', 'value_vp': 3550, 'image_url': None}
-                ]
-            },
-            {
-                'bundle_name': 'Oni Bundle',
-                'skins': [
-                    {'skin_name': 'Oni Phantom', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                    {'skin_name': 'Oni Guardian', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                    {'skin_name': 'Oni Bucky', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                    {'skin_name': 'Oni Shorty', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                    {'skin_name': 'Oni Claw', 'skin_type': 'melee', 'value_vp': 3550, 'image_url': None}
-                ]
-            },
-            {
-                'bundle_name': 'Reaver Bundle',
-                'skins': [
-                    {'skin_name': 'Reaver Vandal', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                    {'skin_name': 'Reaver Operator', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                    {'skin_name': 'Reaver Guardian', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                    {'skin_name': 'Reaver Sheriff', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
-                    {'skin_name': 'Reaver Knife', 'skin_type': 'melee', 'value_vp': 3550, 'image_url': None}
-                ]
-            }
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from database import CATALOG_SYNC_FIELDS, catalog_source_hash, sync_catalog
+from database import calculate_account_skin_value, get_connection
+
+URL = os.environ.get('VALORANT_SKINS_URL', "https://www.pcgamesn.com/valorant/skins")
+# Live fetch sirf opt-in par; default demo sample data hai
+LIVE_SCRAPE = os.environ.get('VALORANT_LIVE_SCRAPE') == '1'
+
+# Heading jaise tags jinke text me bundle / skin naam hote hain
+HEADING_TAGS = ('h2', 'h3', 'h4', 'strong', 'b')
+WEAPONS = ('vandal', 'phantom', 'operator', 'sheriff', 'ghost', 'classic', 'spectre', 'guardian', 'bucky',
+           'shorty', 'frenzy', 'judge', 'marshal', 'outlaw', 'bulldog', 'ares', 'odin')
+MELEE = ('knife', 'sword', 'dagger', 'karambit', 'claw', 'hammer', 'axe')
+DEFAULT_PRICE = 1775
+
+# Har list ek precompiled alternation - ek search() har element par, `any(word in text)` loops nahi
+# (substring match, pehle jaisa hi: "Vandals" bhi vandal hai)
+_BUNDLE_RE = re.compile('bundle|collection', re.IGNORECASE)
+# Melee naam bhi skin hain ("Prime Karambit") - purana parser inhe sirf gun word hone par leta tha
+_SKIN_RE = re.compile('|'.join(WEAPONS + MELEE), re.IGNORECASE)
+_MELEE_RE = re.compile('|'.join(MELEE), re.IGNORECASE)
+_PRICE_RE = re.compile(r'\d[\d,]*')
+
+def html_parser():
+    """'lxml' agar installed hai (kai guna tez), warna bs4 ka 'html.parser'."""
+    try:
+        import lxml.html  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+def _lxml_headings(html):
+    import lxml.html
+    root = lxml.html.fromstring(html)
+
+    def next_text(element):
+        sibling = element.getnext()
+        # lxml me comments bhi siblings hain - bs4 ki tarah sirf tags
+        while sibling is not None and not isinstance(sibling.tag, str):
+            sibling = sibling.getnext()
+        return sibling.text_content() if sibling is not None else ''
+
+    return ((element.text_content(), element) for element in root.iter(*HEADING_TAGS)), next_text
+
+def _bs4_headings(html):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+
+    def next_text(element):
+        sibling = element.find_next_sibling()
+        return sibling.get_text() if sibling is not None else ''
+
+    return ((element.get_text(), element) for element in soup.find_all(HEADING_TAGS)), next_text
+
+def parse_skins_html(html, parser=None):
+    """
+    Catalog page (str ya bytes) se [{'bundle_name', 'skins': [...]}]. Bundle/collection heading
+    ke baad wale weapon headings us bundle ki skins hain; price agle sibling ke "... VP" se.
+    """
+    if not html or not html.strip():
+        return []
+    headings, next_text = (_lxml_headings if (parser or html_parser()) == 'lxml' else _bs4_headings)(html)
+    bundles = []
+    for raw_text, element in headings:
+        text = ' '.join(raw_text.split())
+        if _BUNDLE_RE.search(text):
+            bundles.append({'bundle_name': text, 'skins': []})
+        elif bundles and _SKIN_RE.search(text):
+            price = DEFAULT_PRICE
+            sibling_text = next_text(element)
+            if 'VP' in sibling_text:
+                match = _PRICE_RE.search(sibling_text)
+                if match:
+                    price = int(match.group().replace(',', ''))
+            bundles[-1]['skins'].append({
+                'skin_name': text,
+                'skin_type': 'melee' if _MELEE_RE.search(text) else 'gun',
+                'value_vp': price,
+                'image_url': None
+            })
+    return bundles
+
+def parse_skins_file(path):
+    """Process pool worker: (path, bundles, error). Bytes pass hote hain taaki parser khud encoding pehchane."""
+    try:
+        with open(path, 'rb') as f:
+            return path, parse_skins_html(f.read()), None
+    except Exception as e:
+        return path, [], f'{type(e).__name__}: {e}'
+
+def iter_parsed_files(paths, workers=None):
+    """
+    Files ko process pool me parse karta hai (order same rehta hai). workers=1 par
+    pool nahi banta - single core par process overhead bachta hai.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 2:
+        yield from map(parse_skins_file, paths)
+        return
+    # spawn: Streamlit / job threads wale process ko fork karna locks ke sath atak sakta hai
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        yield from pool.map(parse_skins_file, paths, chunksize=max(1, len(paths) // (workers * 8)))
+
+def merge_bundles(parsed):
+    """Kai pages ke bundles naam se merge; ek bundle me skin naam dobara aaye to pehla rehta hai."""
+    merged = {}
+    for bundles in parsed:
+        for bundle in bundles:
+            skins = merged.setdefault(bundle['bundle_name'], {})
+            for skin in bundle['skins']:
+                skins.setdefault(skin['skin_name'], skin)
+    return [{'bundle_name': name, 'skins': list(skins.values())} for name, skins in merged.items()]
+
+def ingest_directory(directory, workers=None, pattern='.html', progress=None):
+    """
+    Saved catalog pages (offline) ki directory ko parse karke DB me daalta hai.
+    progress(done_files, total_files) parsing ke dauran. Return: stats dict.
+    """
+    paths = sorted(os.path.join(root, name) for root, _, names in os.walk(directory)
+                   for name in names if name.endswith(pattern))
+    parsed, errors = [], []
+    for done, (path, bundles, error) in enumerate(iter_parsed_files(paths, workers), 1):
+        parsed.append(bundles)
+        if error:
+            errors.append((path, error))
+        if progress:
+            progress(done, len(paths))
+    bundles = merge_bundles(parsed)
+    sync = _save_bundles(bundles)
+    return {'files': len(paths), 'errors': errors, 'bundles': len(bundles),
+            'skins': sum(len(bundle['skins']) for bundle in bundles), 'parser': html_parser(), 'sync': sync}
+
+def _save_bundles(bundles, progress=None, source=None):
+    """
+    Bundles ko sync_catalog se DB me (ek transaction, sirf badli rows likhi jati hain).
+    source: (url, content_hash) sync ke sath record hota hai.
+    progress(done, total) sync ke baad - background job cancel yahin hota hai. Return: sync report.
+    """
+    report = sync_catalog(bundles, source=source)
+    if progress:
+        progress(len(bundles), len(bundles))
+    return report
+
+# Demo / fallback catalog
+SAMPLE_BUNDLES = [
+    {
+        'bundle_name': 'Prime Bundle',
+        'skins': [
+            {'skin_name': 'Prime Vandal', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
+            {'skin_name': 'Prime Classic', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
+            {'skin_name': 'Prime Guardian', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
+            {'skin_name': 'Prime Spectre', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
+            {'skin_name': 'Prime Karambit', 'skin_type': 'melee', 'value_vp': 3550, 'image_url': None}
+        ]
+    },
+    {
+        'bundle_name': 'Oni Bundle',
+        'skins': [
+            {'skin_name': 'Oni Phantom', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
+            {'skin_name': 'Oni Guardian', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
+            {'skin_name': 'Oni Bucky', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
+            {'skin_name': 'Oni Shorty', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
+            {'skin_name': 'Oni Claw', 'skin_type': 'melee', 'value_vp': 3550, 'image_url': None}
         ]
-        for bundle in sample_bundles:
-            insert_bundle_and_skins(bundle['bundle_name'], bundle['skins'])
+    },
+    {
+        'bundle_name': 'Reaver Bundle',
+        'skins': [
+            {'skin_name': 'Reaver Vandal', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
+            {'skin_name': 'Reaver Operator', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
+            {'skin_name': 'Reaver Guardian', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
+            {'skin_name': 'Reaver Sheriff', 'skin_type': 'gun', 'value_vp': 1775, 'image_url': None},
+            {'skin_name': 'Reaver Knife', 'skin_type': 'melee', 'value_vp': 3550, 'image_url': None}
+        ]
+    }
+]
+
+def scrape_valorant_skins(progress=None, force=False):
+    """
+    Return: sync_catalog report (kya add / update / remove hua). LIVE_SCRAPE off ho to demo
+    sample data; on ho to page conditional GET se aata hai, aur page ka content hash wahi ho jo
+    is DB me pichhli baar sync hua tha to (force ke bina) parse / DB writes skip - khaali (sab 0)
+    report. Faisla DB ke catalog_sources se hota hai, HTTP cache se nahi: parse/sync fail ho
+    ya DB nayi ho to agla scrape dobara sync karta hai.
+    """
+    if not LIVE_SCRAPE:
+        # --- Force sample data for demo ---
+        report = _save_bundles(SAMPLE_BUNDLES, progress)
+        print("Forcefully added sample data for demo.")
+        return report
+    import fetch
+    result = fetch.fetch(URL)
+    if result.status not in (200, 304):
+        print(f"Failed to fetch page: {result.status}")
+        # Sample data add karo agar scraping fail ho
+        report = _save_bundles(SAMPLE_BUNDLES, progress)
         print("Added sample data due to scraping failure.")
-        return
-    soup = BeautifulSoup(response.text, 'html.parser')
-    bundles = []
-    # Better scraping logic - multiple selectors try karo
-    # Method 1: Direct skin names
-    skin_elements = soup.find_all(['h2', 'h3', 'h4', 'strong', 'b'])
-    if skin_elements:
-        current_bundle = None
-        for element in skin_elements:
-            text = element.get_text(strip=True)
-            if 'bundle' in text.lower() or 'collection' in text.lower():
-                current_bundle = text
-                bundles.append({'bundle_name': current_bundle, 'skins': []})
-            elif any(gun in text.lower() for gun in ['vandal', 'phantom', 'operator', 'sheriff', 'ghost', 'classic', 'spectre', 'guardian', 'bucky', 'shorty', 'frenzy', 'judge', 'marshal', 'outlaw', 'bulldog', 'ares', 'odin']):
-                if current_bundle:
-                    skin_type = 'melee' if any(melee in text.lower() for melee in ['knife', 'sword', 'dagger', 'karambit', 'claw', 'hammer', 'axe']) else 'gun'
-                    # Try to find price nearby
-                    price = 1775  # Default price
-                    next_sibling = element.find_next_sibling()
-                    if next_sibling and 'VP' in next_sibling.get_text():
-                        try:
-                            price = int(''.join(filter(str.isdigit, next_sibling.get_text())))
-                        except:
-                            pass
-                    bundles[-1]['skins'].append({
-                        'skin_name': text,
-                        'skin_type': skin_type,
-                        'value_vp': price,
-                        'image_url': None
-                    })
+        return report
+    if not force and result.content_hash == catalog_source_hash(URL):
+        print("Catalog page unchanged since last sync, nothing to update.")
+        return dict.fromkeys(CATALOG_SYNC_FIELDS, 0)
+    # Better scraping logic - heading tags se bundles aur skins
+    bundles = parse_skins_html(result.content)
     # Method 2: If no bundles found, create individual skins
     if not bundles:
         individual_skins = [
@@ -134,8 +221,7 @@ def scrape_valorant_skins():
         ]
         bundles.append({'bundle_name': 'Individual Skins', 'skins': individual_skins})
     # Database me insert karo
-    for bundle in bundles:
-        insert_bundle_and_skins(bundle['bundle_name'], bundle['skins'])
+    report = _save_bundles(bundles, progress, source=(URL, result.content_hash))
     # CSV me save karen
     with open('valorant_skins_bundles.csv', 'w', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=['bundle_name', 'skin_name', 'skin_type', 'value_vp', 'image_url'])
@@ -150,26 +236,29 @@ def scrape_valorant_skins():
                     'image_url': skin['image_url']
                 })
     print(f"Scraped {len(bundles)} bundles. Data saved to valorant_skins_bundles.csv")
+    return report
 
 def show_skins():
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT skin_name, vp_price, tier FROM skins')
-    rows = cursor.fetchall()
+    with get_connection() as conn:
+        rows = conn.execute('SELECT i.name, s.vp_price, s.tier FROM skins s JOIN items i ON i.id = s.item_id').fetchall()
     for row in rows:
         print(row)
-    conn.close()
 
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 2 and sys.argv[1] == 'ingest':
+        # python scrape_valorant_skins.py ingest <saved_pages_dir> [workers]
+        stats = ingest_directory(sys.argv[2], workers=int(sys.argv[3]) if len(sys.argv) > 3 else None)
+        for path, error in stats.pop('errors'):
+            print(f"{path}: {error}")
+        print(stats)
+        sys.exit(0)
     from database import insert_unicorny_skins
     insert_unicorny_skins()
     show_skins()
     # Demo user ki total skin value print karo
-    import sqlite3
-    conn = sqlite3.connect('valorant_game.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT id FROM users WHERE username = ?', ('demo',))
-    row = cursor.fetchone()
+    with get_connection() as conn:
+        row = conn.execute('SELECT id FROM users WHERE username = ?', ('demo',)).fetchone()
     if row:
         demo_user_id = row[0]
         result = calculate_account_skin_value(demo_user_id)
@@ -179,13 +268,3 @@ if __name__ == "__main__":
             print(detail)
     else:
         print("Demo user nahi mila.")
-    conn.close()
-
-import sqlite3
-
-conn = sqlite3.connect('valorant_game.db')
-cursor = conn.cursor()
-cursor.execute('DROP TABLE IF EXISTS skins')
-conn.commit()
-conn.close()
-print("Old skins table deleted.") 
\ No newline at end of file